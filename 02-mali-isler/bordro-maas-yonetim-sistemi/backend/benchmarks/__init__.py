@@ -0,0 +1,45 @@
+"""
+Bordro servisi performans ölçümleri (python -m benchmarks.<modül>)
+
+Veri üreten ölçümler (data, pagination, suite) şemayı silip yeniden oluşturur; hedef veritabanı
+--database-url ile açıkça verilmelidir, uygulamanın varsayılan DATABASE_URL'si kullanılmaz.
+Uygulama modülleri DATABASE_URL'yi import anında okuduğu için adres paket yüklenirken ortama yazılır.
+"""
+import os
+import sys
+
+def _database_url_argument():
+    """Komut satırındaki --database-url değeri (yoksa None)"""
+    for i, arg in enumerate(sys.argv):
+        if arg == "--database-url" and i + 1 < len(sys.argv):
+            return sys.argv[i + 1]
+        if arg.startswith("--database-url="):
+            return arg.split("=", 1)[1]
+    return None
+
+_database_url = _database_url_argument()
+if _database_url:
+    os.environ["DATABASE_URL"] = _database_url
+
+def require_disposable_database(parser, args) -> None:
+    """
+    Şemayı silecek ölçümler için hedef veritabanını doğrula
+    --database-url zorunludur; SQLite dışındaki veritabanları ancak --yes-drop ile kabul edilir.
+    """
+    from sqlalchemy.engine import make_url
+    from database import engine
+
+    if not args.database_url:
+        parser.error("--database-url zorunlu: ölçüm tüm tabloları silip yeniden oluşturur")
+    if make_url(args.database_url) != engine.url:
+        parser.error(f"uygulama {engine.url!r} adresine bağlı; --database-url ile eşleşmiyor")
+    if engine.dialect.name != "sqlite" and not args.yes_drop:
+        parser.error(f"{engine.url!r} içindeki tüm tablolar silinecek; onaylamak için --yes-drop verin")
+
+def add_database_arguments(parser) -> None:
+    """Veri üreten ölçümlerin ortak --database-url / --yes-drop seçenekleri"""
+    parser.add_argument("--database-url", help="Ölçüm veritabanı (tüm tablolar silinir)")
+    parser.add_argument(
+        "--yes-drop", action="store_true",
+        help="SQLite dışındaki bir veritabanında tabloların silinmesini onayla"
+    )
@@ -0,0 +1,234 @@
+"""
+Ölçümler için sentetik bordro verisi üretici: N çalışan, M ay, log-normal brüt maaş dağılımı.
+
+Bordro tutarları uygulamanın kendi para motoruyla (services/money.py) ve yıllık kümülatif
+matrahla hesaplanır; özet tabloları (yıllık matrah, dönem maliyeti, olay akışı, arama indeksi)
+uygulamanın yeniden oluşturma yollarıyla doldurulur. Böylece ölçümler gerçek veri şekli üzerinde çalışır.
+
+Kullanım:
+    python -m benchmarks.data --database-url sqlite:///./bench.db --employees 5000 --months 24
+"""
+import argparse
+import json
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import insert, text
+
+from benchmarks import add_database_arguments, require_disposable_database
+from database import Base, SessionLocal, engine, ensure_indexes
+from models import Employee, Payroll, PayrollStatus, FinancialSettings
+from services import money
+from services.activity_service import backfill_activity_events
+from services.ledger_service import LedgerService
+from services.search_service import build_employee_search_text, setup_employee_search
+from services.settings_service import SettingsService, settings_cache
+from services.tax_totals_service import TaxTotalsService
+from schemas import TaxBracket
+
+INSERT_CHUNK_SIZE = 10000
+
+FIRST_NAMES = [
+    "Ahmet", "Mehmet", "Ayşe", "Fatma", "Mustafa", "Emine", "Ali", "Hatice", "Hüseyin", "Zeynep",
+    "İbrahim", "Elif", "Hasan", "Şule", "Murat", "Özlem", "Çağla", "Gökhan", "Ülkü", "İrem",
+]
+LAST_NAMES = [
+    "Yılmaz", "Kaya", "Demir", "Şahin", "Çelik", "Yıldız", "Yıldırım", "Öztürk", "Aydın", "Özdemir",
+    "Arslan", "Doğan", "Kılıç", "Aslan", "Çetin", "Kara", "Koç", "Kurt", "Özkan", "Şimşek",
+]
+# (unvan, olasılık, medyan brüt maaş)
+TITLES = [
+    ("Memur", 0.40, 28000),
+    ("Uzman", 0.25, 42000),
+    ("Mühendis", 0.15, 55000),
+    ("Şef", 0.12, 50000),
+    ("Müdür", 0.08, 80000),
+]
+
+def _period_start(first_period: datetime, month_index: int) -> datetime:
+    year, month = divmod(first_period.month - 1 + month_index, 12)
+    return datetime(first_period.year + year, month + 1, 1)
+
+def _ensure_financial_settings(first_period: datetime, last_period: datetime) -> dict:
+    """Veri aralığındaki her yıl için varsayılan finansal ayarları oluştur, yıl -> ayar sözlüğü döndür"""
+    db = SessionLocal()
+    try:
+        service = SettingsService(db)
+        service.get_or_create_settings()
+        template = service.get_current_financial_settings()
+        params = {}
+        for year in range(first_period.year, last_period.year + 1):
+            settings = db.query(FinancialSettings).filter(
+                FinancialSettings.effective_year == year,
+                FinancialSettings.is_active == True
+            ).first()
+            if settings is None:
+                settings = FinancialSettings(
+                    effective_year=year,
+                    effective_date=datetime(year, 1, 1),
+                    minimum_wage=template.minimum_wage,
+                    sgk_employee_rate=template.sgk_employee_rate,
+                    sgk_employer_rate=template.sgk_employer_rate,
+                    unemployment_insurance_rate=template.unemployment_insurance_rate,
+                    income_tax_brackets=template.income_tax_brackets,
+                    description=f"{year} ölçüm verisi",
+                    created_by="benchmark"
+                )
+                db.add(settings)
+            params[year] = {
+                "sgk_rate": money.to_rate(settings.sgk_employee_rate),
+                "unemployment_rate": money.to_rate(settings.unemployment_insurance_rate),
+                "employer_rate": money.to_rate(settings.sgk_employer_rate),
+                "brackets": money.to_money_brackets(
+                    [TaxBracket(**bracket) for bracket in settings.income_tax_brackets]
+                ),
+            }
+        db.commit()
+        settings_cache.invalidate()
+        return params
+    finally:
+        db.close()
+
+def generate_employees(count: int, rng: np.random.Generator, hire_date: datetime) -> list:
+    """Çalışan satırları (user_id = id, çalışan paneli ölçümleri için)"""
+    title_index = rng.choice(len(TITLES), size=count, p=[t[1] for t in TITLES])
+    medians = np.array([TITLES[i][2] for i in title_index], dtype=float)
+    salaries = np.round(medians * rng.lognormal(mean=0.0, sigma=0.25, size=count), 2)
+    first_names = rng.integers(0, len(FIRST_NAMES), size=count)
+    last_names = rng.integers(0, len(LAST_NAMES), size=count)
+
+    rows = []
+    for i in range(count):
+        first_name = FIRST_NAMES[first_names[i]]
+        last_name = LAST_NAMES[last_names[i]]
+        rows.append({
+            "id": i + 1,
+            "user_id": i + 1,
+            "first_name": first_name,
+            "last_name": last_name,
+            "search_text": build_employee_search_text(first_name, last_name),
+            "national_id": f"{10000000000 + i}",
+            "title": TITLES[title_index[i]][0],
+            "hire_date": hire_date,
+            "gross_salary": float(salaries[i]),
+            # Yaklaşık %5 pasif çalışan
+            "is_active": bool(rng.random() >= 0.05),
+            "created_at": hire_date,
+        })
+    return rows
+
+def seed(employees: int, months: int, first_period: datetime = None, random_seed: int = 42) -> dict:
+    """
+    Şemayı sıfırla ve sentetik veri üret
+    Son ay DRAFT, bir önceki ay APPROVED, diğer aylar PAID; bordroların ~%1'i CANCELLED
+    """
+    rng = np.random.default_rng(random_seed)
+    if first_period is None:
+        # Son dönem içinde bulunulan ay olacak şekilde geriye doğru
+        now = datetime.now()
+        first_period = _period_start(datetime(now.year, now.month, 1), -(months - 1))
+    last_period = _period_start(first_period, months - 1)
+
+    Base.metadata.drop_all(bind=engine)
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE IF EXISTS employees_fts"))
+    Base.metadata.create_all(bind=engine)
+    ensure_indexes(engine)
+
+    params_by_year = _ensure_financial_settings(first_period, last_period)
+    employee_rows = generate_employees(employees, rng, first_period - timedelta(days=365))
+    gross = np.array([money.to_kurus(row["gross_salary"]) for row in employee_rows], dtype=np.int64)
+    employee_ids = np.arange(1, employees + 1)
+    titles = [row["title"] for row in employee_rows]
+
+    with engine.begin() as conn:
+        for start in range(0, employees, INSERT_CHUNK_SIZE):
+            conn.execute(insert(Employee), employee_rows[start:start + INSERT_CHUNK_SIZE])
+
+        payroll_id = 0
+        cumulative = np.zeros(employees, dtype=np.int64)
+        for month_index in range(months):
+            period_start = _period_start(first_period, month_index)
+            if period_start.month == 1:
+                cumulative[:] = 0
+            amounts = money.calculate_amounts_batch(
+                gross, cumulative_tax_base_kurus=cumulative, **params_by_year[period_start.year]
+            )
+            cumulative += amounts["tax_base"]
+
+            if month_index == months - 1:
+                statuses = np.full(employees, PayrollStatus.DRAFT.value, dtype=object)
+            elif month_index == months - 2:
+                statuses = np.full(employees, PayrollStatus.APPROVED.value, dtype=object)
+            else:
+                statuses = np.full(employees, PayrollStatus.PAID.value, dtype=object)
+            statuses[rng.random(employees) < 0.01] = PayrollStatus.CANCELLED.value
+
+            columns = {key: [money.from_kurus(v) for v in values.tolist()] for key, values in amounts.items()}
+            period_end = _period_start(first_period, month_index + 1) - timedelta(days=1)
+            created_at = period_end + timedelta(days=1)
+            batch = []
+            for i in range(employees):
+                payroll_id += 1
+                batch.append({
+                    "id": payroll_id,
+                    "employee_id": int(employee_ids[i]),
+                    "pay_period_start": period_start,
+                    "pay_period_end": period_end,
+                    "gross_salary": columns["gross"][i],
+                    "net_salary": columns["net"][i],
+                    "income_tax": columns["income_tax"][i],
+                    "income_tax_rate": round(columns["income_tax"][i] / columns["tax_base"][i] * 100, 2),
+                    "sgk_premium": columns["sgk_premium"][i],
+                    "sgk_rate": params_by_year[period_start.year]["sgk_rate"] / money.RATE_SCALE,
+                    "unemployment_insurance": columns["unemployment_insurance"][i],
+                    "unemployment_rate": params_by_year[period_start.year]["unemployment_rate"] / money.RATE_SCALE,
+                    "total_deductions": columns["total_deductions"][i],
+                    "tax_base": columns["tax_base"][i],
+                    "employer_sgk_premium": columns["employer_sgk_premium"][i],
+                    "employer_cost": columns["employer_cost"][i],
+                    "title": titles[i],
+                    "status": statuses[i],
+                    # id sırası oluşturulma sırasını izler
+                    "created_at": created_at + timedelta(seconds=i),
+                })
+                if len(batch) == INSERT_CHUNK_SIZE:
+                    conn.execute(insert(Payroll), batch)
+                    batch = []
+            if batch:
+                conn.execute(insert(Payroll), batch)
+
+    # Özet tabloları uygulamanın yeniden oluşturma yollarıyla doldur
+    db = SessionLocal()
+    try:
+        TaxTotalsService(db).rebuild()
+        LedgerService(db).rebuild()
+    finally:
+        db.close()
+    setup_employee_search(engine)
+    backfill_activity_events(engine)
+
+    return {
+        "dialect": engine.dialect.name,
+        "employees": employees,
+        "months": months,
+        "payrolls": employees * months,
+        "first_period": first_period.date().isoformat(),
+        "last_period": last_period.date().isoformat(),
+        "seed": random_seed,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentetik bordro verisi üret")
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=42)
+    add_database_arguments(parser)
+    args = parser.parse_args()
+    require_disposable_database(parser, args)
+
+    print(json.dumps(seed(args.employees, args.months, random_seed=args.seed), indent=2))
+
+if __name__ == "__main__":
+    main()
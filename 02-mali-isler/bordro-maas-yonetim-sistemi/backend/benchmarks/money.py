@@ -0,0 +1,119 @@
+"""
+Bordro para aritmetiği ölçümü: eski float hesaplama, kuruş tabanlı tekil hesaplama ve
+int64 NumPy toplu hesaplamayı hız ve toplam sapması açısından karşılaştırır.
+
+Sabit örnekler ve tekil/toplu yol eşitliği tests/test_money.py içinde doğrulanır; bu modül yalnızca ölçer.
+
+Kullanım:
+    python -m benchmarks.money --rows 100000
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from schemas import TaxBracket
+from services import money
+
+SGK_RATE = 14.0
+UNEMPLOYMENT_RATE = 1.0
+EMPLOYER_RATE = 15.5
+TAX_BRACKETS = [
+    TaxBracket(min_amount=0, max_amount=110000, rate=15, description="İlk dilim %15"),
+    TaxBracket(min_amount=110000, max_amount=230000, rate=20, description="İkinci dilim %20"),
+    TaxBracket(min_amount=230000, max_amount=580000, rate=27, description="Üçüncü dilim %27"),
+    TaxBracket(min_amount=580000, max_amount=None, rate=35, description="Dördüncü dilim %35"),
+]
+
+def _float_bracket_tax(amount: float) -> float:
+    total = 0.0
+    for bracket in TAX_BRACKETS:
+        width = amount - bracket.min_amount
+        if bracket.max_amount:
+            width = min(width, bracket.max_amount - bracket.min_amount)
+        if width > 0:
+            total += width * bracket.rate / 100
+    return total
+
+def float_payroll(gross: float, cumulative: float) -> dict:
+    """Kuruş motorundan önceki float hesaplama (karşılaştırma için)"""
+    sgk = gross * (SGK_RATE / 100)
+    unemployment = gross * (UNEMPLOYMENT_RATE / 100)
+    tax_base = gross - sgk - unemployment
+    income_tax = _float_bracket_tax(cumulative + tax_base) - _float_bracket_tax(cumulative)
+    total = income_tax + sgk + unemployment
+    return {
+        "sgk_premium": round(sgk, 2),
+        "unemployment_insurance": round(unemployment, 2),
+        "income_tax": round(income_tax, 2),
+        "net": round(gross - total, 2),
+    }
+
+def _params() -> dict:
+    return {
+        "sgk_rate": money.to_rate(SGK_RATE),
+        "unemployment_rate": money.to_rate(UNEMPLOYMENT_RATE),
+        "employer_rate": money.to_rate(EMPLOYER_RATE),
+        "brackets": money.to_money_brackets(TAX_BRACKETS),
+    }
+
+def generate_salaries(rows: int, seed: int = 42) -> tuple:
+    """Log-normal brüt maaş ve yıl içi kümülatif matrah dağılımı"""
+    rng = np.random.default_rng(seed)
+    gross = np.round(rng.lognormal(mean=np.log(35000), sigma=0.45, size=rows), 2)
+    months_before = rng.integers(0, 12, size=rows)
+    cumulative = np.round(gross * 0.85 * months_before, 2)
+    return gross.tolist(), cumulative.tolist()
+
+def run(rows: int) -> dict:
+    gross_tl, cumulative_tl = generate_salaries(rows)
+    params = _params()
+
+    started = time.perf_counter()
+    float_results = [float_payroll(g, c) for g, c in zip(gross_tl, cumulative_tl)]
+    float_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    single_results = [
+        money.calculate_amounts(money.to_kurus(g), cumulative_tax_base_kurus=money.to_kurus(c), **params)
+        for g, c in zip(gross_tl, cumulative_tl)
+    ]
+    single_seconds = time.perf_counter() - started
+
+    gross_kurus = np.array([money.to_kurus(g) for g in gross_tl], dtype=np.int64)
+    cumulative_kurus = np.array([money.to_kurus(c) for c in cumulative_tl], dtype=np.int64)
+    started = time.perf_counter()
+    batch = money.calculate_amounts_batch(gross_kurus, cumulative_tax_base_kurus=cumulative_kurus, **params)
+    batch_seconds = time.perf_counter() - started
+
+    exact_net_total = int(batch["net"].sum())
+    float_net_total = money.to_kurus(sum(r["net"] for r in float_results))
+    # Float yolda satır bazında net + yuvarlanmış kesintiler != brüt olan kayıtlar
+    float_inconsistent_rows = sum(
+        1 for g, r in zip(gross_tl, float_results)
+        if money.to_kurus(r["net"]) + money.to_kurus(r["sgk_premium"]) + money.to_kurus(r["unemployment_insurance"])
+        + money.to_kurus(r["income_tax"]) != money.to_kurus(g)
+    )
+
+    return {
+        "benchmark": "payroll_money_engine",
+        "rows": rows,
+        "float_ms": round(float_seconds * 1000, 3),
+        "kurus_single_ms": round(single_seconds * 1000, 3),
+        "kurus_batch_ms": round(batch_seconds * 1000, 3),
+        "net_total_exact": money.from_kurus(exact_net_total),
+        "net_total_float": money.from_kurus(float_net_total),
+        "net_total_drift_kurus": float_net_total - exact_net_total,
+        "float_inconsistent_rows": float_inconsistent_rows,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Bordro para aritmetiği ölçümü")
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.rows), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -2,17 +2,32 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
-from database import engine, Base
-from routers import employees, payrolls, settings
+from database import engine, Base, ensure_columns, ensure_nullable_columns, ensure_indexes
+from routers import employees, payrolls, settings, jobs
+from services.search_service import setup_employee_search
+from services.activity_service import backfill_activity_events
+from services.ledger_service import backfill_period_rollups
+from services.tax_totals_service import backfill_tax_year_totals
+from services.job_service import job_runner, recover_interrupted_jobs
+# Bordro iş tiplerini (payroll_bulk_create, payroll_export) iş kuyruğuna kaydeder
+from services import payroll_jobs
 
 # Veritabanı tablolarını oluştur
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     Base.metadata.create_all(bind=engine)
+    ensure_columns(engine)
+    ensure_nullable_columns(engine)
+    ensure_indexes(engine)
+    setup_employee_search(engine)
+    backfill_activity_events(engine)
+    backfill_period_rollups(engine)
+    backfill_tax_year_totals(engine)
+    recover_interrupted_jobs(engine)
     yield
     # Shutdown
-    pass
+    job_runner.shutdown()
 
 app = FastAPI(
     title="Bordro ve Maaş Yönetim Sistemi",
@@ -28,12 +43,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # Router'ları dahil et
 app.include_router(employees.router, prefix="/api/employees", tags=["employees"])
 app.include_router(payrolls.router, prefix="/api/payrolls", tags=["payrolls"])
 app.include_router(settings.router, prefix="/api", tags=["settings"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
 
 @app.get("/")
 async def root():
@@ -0,0 +1 @@
+"""Çevrimiçi veri taşıma komutları (python -m migrations.<modül>)"""
@@ -0,0 +1,115 @@
+"""
+Bordro kesintilerini JSON kolonundan tipli kolonlara taşır.
+
+Kayıtlar id sırasıyla küçük partiler halinde güncellenir; her parti ayrı
+transaction olduğundan tablo uzun süre kilitlenmez ve uygulama çalışırken
+güvenle çalıştırılabilir. Yarıda kesilirse kaldığı yerden devam eder.
+
+Kullanım:
+    python -m migrations.payroll_typed_deductions --batch-size 5000 --sleep 0.05
+"""
+import argparse
+import time
+
+from sqlalchemy import bindparam, select, text, update
+
+from database import Base, engine, ensure_columns, ensure_nullable_columns
+from models import Payroll
+
+DEDUCTIONS_INDEX_NAME = "ix_payrolls_period_status_deductions"
+# Yeni indeksin karşıladığı eski indeksler (yeni indeks oluşturulduktan sonra silinir)
+SUPERSEDED_INDEX_NAMES = ("ix_payrolls_pay_period_start", "ix_payrolls_period_deductions")
+
+def prepare_schema() -> None:
+    """Yeni kolonları ekle ve JSON kolonunu nullable yap (yeni bordrolar JSON yazmaz)"""
+    Base.metadata.create_all(bind=engine)
+    ensure_columns(engine)
+    ensure_nullable_columns(engine)
+
+def backfill(batch_size: int, sleep_seconds: float) -> int:
+    """Tipli kolonları boş olan bordroları partiler halinde doldur"""
+    payrolls = Payroll.__table__
+    update_stmt = update(payrolls).where(payrolls.c.id == bindparam("payroll_id")).values(
+        income_tax=bindparam("income_tax"),
+        income_tax_rate=bindparam("income_tax_rate"),
+        sgk_premium=bindparam("sgk_premium"),
+        sgk_rate=bindparam("sgk_rate"),
+        unemployment_insurance=bindparam("unemployment_insurance"),
+        unemployment_rate=bindparam("unemployment_rate"),
+        total_deductions=bindparam("total_deductions"),
+        tax_base=bindparam("tax_base"),
+    )
+
+    last_id = 0
+    migrated = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(payrolls.c.id, payrolls.c.deductions, payrolls.c.gross_salary, payrolls.c.tax_base)
+                .where(
+                    payrolls.c.id > last_id,
+                    payrolls.c.total_deductions.is_(None),
+                    payrolls.c.deductions.is_not(None)
+                )
+                .order_by(payrolls.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+
+            params = []
+            for r in rows:
+                columns = Payroll.deduction_columns(r.deductions or {})
+                tax_base = r.tax_base
+                if tax_base is None:
+                    # Matrah: brüt - SGK - işsizlik sigortası
+                    tax_base = round(
+                        r.gross_salary - (columns["sgk_premium"] or 0.0) - (columns["unemployment_insurance"] or 0.0), 2
+                    )
+                params.append({"payroll_id": r.id, "tax_base": tax_base, **columns})
+            conn.execute(update_stmt, params)
+
+        last_id = rows[-1].id
+        migrated += len(rows)
+        print(f"  {migrated} bordro taşındı (son id: {last_id})")
+        if sleep_seconds:
+            time.sleep(sleep_seconds)
+
+    return migrated
+
+def create_deductions_index() -> None:
+    """
+    Dönemsel toplam indeksini oluştur ve yerini aldığı eski indeksleri sil
+    (PostgreSQL'de yazmaları kilitlemeden)
+    """
+    index = next(i for i in Payroll.__table__.indexes if i.name == DEDUCTIONS_INDEX_NAME)
+    if engine.dialect.name == "postgresql":
+        columns = ", ".join(c.name for c in index.columns)
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {DEDUCTIONS_INDEX_NAME} ON payrolls ({columns})"
+            ))
+            for name in SUPERSEDED_INDEX_NAMES:
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    else:
+        index.create(bind=engine, checkfirst=True)
+        with engine.begin() as conn:
+            for name in SUPERSEDED_INDEX_NAMES:
+                conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+def main():
+    parser = argparse.ArgumentParser(description="Bordro kesintilerini JSON'dan tipli kolonlara taşı")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--sleep", type=float, default=0.0, help="Partiler arası bekleme (saniye)")
+    args = parser.parse_args()
+
+    print("🔧 Şema hazırlanıyor...")
+    prepare_schema()
+    print("🚚 Kesintiler taşınıyor...")
+    migrated = backfill(args.batch_size, args.sleep)
+    print("📇 İndeks oluşturuluyor...")
+    create_deductions_index()
+    print(f"✅ Tamamlandı: {migrated} bordro taşındı")
+
+if __name__ == "__main__":
+    main()
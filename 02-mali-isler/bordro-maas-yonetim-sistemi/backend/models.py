@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, JSON, Boolean, Enum, Text
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, JSON, Boolean, Enum, Text, Index
 from sqlalchemy.orm import relationship
+from sqlalchemy import event
 from sqlalchemy.sql import func
 import enum
 from database import Base
@@ -11,6 +12,28 @@ class PayrollStatus(PyEnum):
     PAID = "PAID"        # Ödendi
     CANCELLED = "CANCELLED"  # İptal Edildi
 
+# Bordro durum makinesi: mevcut durum -> geçilebilecek durumlar
+PAYROLL_STATUS_TRANSITIONS = {
+    PayrollStatus.DRAFT.value: {PayrollStatus.APPROVED.value, PayrollStatus.CANCELLED.value},
+    PayrollStatus.APPROVED.value: {PayrollStatus.PAID.value, PayrollStatus.CANCELLED.value, PayrollStatus.DRAFT.value},
+    PayrollStatus.PAID.value: set(),  # Ödenen bordro değiştirilemez
+    PayrollStatus.CANCELLED.value: set(),  # İptal edilen bordro değiştirilemez
+}
+
+class JobStatus(PyEnum):
+    PENDING = "PENDING"      # Kuyrukta
+    RUNNING = "RUNNING"      # Çalışıyor
+    SUCCEEDED = "SUCCEEDED"  # Tamamlandı
+    FAILED = "FAILED"        # Hata ile sonlandı
+    CANCELLED = "CANCELLED"  # İptal edildi
+
+def get_allowed_predecessors(target_status: str) -> set:
+    """Hedef duruma geçişe izin veren önceki durumlar"""
+    return {
+        source for source, targets in PAYROLL_STATUS_TRANSITIONS.items()
+        if target_status in targets
+    }
+
 class Employee(Base):
     __tablename__ = "employees"
 
@@ -23,11 +46,19 @@ class Employee(Base):
     hire_date = Column(DateTime, nullable=False)
     gross_salary = Column(Float, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)  # Aktif durum kontrolü
+    search_text = Column(String(201), nullable=True)  # Normalize edilmiş ad soyad (arama indeksi için)
     created_at = Column(DateTime, default=func.now(), nullable=False)
     
     # İlişkiler
     payrolls = relationship("Payroll", back_populates="employee")
 
+@event.listens_for(Employee, "before_insert")
+@event.listens_for(Employee, "before_update")
+def _set_employee_search_text(mapper, connection, target):
+    """Ad/soyad değiştiğinde arama metnini güncelle"""
+    from services.search_service import build_employee_search_text
+    target.search_text = build_employee_search_text(target.first_name, target.last_name)
+
 class Payroll(Base):
     __tablename__ = "payrolls"
 
@@ -36,13 +67,158 @@ class Payroll(Base):
     pay_period_start = Column(DateTime, nullable=False)
     pay_period_end = Column(DateTime, nullable=False)
     gross_salary = Column(Float, nullable=False)
-    deductions = Column(JSON, nullable=False)  # Kesintiler JSON formatında
+    deductions_json = Column("deductions", JSON, nullable=True)  # Eski kesinti JSON'u (sadece geçiş dönemi için okunur)
     net_salary = Column(Float, nullable=False)
+    # Kesinti bileşenleri (SQL toplamları için tipli kolonlar)
+    income_tax = Column(Float, nullable=True)  # Gelir vergisi tutarı
+    income_tax_rate = Column(Float, nullable=True)  # Efektif gelir vergisi oranı
+    sgk_premium = Column(Float, nullable=True)  # SGK çalışan primi
+    sgk_rate = Column(Float, nullable=True)
+    unemployment_insurance = Column(Float, nullable=True)  # İşsizlik sigortası çalışan payı
+    unemployment_rate = Column(Float, nullable=True)
+    total_deductions = Column(Float, nullable=True)  # Toplam kesinti
+    tax_base = Column(Float, nullable=True)  # Gelir vergisi matrahı (brüt - SGK - işsizlik)
+    employer_sgk_premium = Column(Float, nullable=True)  # SGK işveren payı
+    employer_cost = Column(Float, nullable=True)  # Toplam işveren maliyeti (brüt + işveren payı)
+    title = Column(String(200), nullable=True)  # Bordro dönemindeki unvan (maliyet raporları için)
     status = Column(String(20), nullable=False, default=PayrollStatus.DRAFT.value)  # Bordro durumu
     created_at = Column(DateTime, default=func.now(), nullable=False)
     
     # İlişkiler
-    employee = relationship("Employee", back_populates="payrolls") 
+    employee = relationship("Employee", back_populates="payrolls")
+
+    __table_args__ = (
+        # Aynı çalışan ve dönem için tek bordro (employee_id sorgularını da karşılar)
+        Index("uq_payrolls_employee_period", "employee_id", "pay_period_start", "pay_period_end", unique=True),
+        # Aylık sayımlar ve created_at aralık filtreleri
+        Index("ix_payrolls_created_at", "created_at"),
+        # Çalışan paneli: tek çalışanın bordroları üzerinde created_at'e göre koşullu toplamlar
+        Index("ix_payrolls_employee_created_at", "employee_id", "created_at"),
+        # Durum filtresi + özet listesinin id desc (keyset) sıralaması
+        Index("ix_payrolls_status_id", "status", "id"),
+        # Dönem tarih aralığı filtresi; aylık kesinti raporunun okuduğu tüm kolonları (durum ve
+        # kesinti tutarları) içerdiği için rapor index-only scan ile çalışabilir. Mevcut tablolarda
+        # migrations.payroll_typed_deductions tarafından oluşturulur (ensure_indexes atlar)
+        Index(
+            "ix_payrolls_period_status_deductions",
+            "pay_period_start", "status", "income_tax", "sgk_premium", "unemployment_insurance", "total_deductions",
+            info={"online": True}
+        ),
+    )
+
+    @staticmethod
+    def deduction_columns(deductions: dict) -> dict:
+        """Kesinti sözlüğünü (gelir_vergisi.tutar, sgk_primi.tutar, ...) tipli kolon değerlerine çevir"""
+        income_tax = deductions.get("gelir_vergisi") or {}
+        sgk = deductions.get("sgk_primi") or {}
+        unemployment = deductions.get("issizlik_sigortasi") or {}
+        return {
+            "income_tax": income_tax.get("tutar"),
+            "income_tax_rate": income_tax.get("oran"),
+            "sgk_premium": sgk.get("tutar"),
+            "sgk_rate": sgk.get("oran"),
+            "unemployment_insurance": unemployment.get("tutar"),
+            "unemployment_rate": unemployment.get("oran"),
+            "total_deductions": deductions.get("toplam_kesinti"),
+        }
+
+    @property
+    def deductions(self) -> dict:
+        """API uyumluluğu için kesintilerin JSON görünümü (tipli kolonlardan üretilir)"""
+        if self.total_deductions is None:
+            # Henüz taşınmamış eski kayıt
+            return self.deductions_json or {}
+        return {
+            "gelir_vergisi": {"oran": self.income_tax_rate, "tutar": self.income_tax},
+            "sgk_primi": {"oran": self.sgk_rate, "tutar": self.sgk_premium},
+            "issizlik_sigortasi": {"oran": self.unemployment_rate, "tutar": self.unemployment_insurance},
+            "toplam_kesinti": self.total_deductions,
+        }
+
+
+class EmployeeTaxYearTotal(Base):
+    """Çalışan bazında yıllık kümülatif gelir vergisi matrahı (bordro oluşturma/iptalde artımlı güncellenir)"""
+    __tablename__ = "employee_tax_year_totals"
+
+    id = Column(Integer, primary_key=True, index=True)
+    employee_id = Column(Integer, ForeignKey("employees.id"), nullable=False)
+    year = Column(Integer, nullable=False)
+    cumulative_gross = Column(Float, nullable=False, default=0.0)  # Kümülatif brüt
+    cumulative_tax_base = Column(Float, nullable=False, default=0.0)  # Kümülatif vergi matrahı
+    payroll_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("uq_employee_tax_year_totals_employee_year", "employee_id", "year", unique=True),
+    )
+
+class PayrollPeriodRollup(Base):
+    """Dönem (yıl/ay) ve unvan bazında bordro maliyet özeti (bordro yazımlarında artımlı güncellenir)"""
+    __tablename__ = "payroll_period_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
+    title = Column(String(200), nullable=False)
+    payroll_count = Column(Integer, nullable=False, default=0)
+    total_gross = Column(Float, nullable=False, default=0.0)
+    total_net = Column(Float, nullable=False, default=0.0)
+    total_employer_sgk = Column(Float, nullable=False, default=0.0)
+    total_employer_cost = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("uq_payroll_period_rollups_period_title", "year", "month", "title", unique=True),
+    )
+
+class Job(Base):
+    """Arka planda çalışan uzun süreli işlemler (toplu bordro oluşturma, dışa aktarma, yeniden hesaplama)"""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String(50), nullable=False)  # Kayıtlı iş tipi (ör. payroll_bulk_create)
+    status = Column(String(20), nullable=False, default=JobStatus.PENDING.value)
+    params = Column(JSON, nullable=True)  # İşin girdi parametreleri
+    progress_done = Column(Integer, nullable=False, default=0)
+    progress_total = Column(Integer, nullable=True)  # Bilinmiyorsa boş
+    result = Column(JSON, nullable=True)  # İş özeti
+    result_location = Column(String(500), nullable=True)  # Üretilen dosyanın yolu (dışa aktarma vb.)
+    error = Column(Text, nullable=True)
+    cancel_requested = Column(Boolean, nullable=False, default=False)  # Çalışan iş için iptal isteği
+    created_by = Column(String(100), nullable=True)  # İşi başlatan kullanıcı email
+    owner = Column(String(255), nullable=True)  # İşi kuyruğa alan/çalıştıran süreç (host:pid)
+    heartbeat_at = Column(DateTime, nullable=True)  # Sahip sürecin son canlılık bildirimi
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # İş listesi: durum filtresi + id desc sıralaması
+        Index("ix_jobs_status_id", "status", "id"),
+    )
+
+    @property
+    def has_result_file(self) -> bool:
+        return self.result_location is not None
+
+class ActivityEvent(Base):
+    """Son işlemler akışı için yalnızca eklenen olay kaydı (alan değişikliğiyle aynı transaction içinde yazılır)"""
+    __tablename__ = "activity_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_type = Column(String(50), nullable=False)  # ör. payroll_created, employee_created
+    category = Column(String(20), nullable=False)  # 'employee' | 'payroll' | 'system'
+    action = Column(String(200), nullable=False)  # Gösterilecek işlem başlığı
+    details = Column(String(500), nullable=True)
+    employee_id = Column(Integer, ForeignKey("employees.id"), nullable=True)  # İlgili çalışan (kişisel akış için)
+    payroll_id = Column(Integer, nullable=True)  # Silinen bordrolar için FK tanımlanmaz
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_activity_events_created_at", "created_at"),
+        # Çalışanın kendi akışı: employee_id eşitliği + id sıralı keyset sayfalama
+        Index("ix_activity_events_employee_id_id", "employee_id", "id"),
+    )
 
 class SystemSettings(Base):
     __tablename__ = "system_settings"
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from database import get_db
 from services.employee_service import EmployeeService
 from services.orchestration_service import OrchestrationService
+from services.search_service import EmployeeSearchService
 from schemas import Employee, EmployeeCreate, EmployeeUpdate, DirectEmployeeCreate, DirectEmployeeResponse, ApproveRegistrationRequest, ApproveRegistrationResponse
 from auth import get_current_user, require_admin, require_employee_or_admin, TokenData
 
@@ -39,6 +40,7 @@ async def create_employee(
 async def get_employees(
     skip: int = 0,
     limit: int = 100,
+    search: Optional[str] = Query(None, description="Ad soyad arama (önek eşleşme, alaka sıralı)"),
     current_user: TokenData = Depends(require_employee_or_admin),
     db: Session = Depends(get_db)
 ):
@@ -46,6 +48,8 @@ async def get_employees(
     service = EmployeeService(db)
     
     if current_user.role == "admin":
+        if search:
+            return EmployeeSearchService(db).search_employees(search, skip=skip, limit=limit)
         return service.get_employees(skip=skip, limit=limit)
     else:  # employee
         # Employee sadece kendi bilgisini görebilir
@@ -0,0 +1,84 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from typing import List, Optional
+import os
+
+from database import get_db
+from services.job_service import JobService
+from schemas import Job, JobCreate, JobStatus
+from auth import require_admin, TokenData
+
+router = APIRouter()
+
+@router.post("/", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(
+    job_data: JobCreate,
+    current_user: TokenData = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Uzun süreli işlemi kuyruğa al (sadece admin) - hemen döner, durum GET /api/jobs/{id} ile izlenir"""
+    service = JobService(db)
+    try:
+        return service.submit_job(job_data.job_type, job_data.params, current_user.email)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.get("/", response_model=List[Job])
+async def get_jobs(
+    status_filter: Optional[JobStatus] = Query(None, description="Durum filtreleme"),
+    limit: int = Query(50, ge=1, le=500),
+    current_user: TokenData = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Son işleri listele (sadece admin)"""
+    service = JobService(db)
+    return service.get_jobs(status_filter.value if status_filter else None, limit)
+
+@router.get("/{job_id}", response_model=Job)
+async def get_job(
+    job_id: int,
+    current_user: TokenData = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """İş durumu ve ilerlemesi (sadece admin)"""
+    job = JobService(db).get_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="İş bulunamadı"
+        )
+    return job
+
+@router.post("/{job_id}/cancel", response_model=Job)
+async def cancel_job(
+    job_id: int,
+    current_user: TokenData = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """İşi iptal et (sadece admin) - çalışan iş bir sonraki parti kontrolünde durur"""
+    job = JobService(db).cancel_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="İş bulunamadı"
+        )
+    return job
+
+@router.get("/{job_id}/result")
+async def download_job_result(
+    job_id: int,
+    current_user: TokenData = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """İşin ürettiği dosyayı indir (sadece admin)"""
+    job = JobService(db).get_job(job_id)
+    if not job or not job.result_location or not os.path.exists(job.result_location):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="İş sonucu bulunamadı"
+        )
+    return FileResponse(job.result_location, filename=os.path.basename(job.result_location))
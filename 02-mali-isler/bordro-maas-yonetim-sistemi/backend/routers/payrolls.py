@@ -1,14 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date
 
 from database import get_db
-from services.payroll_service import PayrollService
+from services.payroll_service import PayrollService, encode_payroll_cursor
 from services.employee_service import EmployeeService
+from services.tax_totals_service import TaxTotalsService
+from services.ledger_service import LedgerService
+from services.activity_service import ActivityService
 from schemas import (
     Payroll, PayrollCreate, PayrollSummary, PayrollUpdate, PayrollStatus,
-    PayrollCalculated, DashboardStats, RecentActivity
+    PayrollCalculated, DashboardStats, RecentActivity,
+    PayrollBulkStatusUpdate, PayrollBulkStatusResult, LabourCostRow, DeductionTotals,
+    PayrollRecalculateParams, PayrollRecalculationResult
 )
 from auth import get_current_user, require_admin, require_employee_or_admin, TokenData
 
@@ -34,6 +39,7 @@ async def create_payroll(
 
 @router.get("/summary", response_model=List[PayrollSummary])
 async def get_payrolls_summary(
+    response: Response,
     include_inactive: bool = Query(False, description="Pasif çalışanları dahil et"),
     employee_search: Optional[str] = Query(None, description="Çalışan adı arama"),
     status_filter: Optional[PayrollStatus] = Query(None, description="Durum filtreleme"),
@@ -41,23 +47,35 @@ async def get_payrolls_summary(
     date_end: Optional[date] = Query(None, description="Bitiş tarihi"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Keyset sayfalama imleci (X-Next-Cursor başlığından)"),
     current_user: TokenData = Depends(require_employee_or_admin),
     db: Session = Depends(get_db)
 ):
-    """Filtrelenebilir bordro özet listesi"""
+    """Filtrelenebilir bordro özet listesi (sonraki sayfa imleci X-Next-Cursor başlığında döner)"""
     service = PayrollService(db)
     
     if current_user.role == "admin":
         # Admin tüm bordroları filtreleyebilir
-        return service.get_payrolls_summary(
-            include_inactive=include_inactive,
-            employee_search=employee_search,
-            status_filter=status_filter,
-            date_start=date_start,
-            date_end=date_end,
-            skip=skip,
-            limit=limit
-        )
+        try:
+            summaries = service.get_payrolls_summary(
+                include_inactive=include_inactive,
+                employee_search=employee_search,
+                status_filter=status_filter,
+                date_start=date_start,
+                date_end=date_end,
+                skip=skip,
+                limit=limit,
+                cursor=cursor
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        
+        if len(summaries) == limit:
+            response.headers["X-Next-Cursor"] = encode_payroll_cursor(summaries[-1].id)
+        return summaries
     else:
         # Employee sadece kendi bordrolarını görebilir
         employee_service = EmployeeService(db)
@@ -80,6 +98,74 @@ async def get_payrolls_summary(
             ) for payroll in payrolls
         ]
 
+@router.post("/bulk-status", response_model=PayrollBulkStatusResult)
+async def bulk_update_payroll_status(
+    bulk_update: PayrollBulkStatusUpdate,
+    current_user: TokenData = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Toplu bordro durum güncelleme (sadece admin) - ID listesi veya filtre ile seçim"""
+    service = PayrollService(db)
+    try:
+        return service.bulk_update_payroll_status(bulk_update)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.post("/recalculate-drafts", response_model=PayrollRecalculationResult)
+async def recalculate_draft_payrolls(
+    params: PayrollRecalculateParams,
+    current_user: TokenData = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Finansal ayar değişikliğinden sonra geçerlilik tarihinden itibaren taslak bordroları yeniden hesapla (sadece admin)
+    dry_run=true ile sadece fark raporu döner; büyük veri için "payroll_recalculate_drafts" işi kullanılabilir
+    """
+    return PayrollService(db).recalculate_draft_payrolls(params.effective_date, params.dry_run)
+
+@router.post("/tax-totals/rebuild")
+async def rebuild_tax_year_totals(
+    year: Optional[int] = Query(None, description="Sadece belirtilen yıl (boşsa tümü)"),
+    current_user: TokenData = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Yıllık kümülatif vergi matrahı toplamlarını bordrolardan yeniden oluştur (sadece admin)"""
+    rows = TaxTotalsService(db).rebuild(year)
+    return {"message": "Yıllık vergi matrahı toplamları yeniden oluşturuldu", "rows": rows}
+
+@router.get("/reports/labour-cost", response_model=List[LabourCostRow])
+async def get_labour_cost_report(
+    year: int = Query(..., description="Yıl"),
+    month: Optional[int] = Query(None, ge=1, le=12, description="Ay (boşsa tüm yıl)"),
+    title: Optional[str] = Query(None, description="Unvan filtresi"),
+    current_user: TokenData = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Dönem ve unvan bazında toplam işgücü maliyeti (önceden toplanmış özetlerden, sadece admin)"""
+    return LedgerService(db).get_labour_cost(year, month, title)
+
+@router.get("/reports/deductions", response_model=List[DeductionTotals])
+async def get_deduction_totals_report(
+    year: int = Query(..., description="Yıl"),
+    current_user: TokenData = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Aylık gelir vergisi ve SGK kesinti toplamları (sadece admin)"""
+    return PayrollService(db).get_deduction_totals(year)
+
+@router.post("/reports/labour-cost/rebuild")
+async def rebuild_labour_cost_report(
+    year: Optional[int] = Query(None, description="Sadece belirtilen yıl (boşsa tümü)"),
+    current_user: TokenData = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Dönem maliyet özetlerini bordrolardan yeniden oluştur (sadece admin)"""
+    rows = LedgerService(db).rebuild(year)
+    return {"message": "Dönem maliyet özetleri yeniden oluşturuldu", "rows": rows}
+
 @router.put("/{payroll_id}/status", response_model=Payroll)
 async def update_payroll_status(
     payroll_id: int,
@@ -89,7 +175,13 @@ async def update_payroll_status(
 ):
     """Bordro durumunu güncelle (sadece admin)"""
     service = PayrollService(db)
-    payroll = service.update_payroll_status(payroll_id, payroll_update)
+    try:
+        payroll = service.update_payroll_status(payroll_id, payroll_update)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
     if not payroll:
         raise HTTPException(
@@ -261,37 +353,23 @@ async def get_dashboard_stats(
                 detail="Employee profili bulunamadı"
             )
         
-        employee_payrolls = payroll_service.get_employee_payrolls(employee.id)
-        total_gross = sum(p.gross_salary for p in employee_payrolls)
-        total_net = sum(p.net_salary for p in employee_payrolls)
-        
-        from datetime import datetime
-        current_month = datetime.now().month
-        current_year = datetime.now().year
-        current_month_payrolls = len([
-            p for p in employee_payrolls 
-            if p.created_at.month == current_month and p.created_at.year == current_year
-        ])
+        # Tek aggregate sorgu (bordro geçmişi belleğe yüklenmez)
+        totals = payroll_service.get_employee_payroll_totals(employee.id)
+        current_month_net = totals["current_month_net_salary"]
         
         # Employee için basit bütçe hesaplama (kendi maaşına göre)
         estimated_monthly_budget = employee.gross_salary if employee else 0.0
         
-        # Bu ay ki bordrolarının net maaş toplamı
-        current_month_net = sum(
-            p.net_salary for p in employee_payrolls 
-            if p.created_at.month == current_month and p.created_at.year == current_year and p.status.value == "PAID"
-        )
-        
         budget_usage_percent = 0.0
         if estimated_monthly_budget > 0 and current_month_net > 0:
             budget_usage_percent = min((current_month_net / estimated_monthly_budget) * 100, 100.0)
         
         return DashboardStats(
             total_employees=1,  # Sadece kendisi
-            total_payrolls=len(employee_payrolls),
-            current_month_payrolls=current_month_payrolls,
-            total_gross_salary=total_gross,
-            total_net_salary=total_net,
+            total_payrolls=totals["total_payrolls"],
+            current_month_payrolls=totals["current_month_payrolls"],
+            total_gross_salary=totals["total_gross_salary"],
+            total_net_salary=totals["total_net_salary"],
             current_month_net_salary=current_month_net,
             estimated_monthly_budget=estimated_monthly_budget,
             budget_usage_percent=budget_usage_percent
@@ -299,35 +377,32 @@ async def get_dashboard_stats(
 
 @router.get("/dashboard/activities", response_model=List[RecentActivity])
 async def get_recent_activities(
-    limit: int = 10,
+    response: Response,
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Keyset sayfalama imleci (X-Next-Cursor başlığından)"),
+    employee_id: Optional[int] = Query(None, description="Sadece bu çalışana ait olaylar (admin)"),
     current_user: TokenData = Depends(require_employee_or_admin),
     db: Session = Depends(get_db)
 ):
-    """Son işlemleri getir (rol bazlı)"""
-    service = PayrollService(db)
+    """Son işlemleri getir (rol bazlı, sonraki sayfa imleci X-Next-Cursor başlığında döner)"""
+    service = ActivityService(db)
     
-    if current_user.role == "admin":
-        # Admin için tüm sistem aktiviteleri
-        return service.get_recent_activities(limit)
-    else:
+    if current_user.role != "admin":
         # Employee için sadece kendi aktiviteleri
         employee_service = EmployeeService(db)
         employee = employee_service.get_employee_by_user_id(current_user.user_id)
         if not employee:
             return []
-        
-        # Sadece kendi payroll aktivitelerini göster
-        from schemas import RecentActivity
-        employee_payrolls = service.get_employee_payrolls(employee.id)
-        activities = []
-        
-        for payroll in employee_payrolls[:limit]:
-            activities.append(RecentActivity(
-                key=f"payroll_{payroll.id}",
-                action="Bordro Oluşturuldu",
-                details=f"{employee.first_name} {employee.last_name}",
-                time=service._format_time(payroll.created_at),
-                type="payroll"
-            ))
-        
-        return activities 
\ No newline at end of file
+        employee_id = employee.id
+    
+    try:
+        activities, next_cursor = service.get_feed(employee_id=employee_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return activities
@@ -1,9 +1,9 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, status, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 from database import get_db
 from auth import require_admin, TokenData
-from services.settings_service import SettingsService
+from services.settings_service import SettingsService, SettingsSnapshot
 from schemas import (
     SystemSettingsResponse, CompanyInfoUpdate, FinancialSettingsUpdate,
     SecuritySettingsUpdate, SMTPSettingsUpdate, FinancialSettingsCreate, FinancialSettingsResponse,
@@ -12,39 +12,26 @@ from schemas import (
 
 router = APIRouter(prefix="/settings", tags=["System Settings"])
 
+def _etag_response(request: Request, response: Response, snapshot: SettingsSnapshot):
+    """If-None-Match ETag ile eşleşirse 304 döndür, aksi halde ETag başlığıyla içeriği döndür"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if snapshot.etag in candidates or "*" in candidates:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": snapshot.etag})
+    response.headers["ETag"] = snapshot.etag
+    return snapshot.payload
+
 @router.get("/", response_model=SystemSettingsResponse)
 async def get_system_settings(
+    request: Request,
+    response: Response,
     current_user: TokenData = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    """Sistem ayarlarını getir (sadece admin)"""
+    """Sistem ayarlarını getir (sadece admin, ETag / If-None-Match destekli)"""
     service = SettingsService(db)
-    settings = service.get_or_create_settings()
-    
-    return SystemSettingsResponse(
-        id=settings.id,
-        company_name=settings.company_name,
-        company_tax_number=settings.company_tax_number,
-        company_address=settings.company_address,
-        company_phone=settings.company_phone,
-        company_logo_url=settings.company_logo_url,
-        system_currency=settings.system_currency,
-        date_format=settings.date_format,
-        min_password_length=settings.min_password_length,
-        require_uppercase=settings.require_uppercase,
-        require_lowercase=settings.require_lowercase,
-        require_numbers=settings.require_numbers,
-        require_special_chars=settings.require_special_chars,
-        smtp_server=settings.smtp_server,
-        smtp_port=settings.smtp_port,
-        smtp_username=settings.smtp_username,
-        smtp_use_tls=settings.smtp_use_tls,
-        smtp_from_email=settings.smtp_from_email,
-        smtp_from_name=settings.smtp_from_name,
-        created_at=settings.created_at,
-        updated_at=settings.updated_at,
-        updated_by=settings.updated_by
-    )
+    return _etag_response(request, response, service.get_settings_snapshot())
 
 @router.put("/company", response_model=SystemSettingsResponse)
 async def update_company_info(
@@ -58,24 +45,7 @@ async def update_company_info(
     try:
         settings = service.update_company_info(data, current_user.email)
         
-        return SystemSettingsResponse(
-            id=settings.id,
-            company_name=settings.company_name,
-            company_tax_number=settings.company_tax_number,
-            company_address=settings.company_address,
-            company_phone=settings.company_phone,
-            company_logo_url=settings.company_logo_url,
-            minimum_wage=settings.minimum_wage,
-            sgk_employee_rate=settings.sgk_employee_rate,
-            sgk_employer_rate=settings.sgk_employer_rate,
-            unemployment_insurance_rate=settings.unemployment_insurance_rate,
-            income_tax_brackets=service.get_current_tax_brackets(),
-            system_currency=settings.system_currency,
-            date_format=settings.date_format,
-            created_at=settings.created_at,
-            updated_at=settings.updated_at,
-            updated_by=settings.updated_by
-        )
+        return SystemSettingsResponse.model_validate(settings)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -94,24 +64,7 @@ async def update_financial_settings(
     try:
         settings = service.update_financial_settings(data, current_user.email)
         
-        return SystemSettingsResponse(
-            id=settings.id,
-            company_name=settings.company_name,
-            company_tax_number=settings.company_tax_number,
-            company_address=settings.company_address,
-            company_phone=settings.company_phone,
-            company_logo_url=settings.company_logo_url,
-            minimum_wage=settings.minimum_wage,
-            sgk_employee_rate=settings.sgk_employee_rate,
-            sgk_employer_rate=settings.sgk_employer_rate,
-            unemployment_insurance_rate=settings.unemployment_insurance_rate,
-            income_tax_brackets=service.get_current_tax_brackets(),
-            system_currency=settings.system_currency,
-            date_format=settings.date_format,
-            created_at=settings.created_at,
-            updated_at=settings.updated_at,
-            updated_by=settings.updated_by
-        )
+        return SystemSettingsResponse.model_validate(settings)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -120,21 +73,25 @@ async def update_financial_settings(
 
 @router.get("/minimum-wage")
 async def get_current_minimum_wage(
+    request: Request,
+    response: Response,
     current_user: TokenData = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    """Mevcut asgari ücreti getir"""
+    """Mevcut asgari ücreti getir (ETag / If-None-Match destekli)"""
     service = SettingsService(db)
-    return {"minimum_wage": service.get_current_minimum_wage()}
+    return _etag_response(request, response, service.get_minimum_wage_snapshot())
 
 @router.get("/sgk-rates")
 async def get_current_sgk_rates(
+    request: Request,
+    response: Response,
     current_user: TokenData = Depends(require_admin),
     db: Session = Depends(get_db)
 ):
-    """Mevcut SGK oranlarını getir"""
+    """Mevcut SGK oranlarını getir (ETag / If-None-Match destekli)"""
     service = SettingsService(db)
-    return service.get_current_sgk_rates()
+    return _etag_response(request, response, service.get_sgk_rates_snapshot())
 
 @router.put("/security", response_model=SystemSettingsResponse)
 async def update_security_settings(
@@ -49,16 +49,38 @@ class PayrollCreate(PayrollBase):
 class PayrollUpdate(BaseModel):
     status: Optional[PayrollStatus] = None
 
+class PayrollBulkStatusUpdate(BaseModel):
+    status: PayrollStatus  # Hedef durum
+    # Seçim: ID listesi veya filtre (ikisi birden verilirse birlikte uygulanır)
+    payroll_ids: Optional[List[int]] = Field(None, description="Güncellenecek bordro ID'leri")
+    employee_id: Optional[int] = None
+    status_filter: Optional[PayrollStatus] = None
+    date_start: Optional[date] = None
+    date_end: Optional[date] = None
+
+class PayrollBulkStatusResult(BaseModel):
+    status: PayrollStatus
+    matched: int  # Seçime uyan bordro sayısı
+    updated: int  # Durumu değiştirilen bordro sayısı
+    unchanged: int  # Zaten hedef durumda olduğu için dokunulmayan bordro sayısı
+    rejected: int  # Geçişe izin verilmediği için değiştirilmeyen bordro sayısı
+
 class PayrollCalculated(BaseModel):
     gross_salary: float
     deductions: Dict[str, Any]
     net_salary: float
+    tax_base: Optional[float] = None  # Gelir vergisi matrahı
+    employer_sgk_premium: Optional[float] = None  # SGK işveren payı
+    employer_cost: Optional[float] = None  # Toplam işveren maliyeti
 
 class Payroll(PayrollBase):
     id: int
     gross_salary: float
     deductions: Dict[str, Any]
     net_salary: float
+    tax_base: Optional[float] = None
+    employer_sgk_premium: Optional[float] = None
+    employer_cost: Optional[float] = None
     status: PayrollStatus = PayrollStatus.DRAFT
     created_at: datetime
     employee: Employee
@@ -77,6 +99,99 @@ class PayrollSummary(BaseModel):
     status: PayrollStatus
     created_at: datetime
 
+class LabourCostRow(BaseModel):
+    year: int
+    month: int
+    title: str
+    payroll_count: int
+    total_gross: float
+    total_net: float
+    total_employer_sgk: float
+    total_employer_cost: float
+
+    class Config:
+        from_attributes = True
+
+class DeductionTotals(BaseModel):
+    year: int
+    month: int
+    payroll_count: int
+    total_income_tax: float
+    total_sgk_premium: float
+    total_unemployment_insurance: float
+    total_deductions: float
+
+class PayrollRecalculateParams(BaseModel):
+    effective_date: date  # Yeni finansal ayarların geçerlilik tarihi
+    dry_run: bool = False  # True ise sadece fark raporu üretilir, kayıt yazılmaz
+
+class PayrollRecalculationChange(BaseModel):
+    payroll_id: int
+    employee_id: int
+    pay_period_start: date
+    old_net_salary: float
+    new_net_salary: float
+    old_income_tax: Optional[float] = None
+    new_income_tax: float
+    old_total_deductions: Optional[float] = None
+    new_total_deductions: float
+
+class PayrollRecalculationResult(BaseModel):
+    effective_date: date
+    dry_run: bool
+    matched: int  # İncelenen taslak bordro sayısı
+    changed: int  # Tutarı değişen (güncellenen) bordro sayısı
+    unchanged: int
+    net_salary_difference: float  # Toplam net maaş farkı (yeni - eski)
+    income_tax_difference: float
+    total_deductions_difference: float
+    changes: List[PayrollRecalculationChange]  # Değişen bordroların ilk RECALCULATION_REPORT_LIMIT kaydı
+
+# Job Schemas
+class JobStatus(str, Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+class JobCreate(BaseModel):
+    job_type: str = Field(..., description="Kayıtlı iş tipi (ör. payroll_bulk_create, payroll_export)")
+    params: Dict[str, Any] = Field(default_factory=dict, description="İş tipine özgü parametreler")
+
+class PayrollBulkCreateParams(BaseModel):
+    pay_period_start: date
+    pay_period_end: date
+    employee_ids: Optional[List[int]] = Field(None, description="Boş bırakılırsa tüm aktif çalışanlar")
+
+class PayrollExportParams(BaseModel):
+    include_inactive: bool = False
+    employee_search: Optional[str] = None
+    status_filter: Optional[PayrollStatus] = None
+    date_start: Optional[date] = None
+    date_end: Optional[date] = None
+
+class Job(BaseModel):
+    id: int
+    job_type: str
+    status: JobStatus
+    params: Optional[Dict[str, Any]] = None
+    progress_done: int
+    progress_total: Optional[int] = None
+    result: Optional[Dict[str, Any]] = None
+    has_result_file: bool = False  # Sonuç dosyası /api/jobs/{id}/result adresinden indirilebilir
+    error: Optional[str] = None
+    cancel_requested: bool
+    created_by: Optional[str] = None
+    owner: Optional[str] = None  # İşi çalıştıran süreç (host:pid)
+    heartbeat_at: Optional[datetime] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
 # Dashboard Schemas
 class DashboardStats(BaseModel):
     total_employees: int
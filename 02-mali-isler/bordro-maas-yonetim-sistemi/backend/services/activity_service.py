@@ -0,0 +1,195 @@
+from sqlalchemy.orm import Session, Query
+from sqlalchemy import Integer, select, insert, literal, union_all, func
+from typing import List, Optional, Tuple
+from datetime import datetime
+import base64
+from models import ActivityEvent, Employee, Payroll, PayrollStatus
+from schemas import RecentActivity
+
+# Durum değişikliği olaylarında gösterilecek işlem başlıkları
+PAYROLL_STATUS_ACTIONS = {
+    PayrollStatus.DRAFT.value: "Bordro Taslağa Alındı",
+    PayrollStatus.APPROVED.value: "Bordro Onaylandı",
+    PayrollStatus.PAID.value: "Bordro Ödendi",
+    PayrollStatus.CANCELLED.value: "Bordro İptal Edildi",
+}
+
+def encode_activity_cursor(event_id: int) -> str:
+    """Akış sayfalama imleci: sayfadaki son olayın id değeri"""
+    return base64.urlsafe_b64encode(f"activity:{event_id}".encode()).decode()
+
+def decode_activity_cursor(cursor: str) -> int:
+    """İmleci olay id değerine çöz"""
+    try:
+        prefix, event_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        if prefix != "activity":
+            raise ValueError
+        return int(event_id)
+    except ValueError:
+        raise ValueError("Geçersiz sayfalama imleci")
+
+def format_relative_time(dt: datetime) -> str:
+    """Zamanı kullanıcı dostu formatta göster"""
+    now = datetime.now()
+    diff = now - dt
+
+    if diff.days == 0:
+        if diff.seconds < 3600:  # 1 saat
+            minutes = diff.seconds // 60
+            return f"{minutes} dakika önce" if minutes > 0 else "Az önce"
+        else:
+            hours = diff.seconds // 3600
+            return f"{hours} saat önce"
+    elif diff.days == 1:
+        return "Dün"
+    elif diff.days < 7:
+        return f"{diff.days} gün önce"
+    else:
+        return dt.strftime("%d.%m.%Y")
+
+class ActivityService:
+    """
+    Son işlemler akışı (activity_events)
+    Olaylar ilgili kayıtla aynı transaction içinde eklenir; commit çağıran serviste yapılır.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record(
+        self,
+        event_type: str,
+        category: str,
+        action: str,
+        details: str = None,
+        employee_id: int = None,
+        payroll_id: int = None
+    ) -> ActivityEvent:
+        """Olay ekle"""
+        event = ActivityEvent(
+            event_type=event_type,
+            category=category,
+            action=action,
+            details=details,
+            employee_id=employee_id,
+            payroll_id=payroll_id
+        )
+        self.db.add(event)
+        return event
+
+    def record_employee(self, event_type: str, action: str, employee: Employee) -> ActivityEvent:
+        """Çalışan olayı ekle"""
+        return self.record(
+            event_type, "employee", action,
+            details=f"{employee.first_name} {employee.last_name} - {employee.title}",
+            employee_id=employee.id
+        )
+
+    def record_payroll(self, event_type: str, action: str, payroll: Payroll, employee: Employee = None) -> ActivityEvent:
+        """Bordro olayı ekle"""
+        employee = employee or payroll.employee
+        return self.record(
+            event_type, "payroll", action,
+            details=f"{employee.first_name} {employee.last_name}",
+            employee_id=payroll.employee_id,
+            payroll_id=payroll.id
+        )
+
+    def record_payroll_status_query(self, payroll_query: Query, target_status: str) -> None:
+        """Toplu durum değişikliğinde sorguya uyan her bordro için olayı tek INSERT ... SELECT ile ekle"""
+        source = payroll_query.join(Employee, Payroll.employee_id == Employee.id).with_entities(
+            literal("payroll_status_changed"),
+            literal("payroll"),
+            literal(PAYROLL_STATUS_ACTIONS[target_status]),
+            Employee.first_name + " " + Employee.last_name,
+            Payroll.employee_id,
+            Payroll.id,
+            func.now()
+        ).order_by(Payroll.id)
+        self.db.execute(
+            insert(ActivityEvent).from_select(
+                ["event_type", "category", "action", "details", "employee_id", "payroll_id", "created_at"],
+                source
+            )
+        )
+
+    def get_feed(
+        self,
+        employee_id: int = None,
+        limit: int = 10,
+        cursor: str = None
+    ) -> Tuple[List[RecentActivity], Optional[str]]:
+        """
+        Son işlemler akışı - tek indeksli sorgu
+        employee_id verilirse yalnızca o çalışana ait olaylar döner.
+        Olaylar eklenme sırasıyla id aldığı için id üzerinden keyset sayfalama yapılır.
+        Dönüş: (olaylar, sonraki sayfa imleci veya None)
+        """
+        query = self.db.query(ActivityEvent)
+        if employee_id is not None:
+            query = query.filter(ActivityEvent.employee_id == employee_id)
+        if cursor:
+            query = query.filter(ActivityEvent.id < decode_activity_cursor(cursor))
+
+        events = query.order_by(ActivityEvent.id.desc()).limit(limit).all()
+
+        activities = [
+            RecentActivity(
+                key=f"{event.category}_{event.id}",
+                action=event.action,
+                details=event.details or "",
+                time=format_relative_time(event.created_at),
+                type=event.category
+            ) for event in events
+        ]
+
+        # Hiç olay yoksa sistem mesajı göster
+        if not activities and not cursor and employee_id is None:
+            activities = [
+                RecentActivity(
+                    key="system_1",
+                    action="Sistem Başlatıldı",
+                    details="Bordro ve maaş yönetim sistemi aktif",
+                    time="Bugün",
+                    type="system"
+                )
+            ]
+
+        next_cursor = encode_activity_cursor(events[-1].id) if len(events) == limit else None
+        return activities, next_cursor
+
+def backfill_activity_events(engine) -> None:
+    """
+    Olay tablosu boşsa mevcut çalışan ve bordro kayıtlarından oluşturma olaylarını üret
+    (olay tablosundan önceki veriler için, başlangıçta bir kez)
+    """
+    employees = select(
+        literal("employee_created").label("event_type"),
+        literal("employee").label("category"),
+        literal("Çalışan Eklendi").label("action"),
+        (Employee.first_name + " " + Employee.last_name + " - " + Employee.title).label("details"),
+        Employee.id.label("employee_id"),
+        literal(None, type_=Integer).label("payroll_id"),
+        Employee.created_at.label("created_at")
+    )
+    payrolls = select(
+        literal("payroll_created"),
+        literal("payroll"),
+        literal("Bordro Oluşturuldu"),
+        Employee.first_name + " " + Employee.last_name,
+        Payroll.employee_id,
+        Payroll.id,
+        Payroll.created_at
+    ).join(Employee, Payroll.employee_id == Employee.id)
+    # Eski kayıtlar oluşturulma sırasıyla eklenir; böylece id sırası zaman sırasını izler
+    source = union_all(employees, payrolls).subquery()
+
+    with engine.begin() as conn:
+        if conn.execute(select(ActivityEvent.id).limit(1)).first() is not None:
+            return
+        conn.execute(
+            insert(ActivityEvent).from_select(
+                ["event_type", "category", "action", "details", "employee_id", "payroll_id", "created_at"],
+                select(source).order_by(source.c.created_at)
+            )
+        )
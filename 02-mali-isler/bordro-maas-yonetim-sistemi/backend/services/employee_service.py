@@ -2,10 +2,12 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from models import Employee
 from schemas import EmployeeCreate, EmployeeUpdate
+from services.activity_service import ActivityService
 
 class EmployeeService:
     def __init__(self, db: Session):
         self.db = db
+        self.activity_service = ActivityService(db)
 
     def create_employee(self, employee_data: EmployeeCreate) -> Employee:
         """Yeni çalışan oluştur"""
@@ -19,6 +21,8 @@ class EmployeeService:
         
         db_employee = Employee(**employee_data.model_dump())
         self.db.add(db_employee)
+        self.db.flush()
+        self.activity_service.record_employee("employee_created", "Çalışan Eklendi", db_employee)
         self.db.commit()
         self.db.refresh(db_employee)
         return db_employee
@@ -84,6 +88,8 @@ class EmployeeService:
         for key, value in update_data.items():
             setattr(db_employee, key, value)
         
+        if update_data:
+            self.activity_service.record_employee("employee_updated", "Çalışan Güncellendi", db_employee)
         self.db.commit()
         self.db.refresh(db_employee)
         return db_employee
@@ -95,6 +101,7 @@ class EmployeeService:
             return False
         
         db_employee.is_active = False
+        self.activity_service.record_employee("employee_deactivated", "Çalışan Pasifleştirildi", db_employee)
         self.db.commit()
         return True
 
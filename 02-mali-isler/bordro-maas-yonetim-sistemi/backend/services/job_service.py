@@ -0,0 +1,280 @@
+"""
+Uzun süreli işlemler için süreç içi iş kuyruğu
+
+İşler kalıcı `jobs` tablosunda tutulur; çalıştırma takılabilir bir executor ile yapılır
+(varsayılan: thread havuzu). İş tipleri `register_job` ile kaydedilir; her iş kendi veritabanı
+oturumunu kullanır, ilerlemeyi JobContext üzerinden yazar ve iptal isteğini parti aralarında kontrol eder.
+
+Her iş kuyruğa alan sürece (host:pid) aittir; süreç, sahip olduğu bekleyen/çalışan işlerin heartbeat_at
+alanını düzenli olarak günceller. Başlangıçta yalnızca heartbeat'i eskimiş (sahibi durmuş) işler hata
+olarak işaretlenir; aynı veritabanını kullanan diğer süreçlerin işlerine dokunulmaz.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import select, update, func
+from pydantic import BaseModel, ValidationError
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Type
+import logging
+import os
+import socket
+import tempfile
+import threading
+from database import SessionLocal
+from models import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Dışa aktarma gibi dosya üreten işlerin çıktı dizini
+JOB_RESULT_DIR = os.getenv("JOB_RESULT_DIR", os.path.join(tempfile.gettempdir(), "bordro_job_results"))
+# Sahip sürecin heartbeat aralığı ve bir işin sahipsiz sayılması için geçmesi gereken süre (saniye)
+JOB_HEARTBEAT_SECONDS = int(os.getenv("JOB_HEARTBEAT_SECONDS", "30"))
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "300"))
+
+def job_owner() -> str:
+    """Bu sürecin iş sahibi kimliği (fork sonrası pid değiştiği için her seferinde hesaplanır)"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class JobCancelled(Exception):
+    """İş, iptal isteği üzerine durduruldu"""
+
+class JobContext:
+    """Çalışan işin parametreleri, veritabanı oturumu ve ilerleme/iptal yardımcıları"""
+
+    def __init__(self, job_id: int, params: Dict[str, Any], db: Session):
+        self.job_id = job_id
+        self.params = params or {}
+        self.db = db
+        self.result_location: Optional[str] = None
+
+    def set_progress(self, done: int, total: int = None) -> None:
+        """
+        İlerlemeyi ayrı bağlantıyla yaz
+        İşin kendi oturumu commit edildikten sonra çağrılmalıdır (SQLite yazma kilidi)
+        """
+        values = {"progress_done": done}
+        if total is not None:
+            values["progress_total"] = total
+        with self.db.get_bind().begin() as conn:
+            conn.execute(update(Job).where(Job.id == self.job_id).values(**values))
+
+    def check_cancelled(self) -> None:
+        """İptal istenmişse JobCancelled fırlat (işler parti aralarında çağırır)"""
+        with self.db.get_bind().connect() as conn:
+            cancel_requested = conn.execute(
+                select(Job.cancel_requested).where(Job.id == self.job_id)
+            ).scalar()
+        if cancel_requested:
+            raise JobCancelled()
+
+    def result_path(self, filename: str) -> str:
+        """İşe ait sonuç dosyası yolu (dizin yoksa oluşturulur)"""
+        os.makedirs(JOB_RESULT_DIR, exist_ok=True)
+        self.result_location = os.path.join(JOB_RESULT_DIR, f"job_{self.job_id}_{filename}")
+        return self.result_location
+
+@dataclass
+class JobDefinition:
+    handler: Callable[[JobContext], Optional[dict]]  # Sonuç özeti sözlüğü döndürür
+    params_model: Optional[Type[BaseModel]] = None  # Kuyruğa almadan önce parametre doğrulaması
+
+# İş tipi -> tanım
+JOB_DEFINITIONS: Dict[str, JobDefinition] = {}
+
+def register_job(job_type: str, params_model: Type[BaseModel] = None):
+    """İş tipi kaydı için dekoratör"""
+    def decorator(handler: Callable[[JobContext], Optional[dict]]):
+        JOB_DEFINITIONS[job_type] = JobDefinition(handler=handler, params_model=params_model)
+        return handler
+    return decorator
+
+class JobRunner:
+    """İşleri executor üzerinde çalıştırır; executor değiştirilebilir (ör. testlerde senkron, ileride süreç havuzu)"""
+
+    def __init__(self, executor: Executor = None):
+        self._executor = executor
+        self._heartbeat_stop: Optional[threading.Event] = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+        return self._executor
+
+    def set_executor(self, executor: Executor) -> None:
+        self._executor = executor
+
+    def shutdown(self) -> None:
+        if self._heartbeat_stop is not None:
+            self._heartbeat_stop.set()
+            self._heartbeat_stop = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def submit(self, job_id: int) -> None:
+        self._start_heartbeat()
+        self.executor.submit(self.run, job_id)
+
+    def _start_heartbeat(self) -> None:
+        """Bu sürecin bekleyen/çalışan işleri için heartbeat iş parçacığını başlat (bir kez)"""
+        if self._heartbeat_stop is not None:
+            return
+        self._heartbeat_stop = threading.Event()
+        threading.Thread(
+            target=self._heartbeat, args=(self._heartbeat_stop,), name="job-heartbeat", daemon=True
+        ).start()
+
+    def _heartbeat(self, stop: threading.Event) -> None:
+        while not stop.wait(JOB_HEARTBEAT_SECONDS):
+            db = SessionLocal()
+            try:
+                touch_owned_jobs(db.get_bind())
+            except Exception:
+                logger.exception("İş heartbeat güncellemesi başarısız")
+            finally:
+                db.close()
+
+    def run(self, job_id: int) -> None:
+        """İşi çalıştır ve sonucunu kaydet (executor iş parçacığında)"""
+        db = SessionLocal()
+        try:
+            # Yalnızca hâlâ bekleyen iş başlatılır (kuyruktayken iptal edilmiş olabilir)
+            now = datetime.now()
+            started = db.execute(
+                update(Job).where(
+                    Job.id == job_id,
+                    Job.status == JobStatus.PENDING.value
+                ).values(status=JobStatus.RUNNING.value, started_at=now, owner=job_owner(), heartbeat_at=now)
+            ).rowcount
+            db.commit()
+            if not started:
+                return
+
+            context = None
+            try:
+                # İş tipi ve bağlam da try içinde çözülür: hata işi RUNNING'de bırakmaz
+                job = db.query(Job).filter(Job.id == job_id).first()
+                context = JobContext(job.id, job.params, db)
+                definition = JOB_DEFINITIONS.get(job.job_type)
+                if definition is None:
+                    raise ValueError(f"Bilinmeyen iş tipi: {job.job_type}")
+                result = definition.handler(context)
+                status, error = JobStatus.SUCCEEDED.value, None
+            except JobCancelled:
+                db.rollback()
+                result, status, error = None, JobStatus.CANCELLED.value, None
+            except Exception as e:
+                db.rollback()
+                logger.exception("İş %s başarısız oldu", job_id)
+                result, status, error = None, JobStatus.FAILED.value, str(e)
+
+            values = {
+                "status": status,
+                "result": result,
+                "result_location": context.result_location if status == JobStatus.SUCCEEDED.value else None,
+                "error": error,
+                "finished_at": datetime.now(),
+            }
+            if status == JobStatus.SUCCEEDED.value:
+                values["progress_done"] = func.coalesce(Job.progress_total, Job.progress_done)
+            db.execute(update(Job).where(Job.id == job_id).values(**values))
+            db.commit()
+        finally:
+            db.close()
+
+job_runner = JobRunner()
+
+class JobService:
+    def __init__(self, db: Session, runner: JobRunner = None):
+        self.db = db
+        self.runner = runner or job_runner
+
+    def submit_job(self, job_type: str, params: Dict[str, Any], created_by: str = None) -> Job:
+        """İşi kaydet ve kuyruğa al (hemen döner)"""
+        definition = JOB_DEFINITIONS.get(job_type)
+        if definition is None:
+            raise ValueError(f"Bilinmeyen iş tipi: {job_type}")
+        if definition.params_model is not None:
+            try:
+                params = definition.params_model(**(params or {})).model_dump(mode="json")
+            except ValidationError as e:
+                raise ValueError(f"Geçersiz iş parametreleri: {e}")
+
+        job = Job(
+            job_type=job_type, params=params, created_by=created_by, status=JobStatus.PENDING.value,
+            owner=job_owner(), heartbeat_at=datetime.now()
+        )
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        self.runner.submit(job.id)
+        return job
+
+    def get_job(self, job_id: int) -> Optional[Job]:
+        return self.db.query(Job).filter(Job.id == job_id).first()
+
+    def get_jobs(self, status: str = None, limit: int = 50) -> List[Job]:
+        """Son işler (en yeni önce)"""
+        query = self.db.query(Job)
+        if status:
+            query = query.filter(Job.status == status)
+        return query.order_by(Job.id.desc()).limit(limit).all()
+
+    def cancel_job(self, job_id: int) -> Optional[Job]:
+        """
+        İşi iptal et: bekleyen iş hemen iptal edilir, çalışan işe iptal isteği bırakılır
+        (iş bir sonraki parti kontrolünde durur). Bitmiş işler değişmez; işin güncel durumu döner.
+        """
+        job = self.get_job(job_id)
+        if not job:
+            return None
+
+        cancelled = 0
+        if job.status == JobStatus.PENDING.value:
+            cancelled = self.db.execute(
+                update(Job).where(Job.id == job_id, Job.status == JobStatus.PENDING.value).values(
+                    status=JobStatus.CANCELLED.value, cancel_requested=True, finished_at=datetime.now()
+                )
+            ).rowcount
+        if not cancelled:
+            # Çalışan iş (veya okuma ile güncelleme arasında başlamış iş) için iptal isteği
+            self.db.execute(
+                update(Job).where(Job.id == job_id, Job.status == JobStatus.RUNNING.value).values(
+                    cancel_requested=True
+                )
+            )
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+def touch_owned_jobs(engine) -> None:
+    """Bu sürecin sahip olduğu bekleyen/çalışan işlerin heartbeat'ini güncelle"""
+    with engine.begin() as conn:
+        conn.execute(
+            update(Job).where(
+                Job.owner == job_owner(),
+                Job.status.in_([JobStatus.PENDING.value, JobStatus.RUNNING.value])
+            ).values(heartbeat_at=datetime.now())
+        )
+
+def recover_interrupted_jobs(engine) -> None:
+    """
+    Sahibi durmuş (heartbeat'i JOB_STALE_SECONDS'tan eski) bekleyen/çalışan işleri hata olarak işaretle
+    (başlangıçta). Heartbeat'i olmayan eski kayıtlarda başlama/oluşturulma zamanı kullanılır.
+    """
+    cutoff = datetime.now() - timedelta(seconds=JOB_STALE_SECONDS)
+    last_seen = func.coalesce(Job.heartbeat_at, Job.started_at, Job.created_at)
+    with engine.begin() as conn:
+        conn.execute(
+            update(Job).where(
+                Job.status.in_([JobStatus.PENDING.value, JobStatus.RUNNING.value]),
+                last_seen < cutoff
+            ).values(
+                status=JobStatus.FAILED.value,
+                error="İşi çalıştıran süreç durduğu için iş yarıda kaldı",
+                finished_at=datetime.now()
+            )
+        )
@@ -0,0 +1,169 @@
+from sqlalchemy.orm import Session, Query
+from sqlalchemy import func, extract, select, delete, insert, update
+from typing import Iterable, List
+from models import Payroll, PayrollPeriodRollup, PayrollStatus, Employee
+
+def payroll_title():
+    """Bordronun unvanı; unvanı olmayan eski bordrolar için çalışanın mevcut unvanı"""
+    employee_title = select(Employee.title).where(Employee.id == Payroll.employee_id).scalar_subquery()
+    return func.coalesce(Payroll.title, employee_title)
+
+def backfill_titles_statement():
+    """Unvanı olmayan eski bordrolara çalışanın mevcut unvanını yazan UPDATE"""
+    return update(Payroll).where(Payroll.title.is_(None)).values(
+        title=select(Employee.title).where(Employee.id == Payroll.employee_id).scalar_subquery()
+    )
+
+def backfill_period_rollups(engine) -> None:
+    """
+    Başlangıçta: unvan kolonundan önceki bordroların unvanını doldur (dönem özeti unvanı boş olamaz)
+    ve özet tablosu boşken bordro varsa özetleri bir kez yeniden oluştur. Aksi halde özet tablosundan
+    önceki bordroların iptal/silme farkları olmayan satırlardan düşülür ve negatif özetler oluşur.
+    """
+    with engine.begin() as conn:
+        conn.execute(backfill_titles_statement())
+    with Session(engine) as db:
+        if db.execute(select(PayrollPeriodRollup.id).limit(1)).first() is not None:
+            return
+        if db.execute(select(Payroll.id).limit(1)).first() is not None:
+            LedgerService(db).rebuild()
+
+class LedgerService:
+    """
+    Dönem (yıl/ay) ve unvan bazında işveren maliyeti özetleri
+    Özetler bordro oluşturma/iptal/silme işlemleriyle aynı transaction içinde
+    artımlı güncellenir; commit çağıran serviste yapılır.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _insert(self):
+        """Dialect'e uygun INSERT ... ON CONFLICT yapısı"""
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            raise NotImplementedError(f"{dialect} veritabanı için UPSERT desteklenmiyor")
+        return dialect_insert(PayrollPeriodRollup)
+
+    def apply_deltas(self, deltas: List[dict]) -> None:
+        """(yıl, ay, unvan) özetlerini artır/azalt (satır yoksa oluşturur)"""
+        if not deltas:
+            return
+        stmt = self._insert()
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["year", "month", "title"],
+            set_={
+                "payroll_count": PayrollPeriodRollup.payroll_count + stmt.excluded.payroll_count,
+                "total_gross": PayrollPeriodRollup.total_gross + stmt.excluded.total_gross,
+                "total_net": PayrollPeriodRollup.total_net + stmt.excluded.total_net,
+                "total_employer_sgk": PayrollPeriodRollup.total_employer_sgk + stmt.excluded.total_employer_sgk,
+                "total_employer_cost": PayrollPeriodRollup.total_employer_cost + stmt.excluded.total_employer_cost,
+                "updated_at": func.now(),
+            }
+        )
+        self.db.execute(stmt, deltas)
+
+    def _payroll_delta(self, payroll: Payroll, sign: int) -> dict:
+        return {
+            "year": payroll.pay_period_start.year,
+            "month": payroll.pay_period_start.month,
+            # Unvanı olmayan eski bordrolar çalışanın mevcut unvanıyla özetlenir (rebuild ile aynı)
+            "title": payroll.title or payroll.employee.title,
+            "payroll_count": sign,
+            "total_gross": sign * payroll.gross_salary,
+            "total_net": sign * payroll.net_salary,
+            "total_employer_sgk": sign * (payroll.employer_sgk_premium or 0.0),
+            "total_employer_cost": sign * (payroll.employer_cost or payroll.gross_salary),
+        }
+
+    def add_payroll(self, payroll: Payroll) -> None:
+        """Yeni bordroyu dönem özetine ekle"""
+        self.apply_deltas([self._payroll_delta(payroll, 1)])
+
+    def remove_payrolls(self, payrolls: Iterable[Payroll]) -> None:
+        """İptal edilen/silinen bordroları dönem özetinden düş"""
+        self.apply_deltas([self._payroll_delta(p, -1) for p in payrolls])
+
+    def remove_payroll_query(self, payroll_query: Query) -> None:
+        """Sorguya uyan bordroları (yıl, ay, unvan) bazında gruplayarak düş"""
+        year = extract("year", Payroll.pay_period_start)
+        month = extract("month", Payroll.pay_period_start)
+        title = payroll_title()
+        rows = payroll_query.with_entities(
+            year.label("year"),
+            month.label("month"),
+            title.label("title"),
+            func.count(Payroll.id).label("payroll_count"),
+            func.sum(Payroll.gross_salary).label("gross"),
+            func.sum(Payroll.net_salary).label("net"),
+            func.sum(func.coalesce(Payroll.employer_sgk_premium, 0.0)).label("employer_sgk"),
+            func.sum(func.coalesce(Payroll.employer_cost, Payroll.gross_salary)).label("employer_cost")
+        ).group_by(year, month, title).all()
+
+        self.apply_deltas([
+            {
+                "year": int(r.year),
+                "month": int(r.month),
+                "title": r.title,
+                "payroll_count": -r.payroll_count,
+                "total_gross": -float(r.gross),
+                "total_net": -float(r.net),
+                "total_employer_sgk": -float(r.employer_sgk),
+                "total_employer_cost": -float(r.employer_cost),
+            } for r in rows
+        ])
+
+    def get_labour_cost(self, year: int, month: int = None, title: str = None) -> List[PayrollPeriodRollup]:
+        """Önceden toplanmış dönem özetlerini getir (bordro tablosu taranmaz)"""
+        query = self.db.query(PayrollPeriodRollup).filter(
+            PayrollPeriodRollup.year == year,
+            PayrollPeriodRollup.payroll_count > 0
+        )
+        if month:
+            query = query.filter(PayrollPeriodRollup.month == month)
+        if title:
+            query = query.filter(PayrollPeriodRollup.title == title)
+        return query.order_by(PayrollPeriodRollup.month, PayrollPeriodRollup.title).all()
+
+    def rebuild(self, year: int = None) -> int:
+        """Özetleri bordro tablosundan yeniden oluştur (geçmiş veri/backfill için)"""
+        self.db.execute(backfill_titles_statement())
+
+        payroll_year = extract("year", Payroll.pay_period_start)
+        payroll_month = extract("month", Payroll.pay_period_start)
+
+        delete_stmt = delete(PayrollPeriodRollup)
+        source = select(
+            payroll_year,
+            payroll_month,
+            Payroll.title,
+            func.count(Payroll.id),
+            func.sum(Payroll.gross_salary),
+            func.sum(Payroll.net_salary),
+            func.sum(func.coalesce(Payroll.employer_sgk_premium, 0.0)),
+            func.sum(func.coalesce(Payroll.employer_cost, Payroll.gross_salary)),
+            func.now()
+        ).where(
+            Payroll.status != PayrollStatus.CANCELLED.value
+        ).group_by(payroll_year, payroll_month, Payroll.title)
+
+        if year is not None:
+            delete_stmt = delete_stmt.where(PayrollPeriodRollup.year == year)
+            source = source.where(payroll_year == year)
+
+        self.db.execute(delete_stmt)
+        result = self.db.execute(
+            insert(PayrollPeriodRollup).from_select(
+                [
+                    "year", "month", "title", "payroll_count", "total_gross", "total_net",
+                    "total_employer_sgk", "total_employer_cost", "updated_at"
+                ],
+                source
+            )
+        )
+        self.db.commit()
+        return result.rowcount
@@ -0,0 +1,183 @@
+"""
+Bordro para aritmetiği: tüm tutarlar tamsayı kuruş, oranlar tamsayı "milyonda bir yüzde"
+(14.0% -> 140000) olarak tutulur. Her kesinti kuruşa bir kez, yarım yukarı yuvarlanır;
+net maaş kuruş cinsinden tam çıkarma ile bulunur. Böylece toplu çalıştırmalarda bordro
+toplamları banka dosyasıyla birebir tutar.
+
+Tekil hesaplama saf Python tamsayıları ile, toplu hesaplama int64 NumPy dizileri ile yapılır;
+iki yol aynı sonucu üretir.
+"""
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
+from typing import List, Optional
+
+import numpy as np
+
+KURUS_PER_LIRA = 100
+# Oran ölçeği: yüzde değeri 10^4 ile çarpılır, tutar * oran / 10^6 kuruş verir
+RATE_SCALE = 10_000
+RATE_DIVISOR = 100 * RATE_SCALE
+
+_CENT = Decimal("0.01")
+
+def to_kurus(amount) -> int:
+    """TL tutarını (float/Decimal/str) yarım yukarı yuvarlayarak kuruşa çevir"""
+    return int(Decimal(str(amount)).quantize(_CENT, rounding=ROUND_HALF_UP) * KURUS_PER_LIRA)
+
+def from_kurus(kurus: int) -> float:
+    """Kuruşu API'de kullanılan TL değerine çevir"""
+    return float(Decimal(int(kurus)) / KURUS_PER_LIRA)
+
+def to_rate(percent) -> int:
+    """Yüzde oranını (ör. 15.5) tamsayı ölçekli orana çevir"""
+    return int(Decimal(str(percent)) * RATE_SCALE)
+
+def div_round_half_up(numerator: int, divisor: int) -> int:
+    """Tamsayı bölme, yarım yukarı (sıfırdan uzağa) yuvarlama"""
+    if numerator >= 0:
+        return (2 * numerator + divisor) // (2 * divisor)
+    return -((-2 * numerator + divisor) // (2 * divisor))
+
+def percent_of(kurus: int, rate: int) -> int:
+    """Kuruş tutarın ölçekli oran kadarını kuruşa yuvarlanmış olarak döndür"""
+    return div_round_half_up(kurus * rate, RATE_DIVISOR)
+
+@dataclass
+class MoneyBracket:
+    """Kuruş/ölçekli oran cinsinden gelir vergisi dilimi"""
+    min_kurus: int
+    max_kurus: Optional[int]  # None = sınırsız
+    rate: int
+
+def to_money_brackets(tax_brackets: List) -> List[MoneyBracket]:
+    """TaxBracket listesini kuruş cinsinden dilimlere çevir"""
+    return [
+        MoneyBracket(
+            min_kurus=to_kurus(b.min_amount),
+            max_kurus=to_kurus(b.max_amount) if b.max_amount else None,
+            rate=to_rate(b.rate)
+        ) for b in tax_brackets
+    ]
+
+def _bracket_tax_numerator(amount_kurus: int, brackets: List[MoneyBracket]) -> int:
+    """Yuvarlanmamış dilim vergisi (kuruş * ölçekli oran)"""
+    total = 0
+    for bracket in brackets:
+        width = amount_kurus - bracket.min_kurus
+        if bracket.max_kurus is not None:
+            width = min(width, bracket.max_kurus - bracket.min_kurus)
+        if width > 0:
+            total += width * bracket.rate
+    return total
+
+@dataclass
+class PayrollAmounts:
+    """Tek bordronun kuruş cinsinden tutarları"""
+    gross: int
+    sgk_premium: int
+    unemployment_insurance: int
+    tax_base: int
+    income_tax: int
+    total_deductions: int
+    net: int
+    employer_sgk_premium: int
+    employer_cost: int
+
+def calculate_amounts(
+    gross_kurus: int,
+    sgk_rate: int,
+    unemployment_rate: int,
+    employer_rate: int,
+    brackets: List[MoneyBracket],
+    cumulative_tax_base_kurus: int = 0,
+    flat_tax_rate: int = to_rate(15)
+) -> PayrollAmounts:
+    """
+    Bordro tutarlarını kuruş cinsinden hesapla
+    Dilim vergisi T(kümülatif + matrah) - T(kümülatif) farkı olarak tek seferde yuvarlanır
+    """
+    sgk_premium = percent_of(gross_kurus, sgk_rate)
+    unemployment_insurance = percent_of(gross_kurus, unemployment_rate)
+    tax_base = gross_kurus - sgk_premium - unemployment_insurance
+
+    if brackets:
+        income_tax = div_round_half_up(
+            _bracket_tax_numerator(cumulative_tax_base_kurus + tax_base, brackets)
+            - _bracket_tax_numerator(cumulative_tax_base_kurus, brackets),
+            RATE_DIVISOR
+        )
+    else:
+        income_tax = percent_of(tax_base, flat_tax_rate)
+
+    total_deductions = income_tax + sgk_premium + unemployment_insurance
+    employer_sgk_premium = percent_of(gross_kurus, employer_rate)
+    return PayrollAmounts(
+        gross=gross_kurus,
+        sgk_premium=sgk_premium,
+        unemployment_insurance=unemployment_insurance,
+        tax_base=tax_base,
+        income_tax=income_tax,
+        total_deductions=total_deductions,
+        net=gross_kurus - total_deductions,
+        employer_sgk_premium=employer_sgk_premium,
+        employer_cost=gross_kurus + employer_sgk_premium
+    )
+
+# --- Toplu (vektörel) hesaplama ---
+
+def _div_round_half_up_array(numerator: np.ndarray, divisor: int) -> np.ndarray:
+    """div_round_half_up'ın int64 dizi karşılığı"""
+    magnitude = (2 * np.abs(numerator) + divisor) // (2 * divisor)
+    return np.where(numerator >= 0, magnitude, -magnitude)
+
+def _bracket_tax_numerator_array(amount_kurus: np.ndarray, brackets: List[MoneyBracket]) -> np.ndarray:
+    total = np.zeros_like(amount_kurus)
+    for bracket in brackets:
+        width = amount_kurus - bracket.min_kurus
+        if bracket.max_kurus is not None:
+            width = np.minimum(width, bracket.max_kurus - bracket.min_kurus)
+        total += np.maximum(width, 0) * bracket.rate
+    return total
+
+def calculate_amounts_batch(
+    gross_kurus: np.ndarray,
+    sgk_rate: int,
+    unemployment_rate: int,
+    employer_rate: int,
+    brackets: List[MoneyBracket],
+    cumulative_tax_base_kurus: np.ndarray = None,
+    flat_tax_rate: int = to_rate(15)
+) -> dict:
+    """calculate_amounts'ın int64 NumPy dizileri üzerinde çalışan karşılığı (aynı sonuçlar)"""
+    gross = np.asarray(gross_kurus, dtype=np.int64)
+    cumulative = (
+        np.zeros_like(gross) if cumulative_tax_base_kurus is None
+        else np.asarray(cumulative_tax_base_kurus, dtype=np.int64)
+    )
+
+    sgk_premium = _div_round_half_up_array(gross * sgk_rate, RATE_DIVISOR)
+    unemployment_insurance = _div_round_half_up_array(gross * unemployment_rate, RATE_DIVISOR)
+    tax_base = gross - sgk_premium - unemployment_insurance
+
+    if brackets:
+        income_tax = _div_round_half_up_array(
+            _bracket_tax_numerator_array(cumulative + tax_base, brackets)
+            - _bracket_tax_numerator_array(cumulative, brackets),
+            RATE_DIVISOR
+        )
+    else:
+        income_tax = _div_round_half_up_array(tax_base * flat_tax_rate, RATE_DIVISOR)
+
+    total_deductions = income_tax + sgk_premium + unemployment_insurance
+    employer_sgk_premium = _div_round_half_up_array(gross * employer_rate, RATE_DIVISOR)
+    return {
+        "gross": gross,
+        "sgk_premium": sgk_premium,
+        "unemployment_insurance": unemployment_insurance,
+        "tax_base": tax_base,
+        "income_tax": income_tax,
+        "total_deductions": total_deductions,
+        "net": gross - total_deductions,
+        "employer_sgk_premium": employer_sgk_premium,
+        "employer_cost": gross + employer_sgk_premium,
+    }
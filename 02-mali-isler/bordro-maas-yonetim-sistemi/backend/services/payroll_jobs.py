@@ -0,0 +1,91 @@
+"""Arka plan iş kuyruğunda çalışan bordro işlemleri (bkz. services/job_service.py)"""
+import csv
+from models import Employee
+from schemas import PayrollCreate, PayrollBulkCreateParams, PayrollExportParams, PayrollRecalculateParams
+from services.job_service import JobContext, register_job
+from services.payroll_service import PayrollService, encode_payroll_cursor
+
+JOB_BATCH_SIZE = 100
+EXPORT_PAGE_SIZE = 1000
+
+@register_job("payroll_bulk_create", params_model=PayrollBulkCreateParams)
+def bulk_create_payrolls(context: JobContext) -> dict:
+    """Dönem için seçili (varsayılan: tüm aktif) çalışanlara bordro oluştur; mevcut bordrolar atlanır"""
+    params = PayrollBulkCreateParams(**context.params)
+    service = PayrollService(context.db)
+
+    if params.employee_ids is not None:
+        employee_ids = params.employee_ids
+    else:
+        employee_ids = [
+            row.id for row in context.db.query(Employee.id).filter(
+                Employee.is_active == True
+            ).order_by(Employee.id).all()
+        ]
+
+    created = skipped = 0
+    context.set_progress(0, len(employee_ids))
+    for start in range(0, len(employee_ids), JOB_BATCH_SIZE):
+        context.check_cancelled()
+        for employee_id in employee_ids[start:start + JOB_BATCH_SIZE]:
+            payroll = service.create_payroll(PayrollCreate(
+                employee_id=employee_id,
+                pay_period_start=params.pay_period_start,
+                pay_period_end=params.pay_period_end
+            ))
+            if payroll:
+                created += 1
+            else:
+                # Çalışan yok veya dönem için bordro zaten var
+                skipped += 1
+        context.set_progress(min(start + JOB_BATCH_SIZE, len(employee_ids)))
+
+    return {"created": created, "skipped": skipped}
+
+@register_job("payroll_export", params_model=PayrollExportParams)
+def export_payrolls(context: JobContext) -> dict:
+    """Filtreye uyan bordro özetlerini CSV dosyasına aktar (keyset sayfalama ile sabit bellek)"""
+    params = PayrollExportParams(**context.params)
+    service = PayrollService(context.db)
+
+    rows = 0
+    cursor = None
+    with open(context.result_path("payrolls.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            "id", "employee_full_name", "employee_is_active", "pay_period_start", "pay_period_end",
+            "gross_salary", "net_salary", "status", "created_at"
+        ])
+        while True:
+            context.check_cancelled()
+            page = service.get_payrolls_summary(
+                include_inactive=params.include_inactive,
+                employee_search=params.employee_search,
+                status_filter=params.status_filter.value if params.status_filter else None,
+                date_start=params.date_start,
+                date_end=params.date_end,
+                limit=EXPORT_PAGE_SIZE,
+                cursor=cursor
+            )
+            for summary in page:
+                writer.writerow([
+                    summary.id, summary.employee_full_name, summary.employee_is_active,
+                    summary.pay_period_start.isoformat(), summary.pay_period_end.isoformat(),
+                    summary.gross_salary, summary.net_salary, summary.status.value,
+                    summary.created_at.isoformat()
+                ])
+            rows += len(page)
+            context.set_progress(rows)
+            if len(page) < EXPORT_PAGE_SIZE:
+                break
+            cursor = encode_payroll_cursor(page[-1].id)
+
+    return {"rows": rows}
+
+@register_job("payroll_recalculate_drafts", params_model=PayrollRecalculateParams)
+def recalculate_draft_payrolls(context: JobContext) -> dict:
+    """Finansal ayar değişikliği sonrası taslak bordroları yeniden hesapla; sonuç fark özetidir"""
+    params = PayrollRecalculateParams(**context.params)
+    result = PayrollService(context.db).recalculate_draft_payrolls(params.effective_date, params.dry_run)
+    context.set_progress(result.matched, result.matched)
+    return result.model_dump(mode="json", exclude={"changes"})
@@ -1,21 +1,58 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import update
 from typing import List, Optional
 from datetime import datetime, date
-from models import Payroll, Employee, PayrollStatus
-from schemas import PayrollCreate, PayrollCalculated, PayrollUpdate, PayrollSummary, RecentActivity, TaxBracket
+import base64
+import numpy as np
+from models import Payroll, Employee, PayrollStatus, PAYROLL_STATUS_TRANSITIONS, get_allowed_predecessors
+from schemas import (
+    PayrollCreate, PayrollCalculated, PayrollUpdate, PayrollSummary, TaxBracket,
+    PayrollBulkStatusUpdate, PayrollBulkStatusResult, DeductionTotals,
+    PayrollRecalculationChange, PayrollRecalculationResult
+)
 from services.employee_service import EmployeeService
 from services.settings_service import SettingsService
+from services.search_service import EmployeeSearchService
+from services.tax_totals_service import TaxTotalsService
+from services.ledger_service import LedgerService, payroll_title
+from services.activity_service import ActivityService, PAYROLL_STATUS_ACTIONS
+from services import money
+
+# Yeniden hesaplama raporunda listelenecek en fazla değişiklik
+RECALCULATION_REPORT_LIMIT = 100
+# Yeniden hesaplamada karşılaştırılan/güncellenen tutar kolonları
+RECALCULATED_COLUMNS = (
+    "net_salary", "income_tax", "income_tax_rate", "sgk_premium", "sgk_rate",
+    "unemployment_insurance", "unemployment_rate", "total_deductions",
+    "tax_base", "employer_sgk_premium", "employer_cost",
+)
+
+def encode_payroll_cursor(payroll_id: int) -> str:
+    """Keyset sayfalama imleci: sayfadaki son bordronun id değeri"""
+    return base64.urlsafe_b64encode(f"payroll:{payroll_id}".encode()).decode()
+
+def decode_payroll_cursor(cursor: str) -> int:
+    """İmleci bordro id değerine çöz"""
+    try:
+        prefix, payroll_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        if prefix != "payroll":
+            raise ValueError
+        return int(payroll_id)
+    except ValueError:
+        raise ValueError("Geçersiz sayfalama imleci")
 
 class PayrollService:
     def __init__(self, db: Session):
         self.db = db
         self.employee_service = EmployeeService(db)
         self.settings_service = SettingsService(db)
+        self.tax_totals_service = TaxTotalsService(db)
+        self.ledger_service = LedgerService(db)
+        self.activity_service = ActivityService(db)
 
-    def calculate_payroll(self, gross_salary: float, payroll_date: date = None) -> PayrollCalculated:
-        """Bordro hesaplaması yap - Sistem ayarlarından değerleri okuyarak"""
-        deductions = {}
-        
+    def _get_calculation_params(self, payroll_date: date = None) -> tuple:
+        """Hesaplama için tarihe göre geçerli SGK oranları ve vergi dilimleri"""
         # Tarihsel ayarları al
         if payroll_date:
             financial_settings = self.settings_service.get_financial_settings_for_date(payroll_date)
@@ -34,71 +71,105 @@ class PayrollService:
             sgk_rates = {"employee_rate": 14.0, "employer_rate": 15.5, "unemployment_rate": 1.0}
             tax_brackets = []
         
-        # Gelir Vergisi (Kademeli Vergi Sistemi)
-        income_tax, effective_rate = self._calculate_income_tax(gross_salary, tax_brackets)
-        deductions["gelir_vergisi"] = {
-            "oran": round(effective_rate, 2),
-            "tutar": round(income_tax, 2)
-        }
-        
-        # SGK Primi (Çalışan)
-        sgk_rate = sgk_rates["employee_rate"]
-        sgk_premium = gross_salary * (sgk_rate / 100)
-        deductions["sgk_primi"] = {
-            "oran": sgk_rate,
-            "tutar": round(sgk_premium, 2)
-        }
-        
-        # İşsizlik Sigortası
-        unemployment_rate = sgk_rates["unemployment_rate"]
-        unemployment_insurance = gross_salary * (unemployment_rate / 100)
-        deductions["issizlik_sigortasi"] = {
-            "oran": unemployment_rate,
-            "tutar": round(unemployment_insurance, 2)
+        return sgk_rates, tax_brackets
+
+    def _build_calculated(
+        self,
+        sgk_rates: dict,
+        gross: int,
+        sgk_premium: int,
+        unemployment_insurance: int,
+        tax_base: int,
+        income_tax: int,
+        total_deductions: int,
+        net: int,
+        employer_sgk_premium: int,
+        employer_cost: int
+    ) -> PayrollCalculated:
+        """Kuruş cinsinden tutarlardan API hesaplama sonucunu oluştur"""
+        # Efektif vergi oranı (gösterim amaçlı)
+        effective_rate = (income_tax / tax_base * 100) if tax_base > 0 else 0
+        
+        deductions = {
+            "gelir_vergisi": {
+                "oran": round(effective_rate, 2),
+                "tutar": money.from_kurus(income_tax)
+            },
+            "sgk_primi": {
+                "oran": sgk_rates["employee_rate"],
+                "tutar": money.from_kurus(sgk_premium)
+            },
+            "issizlik_sigortasi": {
+                "oran": sgk_rates["unemployment_rate"],
+                "tutar": money.from_kurus(unemployment_insurance)
+            },
+            "toplam_kesinti": money.from_kurus(total_deductions)
         }
         
-        # Toplam kesinti
-        total_deductions = income_tax + sgk_premium + unemployment_insurance
-        deductions["toplam_kesinti"] = round(total_deductions, 2)
-        
-        # Net maaş
-        net_salary = gross_salary - total_deductions
-        
         return PayrollCalculated(
-            gross_salary=gross_salary,
+            gross_salary=money.from_kurus(gross),
             deductions=deductions,
-            net_salary=round(net_salary, 2)
+            net_salary=money.from_kurus(net),
+            tax_base=money.from_kurus(tax_base),
+            employer_sgk_premium=money.from_kurus(employer_sgk_premium),
+            employer_cost=money.from_kurus(employer_cost)
         )
-    
-    def _calculate_income_tax(self, gross_salary: float, tax_brackets: List) -> tuple:
-        """Kademeli gelir vergisi hesaplama"""
-        if not tax_brackets:
-            # Fallback: Eğer vergi dilimi yoksa %15 sabit oran kullan
-            return gross_salary * 0.15, 15.0
-        
-        total_tax = 0.0
-        remaining_amount = gross_salary
-        
-        for bracket in tax_brackets:
-            min_amount = bracket.min_amount
-            max_amount = bracket.max_amount if bracket.max_amount else float('inf')
-            rate = bracket.rate / 100
-            
-            if remaining_amount <= 0:
-                break
-            
-            # Bu dilime düşen miktar
-            taxable_in_bracket = min(remaining_amount, max_amount - min_amount)
-            
-            if taxable_in_bracket > 0:
-                tax_in_bracket = taxable_in_bracket * rate
-                total_tax += tax_in_bracket
-                remaining_amount -= taxable_in_bracket
-        
-        # Efektif vergi oranı
-        effective_rate = (total_tax / gross_salary * 100) if gross_salary > 0 else 0
-        
-        return total_tax, effective_rate
+
+    def calculate_payroll(
+        self,
+        gross_salary: float,
+        payroll_date: date = None,
+        cumulative_tax_base: float = 0.0
+    ) -> PayrollCalculated:
+        """
+        Bordro hesaplaması yap - Sistem ayarlarından değerleri okuyarak
+        cumulative_tax_base: Çalışanın yıl içinde bu bordrodan önceki kümülatif vergi matrahı
+        
+        Hesaplama kuruş cinsinden tamsayılarla yapılır (bkz. services/money.py):
+        - SGK ve işsizlik sigortası brütün yüzdesi, kuruşa yuvarlanır
+        - Vergi matrahı = brüt - SGK - işsizlik sigortası
+        - Gelir vergisi yıllık kümülatif matraha göre kademeli dilimlerle hesaplanır
+        - İşveren maliyeti = brüt + SGK işveren payı
+        """
+        sgk_rates, tax_brackets = self._get_calculation_params(payroll_date)
+        
+        amounts = money.calculate_amounts(
+            money.to_kurus(gross_salary),
+            sgk_rate=money.to_rate(sgk_rates["employee_rate"]),
+            unemployment_rate=money.to_rate(sgk_rates["unemployment_rate"]),
+            employer_rate=money.to_rate(sgk_rates["employer_rate"]),
+            brackets=money.to_money_brackets(tax_brackets),
+            cumulative_tax_base_kurus=money.to_kurus(cumulative_tax_base)
+        )
+        return self._build_calculated(sgk_rates, **vars(amounts))
+
+    def calculate_payroll_batch(
+        self,
+        gross_salaries: List[float],
+        payroll_date: date = None,
+        cumulative_tax_bases: List[float] = None
+    ) -> List[PayrollCalculated]:
+        """Aynı dönemdeki çok sayıda bordroyu vektörel (int64 NumPy) yolla hesapla"""
+        sgk_rates, tax_brackets = self._get_calculation_params(payroll_date)
+        
+        gross = np.array([money.to_kurus(g) for g in gross_salaries], dtype=np.int64)
+        cumulative = None
+        if cumulative_tax_bases is not None:
+            cumulative = np.array([money.to_kurus(c) for c in cumulative_tax_bases], dtype=np.int64)
+        
+        amounts = money.calculate_amounts_batch(
+            gross,
+            sgk_rate=money.to_rate(sgk_rates["employee_rate"]),
+            unemployment_rate=money.to_rate(sgk_rates["unemployment_rate"]),
+            employer_rate=money.to_rate(sgk_rates["employer_rate"]),
+            brackets=money.to_money_brackets(tax_brackets),
+            cumulative_tax_base_kurus=cumulative
+        )
+        columns = {key: values.tolist() for key, values in amounts.items()}
+        return [
+            self._build_calculated(sgk_rates, **{key: values[i] for key, values in columns.items()})
+            for i in range(len(gross))
+        ]
 
     def create_payroll(self, payroll_data: PayrollCreate) -> Optional[Payroll]:
         """Yeni bordro oluştur"""
@@ -107,19 +178,10 @@ class PayrollService:
         if not employee:
             return None
         
-        # Aynı dönem için bordro olup olmadığını kontrol et
-        existing_payroll = self.db.query(Payroll).filter(
-            Payroll.employee_id == payroll_data.employee_id,
-            Payroll.pay_period_start == payroll_data.pay_period_start,
-            Payroll.pay_period_end == payroll_data.pay_period_end
-        ).first()
-        
-        if existing_payroll:
-            return None  # Aynı dönem için bordro zaten var
-        
-        # Bordro hesaplaması (tarihe göre)
+        # Bordro hesaplaması (tarihe ve yıl içinde önceki dönemlerin kümülatif matrahına göre)
         payroll_start_date = payroll_data.pay_period_start.date() if isinstance(payroll_data.pay_period_start, datetime) else payroll_data.pay_period_start
-        calculated = self.calculate_payroll(employee.gross_salary, payroll_start_date)
+        cumulative_tax_base = self.tax_totals_service.get_cumulative_tax_base(employee.id, payroll_start_date)
+        calculated = self.calculate_payroll(employee.gross_salary, payroll_start_date, cumulative_tax_base)
         
         # Bordro oluştur
         db_payroll = Payroll(
@@ -127,16 +189,48 @@ class PayrollService:
             pay_period_start=payroll_data.pay_period_start,
             pay_period_end=payroll_data.pay_period_end,
             gross_salary=calculated.gross_salary,
-            deductions=calculated.deductions,
             net_salary=calculated.net_salary,
-            status=PayrollStatus.DRAFT  # Varsayılan olarak taslak
+            **Payroll.deduction_columns(calculated.deductions),
+            tax_base=calculated.tax_base,
+            employer_sgk_premium=calculated.employer_sgk_premium,
+            employer_cost=calculated.employer_cost,
+            title=employee.title,
+            status=PayrollStatus.DRAFT.value  # Varsayılan olarak taslak
         )
         
         self.db.add(db_payroll)
+        # Yıllık kümülatif toplamlar ve dönem maliyet özeti aynı transaction içinde güncellenir
+        self.tax_totals_service.apply_delta(
+            employee.id, payroll_start_date.year, calculated.gross_salary, calculated.tax_base, 1
+        )
+        self.ledger_service.add_payroll(db_payroll)
+        try:
+            self.db.flush()
+        except IntegrityError:
+            self.db.rollback()
+            # Sadece aynı dönem için bordro zaten varsa (uq_payrolls_employee_period) None dön;
+            # diğer kısıt ihlalleri (NOT NULL, özet tablosu vb.) çağırana iletilir
+            if self._payroll_exists(payroll_data.employee_id, payroll_data.pay_period_start, payroll_data.pay_period_end):
+                return None
+            raise
+        self.activity_service.record_payroll("payroll_created", "Bordro Oluşturuldu", db_payroll, employee)
         self.db.commit()
         self.db.refresh(db_payroll)
         return db_payroll
 
+    def _payroll_exists(self, employee_id: int, pay_period_start, pay_period_end) -> bool:
+        """Çalışanın aynı dönem için bordrosu var mı (uq_payrolls_employee_period)"""
+        # Kolonlar DateTime; date parametreleri gün başına çevrilir (SQLite metin karşılaştırması için)
+        if not isinstance(pay_period_start, datetime):
+            pay_period_start = datetime.combine(pay_period_start, datetime.min.time())
+        if not isinstance(pay_period_end, datetime):
+            pay_period_end = datetime.combine(pay_period_end, datetime.min.time())
+        return self.db.query(Payroll.id).filter(
+            Payroll.employee_id == employee_id,
+            Payroll.pay_period_start == pay_period_start,
+            Payroll.pay_period_end == pay_period_end
+        ).first() is not None
+
     def update_payroll_status(self, payroll_id: int, payroll_update: PayrollUpdate) -> Optional[Payroll]:
         """Bordro durumunu güncelle"""
         db_payroll = self.db.query(Payroll).filter(Payroll.id == payroll_id).first()
@@ -144,12 +238,222 @@ class PayrollService:
             return None
         
         if payroll_update.status:
-            db_payroll.status = payroll_update.status
+            target_status = payroll_update.status.value
+            if target_status != db_payroll.status:
+                if target_status not in PAYROLL_STATUS_TRANSITIONS.get(db_payroll.status, set()):
+                    raise ValueError(
+                        f"{db_payroll.status} durumundan {target_status} durumuna geçişe izin verilmiyor"
+                    )
+                if target_status == PayrollStatus.CANCELLED.value:
+                    # İptal edilen bordro yıllık toplamlardan ve dönem özetinden düşülür
+                    self._remove_from_totals([db_payroll])
+                db_payroll.status = target_status
+                self.activity_service.record_payroll(
+                    "payroll_status_changed", PAYROLL_STATUS_ACTIONS[target_status], db_payroll
+                )
         
         self.db.commit()
         self.db.refresh(db_payroll)
         return db_payroll
 
+    def bulk_update_payroll_status(self, bulk_update: PayrollBulkStatusUpdate) -> PayrollBulkStatusResult:
+        """Toplu bordro durum güncelleme - Tek UPDATE ile, sadece izin verilen geçişler"""
+        query = self.db.query(Payroll)
+        has_selection = False
+        
+        if bulk_update.payroll_ids is not None:
+            query = query.filter(Payroll.id.in_(bulk_update.payroll_ids))
+            has_selection = True
+        if bulk_update.employee_id is not None:
+            query = query.filter(Payroll.employee_id == bulk_update.employee_id)
+            has_selection = True
+        if bulk_update.status_filter:
+            query = query.filter(Payroll.status == bulk_update.status_filter.value)
+            has_selection = True
+        if bulk_update.date_start:
+            query = query.filter(Payroll.pay_period_start >= bulk_update.date_start)
+            has_selection = True
+        if bulk_update.date_end:
+            query = query.filter(Payroll.pay_period_end <= bulk_update.date_end)
+            has_selection = True
+        
+        # Yanlışlıkla tüm bordroların güncellenmesini engelle
+        if not has_selection:
+            raise ValueError("Bordro ID listesi veya en az bir filtre belirtilmelidir")
+        
+        target_status = bulk_update.status.value
+        predecessors = get_allowed_predecessors(target_status)
+        
+        matched = query.count()
+        # Zaten hedef durumdaki bordrolar geçiş sayılmaz, reddedilmiş de sayılmaz (no-op)
+        unchanged = query.filter(Payroll.status == target_status).count() if matched else 0
+        updated = 0
+        if matched and predecessors:
+            transition_query = query.filter(Payroll.status.in_(predecessors))
+            if target_status == PayrollStatus.CANCELLED.value:
+                # İptal edilecek bordrolar yıllık toplamlardan ve dönem özetinden gruplu düşülür
+                self.tax_totals_service.remove_payroll_query(transition_query)
+                self.ledger_service.remove_payroll_query(transition_query)
+            # Olaylar güncellemeden önce, aynı seçimle tek INSERT ... SELECT ile yazılır
+            self.activity_service.record_payroll_status_query(transition_query, target_status)
+            updated = transition_query.update(
+                {Payroll.status: target_status},
+                synchronize_session=False
+            )
+        
+        self.db.commit()
+        return PayrollBulkStatusResult(
+            status=bulk_update.status,
+            matched=matched,
+            updated=updated,
+            unchanged=unchanged,
+            rejected=matched - updated - unchanged
+        )
+
+    def recalculate_draft_payrolls(self, effective_date: date, dry_run: bool = False) -> PayrollRecalculationResult:
+        """
+        Yeni finansal ayarların geçerlilik tarihinden itibaren aynı yıldaki DRAFT bordroları yeniden hesapla
+
+        Etkilenen çalışanların yıl içindeki (iptal edilmemiş) bordroları dönem sırasıyla okunur;
+        kümülatif matrah dönem dönem yürütülür, taslaklar aynı dönem için vektörel yolla hesaplanır.
+        Sadece tutarı değişen bordrolar tek toplu UPDATE ile yazılır; yıllık matrah toplamları ve
+        dönem maliyet özetleri farklar kadar düzeltilir. dry_run ise hiçbir şey yazılmaz.
+        """
+        if isinstance(effective_date, datetime):
+            effective_date = effective_date.date()
+        year = effective_date.year
+        effective_start = datetime.combine(effective_date, datetime.min.time())
+        # Yarı açık yıl aralığı: pay_period_start indeksini kullanır
+        in_year = (
+            Payroll.pay_period_start >= datetime(year, 1, 1),
+            Payroll.pay_period_start < datetime(year + 1, 1, 1),
+        )
+
+        target_filter = (
+            Payroll.status == PayrollStatus.DRAFT.value,
+            Payroll.pay_period_start >= effective_start,
+            *in_year,
+        )
+        affected_employees = self.db.query(Payroll.employee_id).filter(*target_filter).distinct()
+
+        rows = self.db.query(
+            Payroll.id, Payroll.employee_id, Payroll.pay_period_start, Payroll.status,
+            payroll_title().label("title"), Payroll.gross_salary, *[getattr(Payroll, c) for c in RECALCULATED_COLUMNS]
+        ).filter(
+            Payroll.employee_id.in_(affected_employees),
+            *in_year,
+            Payroll.status != PayrollStatus.CANCELLED.value
+        ).order_by(Payroll.pay_period_start, Payroll.id).all()
+
+        # Dönem başlangıcına göre grupla (satırlar dönem sırasıyla geldi)
+        periods = {}
+        for row in rows:
+            periods.setdefault(row.pay_period_start, []).append(row)
+
+        cumulative = {}  # employee_id -> bu döneme kadarki kümülatif matrah
+        updates, tax_deltas, ledger_deltas = [], {}, {}
+        matched = 0
+        for period_start, period_rows in periods.items():
+            targets = [
+                r for r in period_rows
+                if r.status == PayrollStatus.DRAFT.value and r.pay_period_start >= effective_start
+            ]
+            calculated = self.calculate_payroll_batch(
+                [r.gross_salary for r in targets],
+                period_start.date(),
+                [cumulative.get(r.employee_id, 0.0) for r in targets]
+            ) if targets else []
+            matched += len(targets)
+            new_tax_bases = {}
+
+            for row, calc in zip(targets, calculated):
+                values = {
+                    "net_salary": calc.net_salary,
+                    **Payroll.deduction_columns(calc.deductions),
+                    "tax_base": calc.tax_base,
+                    "employer_sgk_premium": calc.employer_sgk_premium,
+                    "employer_cost": calc.employer_cost,
+                }
+                new_tax_bases[row.id] = calc.tax_base
+                if all(getattr(row, c) == values[c] for c in RECALCULATED_COLUMNS):
+                    continue
+                updates.append((row, values))
+
+                tax_key = row.employee_id
+                tax_deltas[tax_key] = tax_deltas.get(tax_key, 0.0) + calc.tax_base - (row.tax_base or 0.0)
+                ledger_key = (period_start.month, row.title)
+                delta = ledger_deltas.setdefault(ledger_key, {"net": 0.0, "employer_sgk": 0.0, "employer_cost": 0.0})
+                delta["net"] += calc.net_salary - row.net_salary
+                delta["employer_sgk"] += calc.employer_sgk_premium - (row.employer_sgk_premium or 0.0)
+                delta["employer_cost"] += calc.employer_cost - (row.employer_cost or row.gross_salary)
+
+            for row in period_rows:
+                tax_base = new_tax_bases.get(row.id, row.tax_base if row.tax_base is not None else row.gross_salary)
+                cumulative[row.employee_id] = cumulative.get(row.employee_id, 0.0) + tax_base
+
+        result = PayrollRecalculationResult(
+            effective_date=effective_date,
+            dry_run=dry_run,
+            matched=matched,
+            changed=len(updates),
+            unchanged=matched - len(updates),
+            net_salary_difference=round(sum(v["net_salary"] - r.net_salary for r, v in updates), 2),
+            income_tax_difference=round(sum(v["income_tax"] - (r.income_tax or 0.0) for r, v in updates), 2),
+            total_deductions_difference=round(
+                sum(v["total_deductions"] - (r.total_deductions or 0.0) for r, v in updates), 2
+            ),
+            changes=[
+                PayrollRecalculationChange(
+                    payroll_id=r.id,
+                    employee_id=r.employee_id,
+                    pay_period_start=r.pay_period_start.date(),
+                    old_net_salary=r.net_salary,
+                    new_net_salary=v["net_salary"],
+                    old_income_tax=r.income_tax,
+                    new_income_tax=v["income_tax"],
+                    old_total_deductions=r.total_deductions,
+                    new_total_deductions=v["total_deductions"]
+                ) for r, v in updates[:RECALCULATION_REPORT_LIMIT]
+            ]
+        )
+        if dry_run or not updates:
+            return result
+
+        # Birincil anahtarla toplu UPDATE (executemany)
+        self.db.execute(update(Payroll), [{"id": r.id, **v} for r, v in updates])
+        self.tax_totals_service.apply_deltas([
+            {
+                "employee_id": employee_id,
+                "year": year,
+                "cumulative_gross": 0.0,
+                "cumulative_tax_base": delta,
+                "payroll_count": 0,
+            } for employee_id, delta in tax_deltas.items()
+        ])
+        self.ledger_service.apply_deltas([
+            {
+                "year": year,
+                "month": month,
+                "title": title,
+                "payroll_count": 0,
+                "total_gross": 0.0,
+                "total_net": delta["net"],
+                "total_employer_sgk": delta["employer_sgk"],
+                "total_employer_cost": delta["employer_cost"],
+            } for (month, title), delta in ledger_deltas.items()
+        ])
+        self.activity_service.record(
+            "payroll_recalculated", "payroll", "Taslak Bordrolar Yeniden Hesaplandı",
+            details=f"{effective_date.isoformat()} sonrası {len(updates)} bordro güncellendi"
+        )
+        self.db.commit()
+        return result
+
+    def _remove_from_totals(self, payrolls: List[Payroll]) -> None:
+        """Bordroları yıllık vergi toplamlarından ve dönem maliyet özetinden düş"""
+        self.tax_totals_service.remove_payrolls(payrolls)
+        self.ledger_service.remove_payrolls(payrolls)
+
     def delete_payroll(self, payroll_id: int) -> bool:
         """Bordro kaydını tamamen sil"""
         db_payroll = self.db.query(Payroll).filter(Payroll.id == payroll_id).first()
@@ -157,9 +461,14 @@ class PayrollService:
             return False
         
         # Sadece DRAFT veya CANCELLED statüsündeki bordroları silebilir
-        if db_payroll.status not in [PayrollStatus.DRAFT, PayrollStatus.CANCELLED]:
+        if db_payroll.status not in [PayrollStatus.DRAFT.value, PayrollStatus.CANCELLED.value]:
             return False
         
+        # İptal edilmiş bordro toplamlardan zaten düşülmüştür
+        if db_payroll.status == PayrollStatus.DRAFT.value:
+            self._remove_from_totals([db_payroll])
+        
+        self.activity_service.record_payroll("payroll_deleted", "Bordro Silindi", db_payroll)
         self.db.delete(db_payroll)
         self.db.commit()
         return True
@@ -180,11 +489,13 @@ class PayrollService:
         date_start: date = None,
         date_end: date = None,
         skip: int = 0, 
-        limit: int = 100
+        limit: int = 100,
+        cursor: str = None
     ) -> List[PayrollSummary]:
-        """Bordro özet listesi (filtreleme ile)"""
-        from sqlalchemy import and_, or_
-        
+        """
+        Bordro özet listesi (filtreleme ile)
+        cursor verilirse offset yerine id üzerinden keyset sayfalama kullanılır (derin sayfalarda sabit maliyet)
+        """
         query = self.db.query(
             Payroll.id,
             (Employee.first_name + ' ' + Employee.last_name).label('employee_full_name'),
@@ -201,16 +512,11 @@ class PayrollService:
         if not include_inactive:
             query = query.filter(Employee.is_active == True)
         
-        # Çalışan adı arama
+        # Çalışan adı arama (indeksli önek arama)
         if employee_search:
-            search_pattern = f"%{employee_search}%"
-            query = query.filter(
-                or_(
-                    Employee.first_name.ilike(search_pattern),
-                    Employee.last_name.ilike(search_pattern),
-                    (Employee.first_name + ' ' + Employee.last_name).ilike(search_pattern)
-                )
-            )
+            search_condition = EmployeeSearchService(self.db).match_condition(employee_search)
+            if search_condition is not None:
+                query = query.filter(search_condition)
         
         # Durum filtreleme
         if status_filter:
@@ -222,8 +528,16 @@ class PayrollService:
         if date_end:
             query = query.filter(Payroll.pay_period_end <= date_end)
         
-        query = query.order_by(Payroll.created_at.desc())
-        results = query.offset(skip).limit(limit).all()
+        # created_at kayıt anında atandığı için id sırası oluşturulma sırasıyla aynıdır;
+        # birincil anahtar üzerinden sıralama keyset sayfalamayı indeksle karşılar
+        query = query.order_by(Payroll.id.desc())
+        
+        if cursor:
+            query = query.filter(Payroll.id < decode_payroll_cursor(cursor))
+        else:
+            query = query.offset(skip)
+        
+        results = query.limit(limit).all()
         
         return [
             PayrollSummary(
@@ -294,6 +608,67 @@ class PayrollService:
         result = self.db.query(func.sum(Payroll.net_salary)).scalar()
         return float(result or 0.0)
     
+    def get_employee_payroll_totals(self, employee_id: int) -> dict:
+        """
+        Çalışan paneli toplamları - tek aggregate sorgu (koşullu SUM/COUNT)
+        ix_payrolls_employee_created_at indeksiyle maliyet bordro geçmişinin uzunluğundan bağımsızdır
+        """
+        from sqlalchemy import func, case
+        
+        current_month_start = datetime.now().date().replace(day=1)
+        is_current_month = Payroll.created_at >= current_month_start
+        row = self.db.query(
+            func.count(Payroll.id).label("total_payrolls"),
+            func.sum(Payroll.gross_salary).label("total_gross_salary"),
+            func.sum(Payroll.net_salary).label("total_net_salary"),
+            func.sum(case((is_current_month, 1), else_=0)).label("current_month_payrolls"),
+            func.sum(case(
+                (is_current_month & (Payroll.status == PayrollStatus.PAID.value), Payroll.net_salary),
+                else_=0.0
+            )).label("current_month_net_salary")
+        ).filter(
+            Payroll.employee_id == employee_id
+        ).one()
+        
+        return {
+            "total_payrolls": row.total_payrolls,
+            "total_gross_salary": float(row.total_gross_salary or 0.0),
+            "total_net_salary": float(row.total_net_salary or 0.0),
+            "current_month_payrolls": int(row.current_month_payrolls or 0),
+            "current_month_net_salary": float(row.current_month_net_salary or 0.0),
+        }
+    
+    def get_deduction_totals(self, year: int) -> List[DeductionTotals]:
+        """Yıl içindeki aylık vergi/SGK toplamları (tipli kolonlar üzerinden SQL toplamı)"""
+        from sqlalchemy import func, extract
+        
+        month = extract("month", Payroll.pay_period_start)
+        rows = self.db.query(
+            month.label("month"),
+            func.count().label("payroll_count"),
+            func.sum(Payroll.income_tax).label("total_income_tax"),
+            func.sum(Payroll.sgk_premium).label("total_sgk_premium"),
+            func.sum(Payroll.unemployment_insurance).label("total_unemployment_insurance"),
+            func.sum(Payroll.total_deductions).label("total_deductions")
+        ).filter(
+            # Yarı açık tarih aralığı: ix_payrolls_period_status_deductions tüm kolonları karşılar
+            Payroll.pay_period_start >= datetime(year, 1, 1),
+            Payroll.pay_period_start < datetime(year + 1, 1, 1),
+            Payroll.status != PayrollStatus.CANCELLED.value
+        ).group_by(month).order_by(month).all()
+        
+        return [
+            DeductionTotals(
+                year=year,
+                month=int(r.month),
+                payroll_count=r.payroll_count,
+                total_income_tax=float(r.total_income_tax or 0.0),
+                total_sgk_premium=float(r.total_sgk_premium or 0.0),
+                total_unemployment_insurance=float(r.total_unemployment_insurance or 0.0),
+                total_deductions=float(r.total_deductions or 0.0)
+            ) for r in rows
+        ]
+    
     def get_current_month_total_net_salary(self) -> float:
         """Bu ayın toplam net maaş tutarı (ödenen bordrolar)"""
         from sqlalchemy import func
@@ -306,87 +681,7 @@ class PayrollService:
         # Bu ay içinde oluşturulan ve PAID statusündeki bordroların net maaş toplamı
         result = self.db.query(func.sum(Payroll.net_salary)).filter(
             Payroll.created_at >= current_month_start,
-            Payroll.status == PayrollStatus.PAID  # Sadece ödenen bordrolar
+            Payroll.status == PayrollStatus.PAID.value  # Sadece ödenen bordrolar
         ).scalar()
         
         return float(result or 0.0)
-    
-    def get_recent_activities(self, limit: int = 10) -> List[RecentActivity]:
-        """Son işlemleri getir"""
-        # Tüm aktiviteleri datetime ile birlikte tutacağız
-        all_activities = []
-        
-        # Son bordro işlemleri
-        recent_payrolls = self.db.query(Payroll).order_by(
-            Payroll.created_at.desc()
-        ).limit(limit).all()
-        
-        for payroll in recent_payrolls:
-            all_activities.append({
-                'activity': RecentActivity(
-                    key=f"payroll_{payroll.id}",
-                    action="Bordro Oluşturuldu",
-                    details=f"{payroll.employee.first_name} {payroll.employee.last_name}",
-                    time=self._format_time(payroll.created_at),
-                    type="payroll"
-                ),
-                'datetime': payroll.created_at
-            })
-        
-        # Son çalışan kayıtları
-        recent_employees = self.db.query(Employee).order_by(
-            Employee.created_at.desc()
-        ).limit(limit).all()
-        
-        for employee in recent_employees:
-            all_activities.append({
-                'activity': RecentActivity(
-                    key=f"employee_{employee.id}",
-                    action="Çalışan Eklendi",
-                    details=f"{employee.first_name} {employee.last_name} - {employee.title}",
-                    time=self._format_time(employee.created_at),
-                    type="employee"
-                ),
-                'datetime': employee.created_at
-            })
-        
-        # Eğer hiç aktivite yoksa sistem mesajları ekle
-        if not all_activities:
-            now = datetime.now()
-            all_activities = [
-                {
-                    'activity': RecentActivity(
-                        key="system_1",
-                        action="Sistem Başlatıldı",
-                        details="Bordro ve maaş yönetim sistemi aktif",
-                        time="Bugün",
-                        type="system"
-                    ),
-                    'datetime': now
-                }
-            ]
-        
-        # Tarihe göre sırala
-        all_activities.sort(key=lambda x: x['datetime'], reverse=True)
-        
-        # Sadece activity objelerini döndür, limit kadar
-        return [item['activity'] for item in all_activities[:limit]]
-    
-    def _format_time(self, dt: datetime) -> str:
-        """Zamanı kullanıcı dostu formatta göster"""
-        now = datetime.now()
-        diff = now - dt
-        
-        if diff.days == 0:
-            if diff.seconds < 3600:  # 1 saat
-                minutes = diff.seconds // 60
-                return f"{minutes} dakika önce" if minutes > 0 else "Az önce"
-            else:
-                hours = diff.seconds // 3600
-                return f"{hours} saat önce"
-        elif diff.days == 1:
-            return "Dün"
-        elif diff.days < 7:
-            return f"{diff.days} gün önce"
-        else:
-            return dt.strftime("%d.%m.%Y") 
\ No newline at end of file
@@ -0,0 +1,154 @@
+import re
+from sqlalchemy.orm import Session
+from sqlalchemy import text, case, func, column, Integer, and_, or_
+from typing import List, Optional
+from models import Employee
+
+# Türkçe büyük/küçük harf dönüşümü (Python lower() "I" -> "i" yapar, Türkçede "ı" olmalı)
+_TURKISH_LOWER_MAP = str.maketrans({"I": "ı", "İ": "i"})
+# Aksan sadeleştirme: "Şükrü" ile "sukru" aynı sonucu versin
+_ASCII_FOLD_MAP = str.maketrans({
+    "ç": "c", "ğ": "g", "ı": "i", "ö": "o", "ş": "s", "ü": "u",
+    "â": "a", "î": "i", "û": "u"
+})
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+# Toplu doldurma (backfill) parti boyutu
+SEARCH_BACKFILL_BATCH_SIZE = 1000
+
+def normalize_search_text(value: Optional[str]) -> str:
+    """Arama için metni Türkçe kurallarıyla küçült, aksanları sadeleştir ve boşlukları tekille"""
+    if not value:
+        return ""
+    folded = value.translate(_TURKISH_LOWER_MAP).lower().translate(_ASCII_FOLD_MAP)
+    return " ".join(folded.split())
+
+def build_employee_search_text(first_name: Optional[str], last_name: Optional[str]) -> str:
+    """Çalışan için aranabilir ad soyad metni"""
+    return normalize_search_text(f"{first_name or ''} {last_name or ''}")
+
+def tokenize_search_term(term: Optional[str]) -> List[str]:
+    """Arama terimini normalize edilmiş kelimelere ayır"""
+    return _TOKEN_PATTERN.findall(normalize_search_text(term))
+
+def setup_employee_search(engine) -> None:
+    """
+    Arama altyapısını hazırla (uygulama açılışında ensure_columns sonrasında çağrılır)
+    - Boş search_text kayıtlarını doldurur
+    - PostgreSQL: pg_trgm GIN indeksi
+    - SQLite: FTS5 sanal tablosu ve senkronizasyon trigger'ları
+    """
+    dialect = engine.dialect.name
+
+    with engine.begin() as conn:
+        if dialect == "postgresql":
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_employees_search_text_trgm "
+                "ON employees USING gin (search_text gin_trgm_ops)"
+            ))
+        elif dialect == "sqlite":
+            fts_exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'employees_fts'"
+            )).first() is not None
+            if not fts_exists:
+                conn.execute(text(
+                    "CREATE VIRTUAL TABLE employees_fts USING fts5("
+                    "search_text, content='employees', content_rowid='id')"
+                ))
+            conn.execute(text(
+                "CREATE TRIGGER IF NOT EXISTS employees_fts_ai AFTER INSERT ON employees BEGIN "
+                "INSERT INTO employees_fts(rowid, search_text) VALUES (new.id, new.search_text); END"
+            ))
+            conn.execute(text(
+                "CREATE TRIGGER IF NOT EXISTS employees_fts_ad AFTER DELETE ON employees BEGIN "
+                "INSERT INTO employees_fts(employees_fts, rowid, search_text) "
+                "VALUES ('delete', old.id, old.search_text); END"
+            ))
+            conn.execute(text(
+                "CREATE TRIGGER IF NOT EXISTS employees_fts_au AFTER UPDATE OF search_text ON employees BEGIN "
+                "INSERT INTO employees_fts(employees_fts, rowid, search_text) "
+                "VALUES ('delete', old.id, old.search_text); "
+                "INSERT INTO employees_fts(rowid, search_text) VALUES (new.id, new.search_text); END"
+            ))
+            if not fts_exists:
+                conn.execute(text("INSERT INTO employees_fts(employees_fts) VALUES ('rebuild')"))
+
+    _backfill_search_text(engine)
+
+def _backfill_search_text(engine) -> None:
+    """search_text değeri boş olan kayıtları partiler halinde doldur"""
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(text(
+                "SELECT id, first_name, last_name FROM employees "
+                "WHERE search_text IS NULL LIMIT :batch_size"
+            ), {"batch_size": SEARCH_BACKFILL_BATCH_SIZE}).all()
+            if not rows:
+                return
+            conn.execute(
+                text("UPDATE employees SET search_text = :search_text WHERE id = :id"),
+                [
+                    {"id": r.id, "search_text": build_employee_search_text(r.first_name, r.last_name)}
+                    for r in rows
+                ]
+            )
+
+class EmployeeSearchService:
+    """Çalışan arama API'si (çalışan listesi ve bordro özeti tarafından ortak kullanılır)"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.dialect = db.get_bind().dialect.name
+
+    def match_condition(self, term: Optional[str]):
+        """
+        Arama terimi için Employee filtresi döndür (terim boşsa None)
+        Her kelime, ad veya soyadın başında eşleşmelidir (önek arama)
+        """
+        tokens = tokenize_search_term(term)
+        if not tokens:
+            return None
+
+        if self.dialect == "sqlite":
+            # FTS5: her kelime önek sorgusu olarak eklenir ("ali"* "vel"*)
+            fts_query = " ".join(f'"{token}"*' for token in tokens)
+            matching_ids = text(
+                "SELECT rowid FROM employees_fts WHERE employees_fts MATCH :fts_query"
+            ).bindparams(fts_query=fts_query).columns(column("rowid", Integer))
+            return Employee.id.in_(matching_ids)
+
+        # PostgreSQL: LIKE kalıpları pg_trgm GIN indeksi ile karşılanır
+        return and_(*[
+            or_(
+                Employee.search_text.startswith(token, autoescape=True),
+                Employee.search_text.contains(f" {token}", autoescape=True)
+            ) for token in tokens
+        ])
+
+    def rank_order(self, term: Optional[str]) -> list:
+        """Sıralama: tam ad önek eşleşmesi önce, ardından daha kısa (daha yakın) isimler"""
+        query_text = " ".join(tokenize_search_term(term))
+        return [
+            case((Employee.search_text.startswith(query_text, autoescape=True), 0), else_=1),
+            func.length(Employee.search_text),
+            Employee.id
+        ]
+
+    def search_employees(
+        self,
+        term: str,
+        include_inactive: bool = False,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[Employee]:
+        """Çalışanları ada göre ara, alaka sırasına göre döndür"""
+        condition = self.match_condition(term)
+        if condition is None:
+            return []
+
+        query = self.db.query(Employee).filter(condition)
+        if not include_inactive:
+            query = query.filter(Employee.is_active == True)
+
+        return query.order_by(*self.rank_order(term)).offset(skip).limit(limit).all()
@@ -1,16 +1,94 @@
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from pydantic import BaseModel
+from typing import Any, Dict, Optional, List
+from dataclasses import dataclass
 from datetime import datetime, date
+import hashlib
+import json
+import os
+import threading
+import time
 from models import SystemSettings, FinancialSettings
 from schemas import (
     CompanyInfoUpdate, FinancialSettingsUpdate, SystemSettingsResponse, TaxBracket,
     SecuritySettingsUpdate, SMTPSettingsUpdate, FinancialSettingsCreate, FinancialSettingsResponse
 )
 
+# Süreç içi ayar önbelleğinin azami yaşı (çoklu worker'da diğer süreçlerin güncellemeleri bu süre içinde görünür)
+SETTINGS_CACHE_TTL_SECONDS = float(os.getenv("SETTINGS_CACHE_TTL_SECONDS", "60"))
+
+def compute_etag(payload: Any) -> str:
+    """Yanıt içeriğinden güçlü ETag üret (aynı içerik her süreçte aynı ETag'i verir)"""
+    if isinstance(payload, BaseModel):
+        data = payload.model_dump_json()
+    else:
+        data = json.dumps(payload, sort_keys=True, default=str)
+    return f'"{hashlib.sha1(data.encode()).hexdigest()}"'
+
+@dataclass
+class SettingsSnapshot:
+    """Önbellekteki ayar yanıtı ve ETag'i"""
+    payload: Any
+    etag: str
+    loaded_at: float
+
+class SettingsCache:
+    """
+    Süreç düzeyinde ayar önbelleği
+    update_* / create_* metotlarında temizlenir; TTL dolduğunda bir sonraki okuma veritabanından yenilenir.
+    """
+
+    def __init__(self, ttl_seconds: float = SETTINGS_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, SettingsSnapshot] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[SettingsSnapshot]:
+        snapshot = self._entries.get(key)
+        if snapshot and time.monotonic() - snapshot.loaded_at < self.ttl_seconds:
+            return snapshot
+        return None
+
+    def set(self, key: str, payload: Any) -> SettingsSnapshot:
+        snapshot = SettingsSnapshot(payload=payload, etag=compute_etag(payload), loaded_at=time.monotonic())
+        with self._lock:
+            self._entries[key] = snapshot
+        return snapshot
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+settings_cache = SettingsCache()
+
 class SettingsService:
     def __init__(self, db: Session):
         self.db = db
 
+    def get_settings_snapshot(self) -> SettingsSnapshot:
+        """Sistem ayarları yanıtı (önbellekten; yoksa veritabanından okunup önbelleğe alınır)"""
+        snapshot = settings_cache.get("system")
+        if snapshot is None:
+            settings = self.get_or_create_settings()
+            snapshot = settings_cache.set("system", SystemSettingsResponse.model_validate(settings))
+        return snapshot
+
+    def get_minimum_wage_snapshot(self) -> SettingsSnapshot:
+        """Mevcut yılın asgari ücreti (önbellekten)"""
+        key = f"minimum_wage:{datetime.now().year}"
+        snapshot = settings_cache.get(key)
+        if snapshot is None:
+            snapshot = settings_cache.set(key, {"minimum_wage": self.get_current_minimum_wage()})
+        return snapshot
+
+    def get_sgk_rates_snapshot(self) -> SettingsSnapshot:
+        """Mevcut yılın SGK oranları (önbellekten)"""
+        key = f"sgk_rates:{datetime.now().year}"
+        snapshot = settings_cache.get(key)
+        if snapshot is None:
+            snapshot = settings_cache.set(key, self.get_current_sgk_rates())
+        return snapshot
+
     def get_settings(self) -> Optional[SystemSettings]:
         """Sistem ayarlarını getir (tek kayıt olmalı)"""
         return self.db.query(SystemSettings).first()
@@ -82,6 +160,7 @@ class SettingsService:
         )
         self.db.add(default_financial)
         self.db.commit()
+        settings_cache.invalidate()
 
     def update_company_info(self, data: CompanyInfoUpdate, updated_by: str) -> SystemSettings:
         """Kurum bilgilerini güncelle"""
@@ -95,6 +174,7 @@ class SettingsService:
         settings.updated_by = updated_by
         
         self.db.commit()
+        settings_cache.invalidate()
         self.db.refresh(settings)
         return settings
 
@@ -126,6 +206,7 @@ class SettingsService:
         settings.updated_by = updated_by
         
         self.db.commit()
+        settings_cache.invalidate()
         self.db.refresh(settings)
         return settings
 
@@ -186,6 +267,7 @@ class SettingsService:
         
         self.db.add(financial_settings)
         self.db.commit()
+        settings_cache.invalidate()
         self.db.refresh(financial_settings)
         return financial_settings
 
@@ -224,6 +306,7 @@ class SettingsService:
         settings.updated_by = updated_by
         
         self.db.commit()
+        settings_cache.invalidate()
         self.db.refresh(settings)
         return settings
 
@@ -245,5 +328,6 @@ class SettingsService:
         settings.updated_by = updated_by
         
         self.db.commit()
+        settings_cache.invalidate()
         self.db.refresh(settings)
         return settings 
\ No newline at end of file
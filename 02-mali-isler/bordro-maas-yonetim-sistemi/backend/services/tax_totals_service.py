@@ -0,0 +1,213 @@
+from sqlalchemy.orm import Session, Query
+from sqlalchemy import func, extract, select, delete, insert, update, bindparam
+from datetime import date, datetime
+from typing import Dict, Iterable, List
+from models import Payroll, EmployeeTaxYearTotal, PayrollStatus
+
+def backfill_tax_year_totals(engine) -> None:
+    """
+    Toplam tablosu boşken bordro varsa yıllık toplamları bir kez oluştur (başlangıçta);
+    aksi halde önceki bordrolar kümülatif matraha katılmaz
+    """
+    with Session(engine) as db:
+        if db.execute(select(EmployeeTaxYearTotal.id).limit(1)).first() is not None:
+            return
+        if db.execute(select(Payroll.id).limit(1)).first() is not None:
+            TaxTotalsService(db).rebuild()
+
+class TaxTotalsService:
+    """
+    Çalışan bazında yıllık kümülatif vergi matrahı takibi
+    Toplamlar bordro oluşturma/iptal/silme işlemleriyle aynı transaction içinde
+    artımlı güncellenir; commit çağıran serviste yapılır.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _dialect(self) -> str:
+        """Desteklenen dialect adı (PostgreSQL/SQLite)"""
+        dialect = self.db.get_bind().dialect.name
+        if dialect not in ("postgresql", "sqlite"):
+            raise NotImplementedError(f"{dialect} veritabanı için UPSERT desteklenmiyor")
+        return dialect
+
+    def _insert(self):
+        """Dialect'e uygun INSERT ... ON CONFLICT yapısı"""
+        if self._dialect() == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        return dialect_insert(EmployeeTaxYearTotal)
+
+    def _non_negative(self, value):
+        """Toplamın sıfırın altına inmesini engelle (rebuild öncesi eksik toplamlardan düşme)"""
+        greatest = func.greatest if self._dialect() == "postgresql" else func.max
+        return greatest(value, 0)
+
+    def get_cumulative_tax_base(self, employee_id: int, period_start: date) -> float:
+        """
+        Çalışanın yıl içinde period_start'tan önceki dönemlerdeki kümülatif vergi matrahı
+
+        Bordrolar dönem sırasıyla oluşturulduğunda yıllık toplam satırı doğrudan kullanılır (tek indeksli okuma);
+        yıl içinde daha sonraki bir dönemin bordrosu zaten varsa önceki dönemler bordro tablosundan toplanır.
+        """
+        year_start, period_start = self._year_range(period_start)
+        later_exists = self.db.query(Payroll.id).filter(
+            Payroll.employee_id == employee_id,
+            Payroll.pay_period_start >= period_start,
+            Payroll.pay_period_start < datetime(year_start.year + 1, 1, 1),
+            Payroll.status != PayrollStatus.CANCELLED.value
+        ).first() is not None
+        if not later_exists:
+            result = self.db.query(EmployeeTaxYearTotal.cumulative_tax_base).filter(
+                EmployeeTaxYearTotal.employee_id == employee_id,
+                EmployeeTaxYearTotal.year == year_start.year
+            ).scalar()
+            return float(result or 0.0)
+        return self.get_cumulative_tax_bases([employee_id], period_start)[employee_id]
+
+    def get_cumulative_tax_bases(self, employee_ids: List[int], period_start: date) -> Dict[int, float]:
+        """Birden çok çalışanın period_start'tan önceki dönemlerdeki kümülatif matrahı (tek gruplu sorgu)"""
+        year_start, period_start = self._year_range(period_start)
+        rows = self.db.query(
+            Payroll.employee_id,
+            func.sum(func.coalesce(Payroll.tax_base, Payroll.gross_salary)).label("tax_base")
+        ).filter(
+            Payroll.employee_id.in_(employee_ids),
+            Payroll.pay_period_start >= year_start,
+            Payroll.pay_period_start < period_start,
+            Payroll.status != PayrollStatus.CANCELLED.value
+        ).group_by(Payroll.employee_id).all()
+        totals = {employee_id: 0.0 for employee_id in employee_ids}
+        totals.update({r.employee_id: float(r.tax_base or 0.0) for r in rows})
+        return totals
+
+    @staticmethod
+    def _year_range(period_start: date) -> tuple:
+        """(yıl başı, dönem başı) - DateTime kolonlarıyla karşılaştırma için gün başına çevrilmiş"""
+        if not isinstance(period_start, datetime):
+            period_start = datetime.combine(period_start, datetime.min.time())
+        return datetime(period_start.year, 1, 1), period_start
+
+    def apply_delta(self, employee_id: int, year: int, gross: float, tax_base: float, payroll_count: int) -> None:
+        """Yıllık toplamları artır/azalt (satır yoksa oluşturur, tek UPSERT)"""
+        self.apply_deltas([{
+            "employee_id": employee_id,
+            "year": year,
+            "cumulative_gross": gross,
+            "cumulative_tax_base": tax_base,
+            "payroll_count": payroll_count,
+        }])
+
+    def apply_deltas(self, deltas: List[dict]) -> None:
+        """Birden çok (employee_id, year) için toplamları güncelle"""
+        if not deltas:
+            return
+        stmt = self._insert()
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["employee_id", "year"],
+            set_={
+                "cumulative_gross": self._non_negative(
+                    EmployeeTaxYearTotal.cumulative_gross + stmt.excluded.cumulative_gross
+                ),
+                "cumulative_tax_base": self._non_negative(
+                    EmployeeTaxYearTotal.cumulative_tax_base + stmt.excluded.cumulative_tax_base
+                ),
+                "payroll_count": self._non_negative(
+                    EmployeeTaxYearTotal.payroll_count + stmt.excluded.payroll_count
+                ),
+                "updated_at": func.now(),
+            }
+        )
+        # Yeni satır negatif farkla açılmaz
+        self.db.execute(stmt, [
+            {
+                **delta,
+                "cumulative_gross": max(delta["cumulative_gross"], 0.0),
+                "cumulative_tax_base": max(delta["cumulative_tax_base"], 0.0),
+                "payroll_count": max(delta["payroll_count"], 0),
+            } for delta in deltas
+        ])
+
+    def _subtract(self, deltas: List[dict]) -> None:
+        """
+        Bordroları mevcut toplam satırlarından düş (sıfırın altına inmez)
+        Satırı olmayan (rebuild öncesi) yıllar için negatif satır oluşturulmaz.
+        """
+        if not deltas:
+            return
+        table = EmployeeTaxYearTotal.__table__
+        stmt = update(table).where(
+            table.c.employee_id == bindparam("b_employee_id"),
+            table.c.year == bindparam("b_year")
+        ).values(
+            cumulative_gross=self._non_negative(table.c.cumulative_gross - bindparam("b_gross")),
+            cumulative_tax_base=self._non_negative(table.c.cumulative_tax_base - bindparam("b_tax_base")),
+            payroll_count=self._non_negative(table.c.payroll_count - bindparam("b_payroll_count")),
+            updated_at=func.now()
+        )
+        self.db.execute(stmt, deltas)
+
+    def remove_payrolls(self, payrolls: Iterable[Payroll]) -> None:
+        """İptal edilen/silinen bordroları yıllık toplamlardan düş"""
+        self._subtract([
+            {
+                "b_employee_id": p.employee_id,
+                "b_year": p.pay_period_start.year,
+                "b_gross": p.gross_salary,
+                "b_tax_base": p.tax_base if p.tax_base is not None else p.gross_salary,
+                "b_payroll_count": 1,
+            } for p in payrolls
+        ])
+
+    def remove_payroll_query(self, payroll_query: Query) -> None:
+        """Sorguya uyan bordroların toplamlarını (çalışan, yıl) bazında gruplayarak düş"""
+        year = extract("year", Payroll.pay_period_start)
+        rows = payroll_query.with_entities(
+            Payroll.employee_id,
+            year.label("year"),
+            func.sum(Payroll.gross_salary).label("gross"),
+            func.sum(func.coalesce(Payroll.tax_base, Payroll.gross_salary)).label("tax_base"),
+            func.count(Payroll.id).label("payroll_count")
+        ).group_by(Payroll.employee_id, year).all()
+
+        self._subtract([
+            {
+                "b_employee_id": r.employee_id,
+                "b_year": int(r.year),
+                "b_gross": float(r.gross),
+                "b_tax_base": float(r.tax_base),
+                "b_payroll_count": r.payroll_count,
+            } for r in rows
+        ])
+
+    def rebuild(self, year: int = None) -> int:
+        """Toplamları bordro tablosundan yeniden oluştur (geçmiş veri/backfill için)"""
+        payroll_year = extract("year", Payroll.pay_period_start)
+
+        delete_stmt = delete(EmployeeTaxYearTotal)
+        source = select(
+            Payroll.employee_id,
+            payroll_year,
+            func.sum(Payroll.gross_salary),
+            func.sum(func.coalesce(Payroll.tax_base, Payroll.gross_salary)),
+            func.count(Payroll.id),
+            func.now()
+        ).where(
+            Payroll.status != PayrollStatus.CANCELLED.value
+        ).group_by(Payroll.employee_id, payroll_year)
+
+        if year is not None:
+            delete_stmt = delete_stmt.where(EmployeeTaxYearTotal.year == year)
+            source = source.where(payroll_year == year)
+
+        self.db.execute(delete_stmt)
+        result = self.db.execute(
+            insert(EmployeeTaxYearTotal).from_select(
+                ["employee_id", "year", "cumulative_gross", "cumulative_tax_base", "payroll_count", "updated_at"],
+                source
+            )
+        )
+        self.db.commit()
+        return result.rowcount
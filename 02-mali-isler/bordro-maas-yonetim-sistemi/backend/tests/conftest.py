@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Uygulama modülleri DATABASE_URL'yi import anında okur; testler veritabanına yazmaz
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,86 @@
+"""Kuruş tabanlı bordro hesaplaması: sabit örnekler ve tekil/toplu yol eşitliği"""
+import numpy as np
+import pytest
+
+from schemas import TaxBracket
+from services import money
+from services.payroll_service import PayrollService
+
+SGK_RATES = {"employee_rate": 14.0, "employer_rate": 15.5, "unemployment_rate": 1.0}
+TAX_BRACKETS = [
+    TaxBracket(min_amount=0, max_amount=110000, rate=15, description="İlk dilim %15"),
+    TaxBracket(min_amount=110000, max_amount=230000, rate=20, description="İkinci dilim %20"),
+    TaxBracket(min_amount=230000, max_amount=580000, rate=27, description="Üçüncü dilim %27"),
+    TaxBracket(min_amount=580000, max_amount=None, rate=35, description="Dördüncü dilim %35"),
+]
+
+# (brüt TL, önceki kümülatif matrah TL) -> beklenen kuruş tutarları
+GOLDEN_CASES = [
+    ((30000.00, 0), {"sgk_premium": 420000, "unemployment_insurance": 30000, "tax_base": 2550000,
+                     "income_tax": 382500, "net": 2167500, "employer_cost": 3465000}),
+    ((12345.67, 0), {"sgk_premium": 172839, "unemployment_insurance": 12346, "tax_base": 1049382,
+                     "income_tax": 157407, "net": 891975, "employer_cost": 1425925}),
+    # Yarım kuruş yukarı yuvarlanır: 1234.25 * %14 = 172.795 -> 172.80
+    ((1234.25, 0), {"sgk_premium": 17280, "unemployment_insurance": 1234, "tax_base": 104911,
+                    "income_tax": 15737, "net": 89174, "employer_cost": 142556}),
+    # Dilim geçişi: 100.000 -> 125.500 matrah (10.000 x %15 + 15.500 x %20)
+    ((30000.00, 100000), {"sgk_premium": 420000, "unemployment_insurance": 30000, "tax_base": 2550000,
+                          "income_tax": 460000, "net": 2090000, "employer_cost": 3465000}),
+]
+
+def _params() -> dict:
+    return {
+        "sgk_rate": money.to_rate(SGK_RATES["employee_rate"]),
+        "unemployment_rate": money.to_rate(SGK_RATES["unemployment_rate"]),
+        "employer_rate": money.to_rate(SGK_RATES["employer_rate"]),
+        "brackets": money.to_money_brackets(TAX_BRACKETS),
+    }
+
+@pytest.fixture
+def payroll_service(monkeypatch):
+    """Ayarları veritabanı yerine sabit oran ve dilimlerden okuyan bordro servisi"""
+    monkeypatch.setattr(
+        PayrollService, "_get_calculation_params",
+        lambda self, payroll_date=None: (SGK_RATES, TAX_BRACKETS)
+    )
+    return PayrollService(None)
+
+@pytest.mark.parametrize("case, expected", GOLDEN_CASES)
+def test_calculate_amounts_golden(case, expected):
+    gross, cumulative = case
+    amounts = vars(money.calculate_amounts(
+        money.to_kurus(gross), cumulative_tax_base_kurus=money.to_kurus(cumulative), **_params()
+    ))
+
+    assert {key: amounts[key] for key in expected} == expected
+    # Kuruş tutarlılığı: net + kesintiler = brüt
+    assert amounts["net"] + amounts["total_deductions"] == amounts["gross"]
+
+def test_calculate_amounts_batch_golden():
+    gross = np.array([money.to_kurus(g) for (g, _), _ in GOLDEN_CASES], dtype=np.int64)
+    cumulative = np.array([money.to_kurus(c) for (_, c), _ in GOLDEN_CASES], dtype=np.int64)
+    batch = money.calculate_amounts_batch(gross, cumulative_tax_base_kurus=cumulative, **_params())
+
+    for i, (_, expected) in enumerate(GOLDEN_CASES):
+        assert {key: int(batch[key][i]) for key in expected} == expected
+
+def test_calculate_payroll_batch_matches_single(payroll_service):
+    rng = np.random.default_rng(42)
+    gross = [g for (g, _), _ in GOLDEN_CASES] + np.round(rng.lognormal(np.log(35000), 0.45, 500), 2).tolist()
+    cumulative = [c for (_, c), _ in GOLDEN_CASES] + np.round(rng.uniform(0, 700000, 500), 2).tolist()
+
+    batch = payroll_service.calculate_payroll_batch(gross, cumulative_tax_bases=cumulative)
+    single = [payroll_service.calculate_payroll(g, cumulative_tax_base=c) for g, c in zip(gross, cumulative)]
+
+    assert batch == single
+    for (_, expected), result in zip(GOLDEN_CASES, batch):
+        assert money.to_kurus(result.net_salary) == expected["net"]
+        assert money.to_kurus(result.deductions["gelir_vergisi"]["tutar"]) == expected["income_tax"]
+
+def test_calculate_payroll_batch_without_cumulative(payroll_service):
+    gross = [30000.00, 12345.67, 1234.25]
+
+    batch = payroll_service.calculate_payroll_batch(gross)
+    single = [payroll_service.calculate_payroll(g) for g in gross]
+
+    assert batch == single
@@ -7,6 +7,7 @@ from app.models.driver import Driver
 from app.models.user import User
 from app.schemas.driver import DriverCreate, DriverUpdate, Driver as DriverSchema
 from app.api.v1.auth import get_current_user
+from app.core.cache import dashboard_cache
 
 router = APIRouter()
 
@@ -60,6 +61,7 @@ def create_driver(
     db_driver = Driver(**driver.dict())
     db.add(db_driver)
     db.commit()
+    dashboard_cache.invalidate()
     db.refresh(db_driver)
     
     return db_driver
@@ -80,6 +82,7 @@ def update_driver(
         setattr(driver, field, value)
     
     db.commit()
+    dashboard_cache.invalidate()
     db.refresh(driver)
     
     return driver
@@ -96,5 +99,6 @@ def delete_driver(
     
     driver.is_active = False
     db.commit()
+    dashboard_cache.invalidate()
     
     return {"message": "Driver deactivated successfully"}
\ No newline at end of file
@@ -1,18 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from datetime import date
-from sqlalchemy import func
+from datetime import date, datetime, timedelta
+from sqlalchemy import func, select, case
 
 from app.database import get_db
 from app.models.fuel import FuelRecord
 from app.models.vehicle import Vehicle
 from app.models.user import User
-from app.schemas.fuel import FuelRecordCreate, FuelRecordUpdate, FuelRecord as FuelRecordSchema
+from app.schemas.fuel import FuelRecordCreate, FuelRecordUpdate, FuelRecord as FuelRecordSchema, FuelConsumptionPoint, FuelImportResult
 from app.api.v1.auth import get_current_user
+from app.core.cache import dashboard_cache
+from app.services import vehicle_stats, fuel_anomalies, fuel_import
+from app.models.fuel_anomaly import FuelAnomaly, AnomalyStatus
 
 router = APIRouter()
 
+# Değişince kaydın bulguları ve aracın artımlı yakıt istatistikleri (last_km, EWMA) geçersiz olan alanlar
+DETECTION_FIELDS = {"vehicle_id", "fuel_date", "km_at_fueling", "liters", "receipt_number"}
+
 @router.get("/", response_model=List[FuelRecordSchema])
 def get_fuel_records(
     skip: int = Query(0, ge=0),
@@ -65,11 +71,35 @@ def create_fuel_record(
         vehicle.current_km = fuel_record.km_at_fueling
     
     db.add(db_fuel_record)
+    db.flush()
+    vehicle_stats.add_fuel_record(db, db_fuel_record)
+    fuel_anomalies.detect_fuel_record(db, db_fuel_record, vehicle)
     db.commit()
+    dashboard_cache.invalidate()
     db.refresh(db_fuel_record)
     
     return db_fuel_record
 
+@router.post("/import", response_model=FuelImportResult)
+def import_fuel_statement(
+    file: UploadFile = File(...),
+    detect_anomalies: bool = True,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Akaryakıt kartı ekstresi (CSV/XLSX) içe aktarımı; tekrar eden (araç, fiş no, tarih) satırları atlanır"""
+    try:
+        result = fuel_import.import_statement(
+            db, file.file, file.filename, current_user.id, detect_anomalies=detect_anomalies
+        )
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        dashboard_cache.invalidate()
+    
+    return result
+
 @router.put("/{fuel_record_id}", response_model=FuelRecordSchema)
 def update_fuel_record(
     fuel_record_id: int,
@@ -81,11 +111,22 @@ def update_fuel_record(
     if not record:
         raise HTTPException(status_code=404, detail="Fuel record not found")
     
+    old_cell = vehicle_stats.fuel_cell(record)
+    old_vehicle_id = record.vehicle_id
     update_data = fuel_record_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(record, field, value)
     
+    vehicle_stats.refresh_cells(db, [old_cell, vehicle_stats.fuel_cell(record)])
+    if DETECTION_FIELDS & update_data.keys():
+        # Açık bulgular düzeltilmiş değerlerle yeniden değerlendirilir; incelenmiş bulgular korunur
+        db.query(FuelAnomaly).filter(
+            FuelAnomaly.fuel_record_id == record.id,
+            FuelAnomaly.status == AnomalyStatus.OPEN
+        ).delete(synchronize_session=False)
+        fuel_anomalies.rescan(db, vehicle_ids=sorted({old_vehicle_id, record.vehicle_id}))
     db.commit()
+    dashboard_cache.invalidate()
     db.refresh(record)
     
     return record
@@ -100,11 +141,50 @@ def delete_fuel_record(
     if not record:
         raise HTTPException(status_code=404, detail="Fuel record not found")
     
+    cell = vehicle_stats.fuel_cell(record)
+    vehicle_id = record.vehicle_id
+    db.query(FuelAnomaly).filter(FuelAnomaly.fuel_record_id == record.id).delete(synchronize_session=False)
     db.delete(record)
+    vehicle_stats.refresh_cells(db, [cell])
+    # Silinen kaydın km/tüketimi aracın artımlı yakıt istatistiklerinden çıkarılır (rescan commit eder)
+    fuel_anomalies.rescan(db, vehicle_ids=[vehicle_id])
     db.commit()
+    dashboard_cache.invalidate()
     
     return {"message": "Fuel record deleted successfully"}
 
+def _consumption_intervals(vehicle_id: int, start_date: Optional[date], end_date: Optional[date]):
+    """
+    Ardışık yakıt alımları arası km ve 100 km tüketimi, SQL'de LAG() ile
+    Pencere, aralıktan önceki son alımı da içerir; böylece aralığın ilk alımının da bir önceki km değeri olur
+    """
+    window_criteria = [FuelRecord.vehicle_id == vehicle_id]
+    if end_date:
+        window_criteria.append(FuelRecord.fuel_date < datetime.combine(end_date, datetime.min.time()) + timedelta(days=1))
+    if start_date:
+        start = datetime.combine(start_date, datetime.min.time())
+        previous_fuel_date = select(func.max(FuelRecord.fuel_date)).where(
+            FuelRecord.vehicle_id == vehicle_id,
+            FuelRecord.fuel_date < start
+        ).scalar_subquery()
+        window_criteria.append(FuelRecord.fuel_date >= func.coalesce(previous_fuel_date, start))
+    
+    previous_km = func.lag(FuelRecord.km_at_fueling).over(
+        partition_by=FuelRecord.vehicle_id,
+        order_by=(FuelRecord.fuel_date, FuelRecord.id)
+    )
+    intervals = select(
+        FuelRecord.id.label("fuel_record_id"),
+        FuelRecord.fuel_date,
+        FuelRecord.km_at_fueling,
+        FuelRecord.liters,
+        (FuelRecord.km_at_fueling - previous_km).label("km_since_last")
+    ).where(*window_criteria).subquery()
+    
+    if start_date:
+        return intervals, [intervals.c.fuel_date >= start]
+    return intervals, []
+
 @router.get("/statistics/consumption")
 def get_fuel_consumption_stats(
     vehicle_id: int,
@@ -127,16 +207,17 @@ def get_fuel_consumption_stats(
     
     stats = query.first()
     
-    fuel_records = db.query(FuelRecord).filter(
-        FuelRecord.vehicle_id == vehicle_id
-    ).order_by(FuelRecord.km_at_fueling).all()
+    # Ortalama tüketim: km'si artan aralıklarda alınan yakıt / katedilen km
+    intervals, criteria = _consumption_intervals(vehicle_id, start_date, end_date)
+    forward = intervals.c.km_since_last > 0
+    consumption = db.query(
+        func.sum(case((forward, intervals.c.liters))).label("liters"),
+        func.sum(case((forward, intervals.c.km_since_last))).label("km")
+    ).filter(*criteria).one()
     
     consumption_per_100km = None
-    if len(fuel_records) > 1:
-        total_km = fuel_records[-1].km_at_fueling - fuel_records[0].km_at_fueling
-        total_fuel = sum(record.liters for record in fuel_records[1:])
-        if total_km > 0:
-            consumption_per_100km = (total_fuel / total_km) * 100
+    if consumption.km:
+        consumption_per_100km = (consumption.liters / consumption.km) * 100
     
     return {
         "total_liters": stats.total_liters or 0,
@@ -144,4 +225,25 @@ def get_fuel_consumption_stats(
         "refuel_count": stats.refuel_count or 0,
         "avg_price_per_liter": stats.avg_price_per_liter or 0,
         "consumption_per_100km": consumption_per_100km
-    }
\ No newline at end of file
+    }
+
+@router.get("/statistics/consumption/series", response_model=List[FuelConsumptionPoint])
+def get_fuel_consumption_series(
+    vehicle_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    intervals, criteria = _consumption_intervals(vehicle_id, start_date, end_date)
+    km = intervals.c.km_since_last
+    rows = db.query(
+        intervals.c.fuel_record_id,
+        intervals.c.fuel_date,
+        intervals.c.km_at_fueling,
+        intervals.c.liters,
+        km.label("km_since_last"),
+        case((km > 0, intervals.c.liters * 100.0 / km)).label("consumption_per_100km")
+    ).filter(*criteria).order_by(intervals.c.fuel_date, intervals.c.fuel_record_id).all()
+    
+    return rows
\ No newline at end of file
@@ -0,0 +1,82 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from typing import List, Optional
+from datetime import date
+
+from app.database import get_db
+from app.models.fuel_anomaly import FuelAnomaly, AnomalyType, AnomalyStatus
+from app.models.user import User
+from app.schemas.fuel_anomaly import (
+    FuelAnomaly as FuelAnomalySchema, FuelAnomalyReview, FuelAnomalyRescanResult
+)
+from app.api.v1.auth import get_current_user
+from app.services import fuel_anomalies
+
+router = APIRouter()
+
+@router.get("/", response_model=List[FuelAnomalySchema])
+def get_fuel_anomalies(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    status: Optional[AnomalyStatus] = AnomalyStatus.OPEN,
+    anomaly_type: Optional[AnomalyType] = None,
+    vehicle_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    query = db.query(FuelAnomaly)
+    
+    if status:
+        query = query.filter(FuelAnomaly.status == status)
+    if anomaly_type:
+        query = query.filter(FuelAnomaly.anomaly_type == anomaly_type)
+    if vehicle_id:
+        query = query.filter(FuelAnomaly.vehicle_id == vehicle_id)
+    
+    return query.order_by(FuelAnomaly.id.desc()).offset(skip).limit(limit).all()
+
+@router.get("/{anomaly_id}", response_model=FuelAnomalySchema)
+def get_fuel_anomaly(
+    anomaly_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    anomaly = db.query(FuelAnomaly).filter(FuelAnomaly.id == anomaly_id).first()
+    if not anomaly:
+        raise HTTPException(status_code=404, detail="Fuel anomaly not found")
+    return anomaly
+
+@router.put("/{anomaly_id}/review", response_model=FuelAnomalySchema)
+def review_fuel_anomaly(
+    anomaly_id: int,
+    review: FuelAnomalyReview,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    anomaly = db.query(FuelAnomaly).filter(FuelAnomaly.id == anomaly_id).first()
+    if not anomaly:
+        raise HTTPException(status_code=404, detail="Fuel anomaly not found")
+    
+    anomaly.status = review.status
+    anomaly.review_note = review.review_note
+    anomaly.reviewed_by = current_user.id
+    anomaly.reviewed_at = func.now()
+    
+    db.commit()
+    db.refresh(anomaly)
+    
+    return anomaly
+
+@router.post("/rescan", response_model=FuelAnomalyRescanResult)
+def rescan_fuel_records(
+    vehicle_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    return fuel_anomalies.rescan(db, vehicle_id, start_date, end_date)
\ No newline at end of file
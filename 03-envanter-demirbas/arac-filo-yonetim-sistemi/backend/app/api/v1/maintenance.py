@@ -1,14 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from datetime import datetime, date
+from datetime import date, timedelta
 
 from app.database import get_db
-from app.models.maintenance import Maintenance
+from app.models.maintenance import Maintenance, MaintenancePrediction
 from app.models.vehicle import Vehicle
 from app.models.user import User
-from app.schemas.maintenance import MaintenanceCreate, MaintenanceUpdate, Maintenance as MaintenanceSchema
+from app.schemas.maintenance import (
+    MaintenanceCreate, MaintenanceUpdate, Maintenance as MaintenanceSchema,
+    MaintenancePrediction as MaintenancePredictionSchema
+)
 from app.api.v1.auth import get_current_user
+from app.core.cache import dashboard_cache
+from app.services import vehicle_stats, maintenance_schedule
 
 router = APIRouter()
 
@@ -64,7 +69,11 @@ def create_maintenance_record(
         vehicle.current_km = maintenance.km_at_service
     
     db.add(db_maintenance)
+    vehicle_stats.add_maintenance(db, db_maintenance)
+    db.flush()
+    maintenance_schedule.refresh_predictions(db, [db_maintenance.vehicle_id])
     db.commit()
+    dashboard_cache.invalidate()
     db.refresh(db_maintenance)
     
     return db_maintenance
@@ -80,11 +89,16 @@ def update_maintenance_record(
     if not record:
         raise HTTPException(status_code=404, detail="Maintenance record not found")
     
+    old_cell = vehicle_stats.maintenance_cell(record)
+    old_vehicle_id = record.vehicle_id
     update_data = maintenance_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(record, field, value)
     
+    vehicle_stats.refresh_cells(db, [old_cell, vehicle_stats.maintenance_cell(record)])
+    maintenance_schedule.refresh_predictions(db, [old_vehicle_id, record.vehicle_id])
     db.commit()
+    dashboard_cache.invalidate()
     db.refresh(record)
     
     return record
@@ -99,23 +113,48 @@ def delete_maintenance_record(
     if not record:
         raise HTTPException(status_code=404, detail="Maintenance record not found")
     
+    cell = vehicle_stats.maintenance_cell(record)
+    vehicle_id = record.vehicle_id
+    # Tahmin satırı bakım kaydına FK ile bağlı; önce silinir, refresh_predictions aracın tahminlerini yeniden kurar
+    db.query(MaintenancePrediction).filter(
+        MaintenancePrediction.maintenance_id == record.id
+    ).delete(synchronize_session=False)
     db.delete(record)
+    vehicle_stats.refresh_cells(db, [cell])
+    maintenance_schedule.refresh_predictions(db, [vehicle_id])
     db.commit()
+    dashboard_cache.invalidate()
     
     return {"message": "Maintenance record deleted successfully"}
 
-@router.get("/upcoming/", response_model=List[MaintenanceSchema])
+@router.get("/upcoming/", response_model=List[MaintenancePredictionSchema])
 def get_upcoming_maintenance(
     days: int = Query(30, ge=1, le=365),
+    include_overdue: bool = False,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Tarih veya tahmini km hedefi yaklaşan bakımlar (maintenance_predictions, due_date sırasıyla)"""
+    today = date.today()
+    query = db.query(MaintenancePrediction).filter(MaintenancePrediction.due_date <= today + timedelta(days=days))
+    
+    if not include_overdue:
+        query = query.filter(MaintenancePrediction.due_date >= today)
+    
+    return query.order_by(MaintenancePrediction.due_date, MaintenancePrediction.id).offset(skip).limit(limit).all()
+
+@router.post("/predictions/refresh")
+def refresh_maintenance_predictions(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    from datetime import timedelta
-    upcoming_date = datetime.now() + timedelta(days=days)
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    records = db.query(Maintenance).filter(
-        Maintenance.next_service_date <= upcoming_date,
-        Maintenance.next_service_date >= datetime.now()
-    ).order_by(Maintenance.next_service_date).all()
+    rows = maintenance_schedule.refresh_predictions(db)
+    db.commit()
+    dashboard_cache.invalidate()
     
-    return records
\ No newline at end of file
+    return {"predictions": rows}
\ No newline at end of file
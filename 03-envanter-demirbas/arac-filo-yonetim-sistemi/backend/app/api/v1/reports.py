@@ -1,7 +1,7 @@
 from datetime import timedelta
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import func, extract, case, tuple_, and_
 from typing import Optional
 from datetime import date, datetime
 import calendar
@@ -9,94 +9,160 @@ import calendar
 from app.database import get_db
 from app.models.vehicle import Vehicle, VehicleStatus
 from app.models.driver import Driver
-from app.models.maintenance import Maintenance
+from app.models.maintenance import Maintenance, MaintenancePrediction
 from app.models.fuel import FuelRecord
+from app.models.vehicle_stats import VehicleMonthStats
 from app.models.user import User
 from app.api.v1.auth import get_current_user
+from app.core.cache import dashboard_cache
+from app.core.sql import greatest
+from app.services import vehicle_stats
 
 router = APIRouter()
 
+def _is_month_aligned(start: datetime, end: datetime) -> bool:
+    """[start, end) tam aylardan oluşuyorsa özet tablosundan (vehicle_month_stats) okunabilir"""
+    return start.day == 1 and end.day == 1 and start.time() == end.time() == datetime.min.time()
+
+def _cube_period(start: datetime, end: datetime) -> list:
+    """Yarı açık tarih aralığının özet tablosundaki (yıl, ay) karşılığı"""
+    period = tuple_(VehicleMonthStats.year, VehicleMonthStats.month)
+    return [period >= (start.year, start.month), period < (end.year, end.month)]
+
+def _date_range(start_date: date, end_date: date):
+    """Bitiş günü dahil tarih aralığını yarı açık datetime aralığına çevir"""
+    start = datetime.combine(start_date, datetime.min.time())
+    end = datetime.combine(end_date, datetime.min.time()) + timedelta(days=1)
+    return start, end
+
+def _compute_dashboard_stats(db: Session) -> dict:
+    now = datetime.now()
+    active = Vehicle.is_active == True
+    
+    # Tek sorgu: araç sayıları koşullu toplamla, diğer metrikler skaler alt sorgularla
+    total_drivers = db.query(func.count(Driver.id)).filter(Driver.is_active == True).scalar_subquery()
+    current_month = (VehicleMonthStats.year == now.year, VehicleMonthStats.month == now.month)
+    monthly_fuel_cost = db.query(
+        func.coalesce(func.sum(VehicleMonthStats.fuel_cost), 0)
+    ).filter(*current_month).scalar_subquery()
+    monthly_maintenance_cost = db.query(
+        func.coalesce(func.sum(VehicleMonthStats.maintenance_cost), 0)
+    ).filter(*current_month).scalar_subquery()
+    # Tarih veya tahmini km hedefi önümüzdeki 30 gün içinde olan bakımlar
+    upcoming_maintenance = db.query(func.count(MaintenancePrediction.id)).filter(
+        MaintenancePrediction.due_date >= now.date(),
+        MaintenancePrediction.due_date <= now.date() + timedelta(days=30)
+    ).scalar_subquery()
+    
+    row = db.query(
+        func.count(case((active, 1))).label("total_vehicles"),
+        func.count(case((active & (Vehicle.status == VehicleStatus.ACTIVE), 1))).label("active_vehicles"),
+        func.count(case((active & (Vehicle.status == VehicleStatus.MAINTENANCE), 1))).label("maintenance_vehicles"),
+        total_drivers.label("total_drivers"),
+        monthly_fuel_cost.label("monthly_fuel_cost"),
+        monthly_maintenance_cost.label("monthly_maintenance_cost"),
+        upcoming_maintenance.label("upcoming_maintenance")
+    ).select_from(Vehicle).one()
+    
+    return {
+        "total_vehicles": row.total_vehicles,
+        "active_vehicles": row.active_vehicles,
+        "maintenance_vehicles": row.maintenance_vehicles,
+        "total_drivers": row.total_drivers,
+        "monthly_fuel_cost": row.monthly_fuel_cost,
+        "monthly_maintenance_cost": row.monthly_maintenance_cost,
+        "upcoming_maintenance": row.upcoming_maintenance,
+        "total_monthly_cost": row.monthly_fuel_cost + row.monthly_maintenance_cost
+    }
+
 @router.get("/dashboard")
 def get_dashboard_stats(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    total_vehicles = db.query(Vehicle).filter(Vehicle.is_active == True).count()
-    active_vehicles = db.query(Vehicle).filter(
-        Vehicle.status == VehicleStatus.ACTIVE,
-        Vehicle.is_active == True
-    ).count()
-    maintenance_vehicles = db.query(Vehicle).filter(
-        Vehicle.status == VehicleStatus.MAINTENANCE,
-        Vehicle.is_active == True
-    ).count()
-    
-    total_drivers = db.query(Driver).filter(Driver.is_active == True).count()
-    
-    current_month = datetime.now().month
-    current_year = datetime.now().year
-    
-    monthly_fuel_cost = db.query(func.sum(FuelRecord.total_cost)).filter(
-        extract('month', FuelRecord.fuel_date) == current_month,
-        extract('year', FuelRecord.fuel_date) == current_year
-    ).scalar() or 0
-    
-    monthly_maintenance_cost = db.query(func.sum(Maintenance.cost)).filter(
-        extract('month', Maintenance.service_date) == current_month,
-        extract('year', Maintenance.service_date) == current_year
-    ).scalar() or 0
-    
-    upcoming_maintenance = db.query(Maintenance).filter(
-        Maintenance.next_service_date >= datetime.now(),
-        Maintenance.next_service_date <= datetime.now().replace(day=28) + timedelta(days=30)
-    ).count()
-    
-    return {
-        "total_vehicles": total_vehicles,
-        "active_vehicles": active_vehicles,
-        "maintenance_vehicles": maintenance_vehicles,
-        "total_drivers": total_drivers,
-        "monthly_fuel_cost": monthly_fuel_cost,
-        "monthly_maintenance_cost": monthly_maintenance_cost,
-        "upcoming_maintenance": upcoming_maintenance,
-        "total_monthly_cost": monthly_fuel_cost + monthly_maintenance_cost
-    }
+    # Kısa TTL ile kullanıcı bazında önbellek; araç/sürücü/yakıt/bakım yazmalarında temizlenir
+    return dashboard_cache.get_or_set(("dashboard", current_user.id), lambda: _compute_dashboard_stats(db))
 
 @router.get("/vehicle-utilization")
 def get_vehicle_utilization_report(
     start_date: date,
     end_date: date,
     department: Optional[str] = None,
+    rank: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    query = db.query(
-        Vehicle.id,
-        Vehicle.plate_number,
-        Vehicle.brand,
-        Vehicle.model,
-        Vehicle.department,
-        func.count(FuelRecord.id).label("fuel_entries"),
-        func.sum(FuelRecord.liters).label("total_fuel"),
-        func.max(FuelRecord.km_at_fueling).label("max_km"),
-        func.min(FuelRecord.km_at_fueling).label("min_km")
-    ).outerjoin(FuelRecord, Vehicle.id == FuelRecord.vehicle_id).filter(
-        Vehicle.is_active == True,
-        FuelRecord.fuel_date >= start_date,
-        FuelRecord.fuel_date <= end_date
-    ).group_by(Vehicle.id)
+    start, end = _date_range(start_date, end_date)
+    # Aralıktan önceki son km okuması; ilk dolumdan önce yapılan yol da aralığa sayılır ((vehicle_id, fuel_date) indeksinde tek arama)
+    previous = aliased(FuelRecord)
+    previous_km = db.query(previous.km_at_fueling).filter(
+        previous.vehicle_id == Vehicle.id,
+        previous.fuel_date < start
+    ).order_by(previous.fuel_date.desc()).limit(1).correlate(Vehicle).scalar_subquery()
+    
+    if _is_month_aligned(start, end):
+        # Tam aylar: araç başına özet tablosundan
+        stats = db.query(
+            VehicleMonthStats.vehicle_id,
+            func.sum(VehicleMonthStats.refuel_count).label("fuel_entries"),
+            func.sum(VehicleMonthStats.fuel_liters).label("total_fuel"),
+            func.max(VehicleMonthStats.max_km).label("max_km"),
+            func.min(VehicleMonthStats.min_km).label("min_km")
+        ).filter(*_cube_period(start, end)).group_by(VehicleMonthStats.vehicle_id).subquery()
+        query = db.query(
+            Vehicle.id,
+            Vehicle.plate_number,
+            Vehicle.brand,
+            Vehicle.model,
+            Vehicle.department,
+            func.coalesce(stats.c.fuel_entries, 0).label("fuel_entries"),
+            stats.c.total_fuel,
+            stats.c.max_km,
+            stats.c.min_km,
+            previous_km.label("previous_km")
+        ).outerjoin(stats, stats.c.vehicle_id == Vehicle.id).filter(Vehicle.is_active == True)
+    else:
+        # Tarih koşulu birleştirme koşulunda: yakıt kaydı olmayan araçlar da listelenir,
+        # her araç için (vehicle_id, fuel_date) indeksinde yalnızca aralık taranır
+        query = db.query(
+            Vehicle.id,
+            Vehicle.plate_number,
+            Vehicle.brand,
+            Vehicle.model,
+            Vehicle.department,
+            func.count(FuelRecord.id).label("fuel_entries"),
+            func.sum(FuelRecord.liters).label("total_fuel"),
+            func.max(FuelRecord.km_at_fueling).label("max_km"),
+            func.min(FuelRecord.km_at_fueling).label("min_km"),
+            previous_km.label("previous_km")
+        ).outerjoin(FuelRecord, and_(
+            FuelRecord.vehicle_id == Vehicle.id,
+            FuelRecord.fuel_date >= start,
+            FuelRecord.fuel_date < end
+        )).filter(Vehicle.is_active == True).group_by(Vehicle.id)
     
     if department:
         query = query.filter(Vehicle.department == department)
     
-    results = query.all()
+    # Araç başına toplamlar alt sorguda; km ve yüzdelik sıra aynı sorguda hesaplanır
+    per_vehicle = query.subquery()
+    km_column = case(
+        (per_vehicle.c.max_km.is_(None), 0),
+        else_=greatest(per_vehicle.c.max_km - func.coalesce(per_vehicle.c.previous_km, per_vehicle.c.min_km), 0)
+    )
+    columns = [per_vehicle, km_column.label("km_driven")]
+    if rank:
+        columns.append(func.percent_rank().over(order_by=km_column).label("utilization_percentile"))
+    results = db.query(*columns).order_by(
+        *((km_column.desc(), per_vehicle.c.id) if rank else (per_vehicle.c.id,))
+    ).all()
     
     report = []
     for result in results:
-        km_driven = (result.max_km - result.min_km) if result.max_km and result.min_km else 0
+        km_driven = result.km_driven
         fuel_efficiency = (result.total_fuel / km_driven * 100) if km_driven > 0 and result.total_fuel else 0
         
-        report.append({
+        row = {
             "vehicle_id": result.id,
             "plate_number": result.plate_number,
             "vehicle": f"{result.brand} {result.model}",
@@ -105,56 +171,150 @@ def get_vehicle_utilization_report(
             "total_fuel": result.total_fuel or 0,
             "fuel_entries": result.fuel_entries,
             "fuel_efficiency": round(fuel_efficiency, 2)
-        })
+        }
+        if rank:
+            row["utilization_percentile"] = round(result.utilization_percentile * 100, 1)
+        report.append(row)
     
     return report
 
+def _time_buckets(start: datetime, end: datetime, group_by: str) -> list:
+    """Aralıktaki tüm ay/çeyrek anahtarları (maliyeti olmayan dönemler de 0 ile listelenir)"""
+    buckets = []
+    year, month = start.year, start.month
+    while datetime(year, month, 1) < end:
+        key = (year, month) if group_by == "month" else (year, (month - 1) // 3 + 1)
+        if not buckets or buckets[-1] != key:
+            buckets.append(key)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return buckets
+
+def _group_key(row, group_by: str):
+    if group_by == "month":
+        return (int(row.year), int(row.month))
+    if group_by == "quarter":
+        return (int(row.year), (int(row.month) - 1) // 3 + 1)
+    if group_by == "department":
+        return row.department
+    return (row.vehicle_id, row.plate_number)
+
+def _grouped_costs(db: Session, model, date_column, cost_column, start: datetime, end: datetime,
+                   group_by: str, vehicle_id: Optional[int], department: Optional[str]) -> dict:
+    """Tek kaynağın maliyetini tek GROUP BY sorgusuyla grup anahtarı -> toplam olarak döndür"""
+    if group_by in ("month", "quarter"):
+        keys = [extract('year', date_column).label("year"), extract('month', date_column).label("month")]
+    elif group_by == "department":
+        keys = [Vehicle.department.label("department")]
+    else:
+        keys = [Vehicle.id.label("vehicle_id"), Vehicle.plate_number.label("plate_number")]
+    
+    query = db.query(*keys, func.sum(cost_column).label("cost")).filter(
+        date_column >= start,
+        date_column < end
+    )
+    if group_by in ("department", "vehicle") or department:
+        query = query.join(Vehicle, Vehicle.id == model.vehicle_id)
+    if vehicle_id:
+        query = query.filter(model.vehicle_id == vehicle_id)
+    if department:
+        query = query.filter(Vehicle.department == department)
+    
+    costs = {}
+    for row in query.group_by(*keys).all():
+        key = _group_key(row, group_by)
+        costs[key] = costs.get(key, 0) + (row.cost or 0)
+    return costs
+
+def _cube_costs(db: Session, start: datetime, end: datetime, group_by: str,
+                vehicle_id: Optional[int], department: Optional[str]):
+    """Tam aylık aralıklar için yakıt ve bakım maliyetleri özet tablosundan tek GROUP BY ile"""
+    if group_by in ("month", "quarter"):
+        keys = [VehicleMonthStats.year.label("year"), VehicleMonthStats.month.label("month")]
+    elif group_by == "department":
+        keys = [Vehicle.department.label("department")]
+    else:
+        keys = [Vehicle.id.label("vehicle_id"), Vehicle.plate_number.label("plate_number")]
+    
+    query = db.query(
+        *keys,
+        func.sum(VehicleMonthStats.fuel_cost).label("fuel_cost"),
+        func.sum(VehicleMonthStats.maintenance_cost).label("maintenance_cost")
+    ).filter(*_cube_period(start, end))
+    if group_by in ("department", "vehicle") or department:
+        query = query.join(Vehicle, Vehicle.id == VehicleMonthStats.vehicle_id)
+    if vehicle_id:
+        query = query.filter(VehicleMonthStats.vehicle_id == vehicle_id)
+    if department:
+        query = query.filter(Vehicle.department == department)
+    
+    fuel_costs, maintenance_costs = {}, {}
+    for row in query.group_by(*keys).all():
+        key = _group_key(row, group_by)
+        fuel_costs[key] = fuel_costs.get(key, 0) + (row.fuel_cost or 0)
+        maintenance_costs[key] = maintenance_costs.get(key, 0) + (row.maintenance_cost or 0)
+    return fuel_costs, maintenance_costs
+
 @router.get("/cost-analysis")
 def get_cost_analysis_report(
     year: int = Query(datetime.now().year),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    group_by: str = Query("month", pattern="^(month|quarter|department|vehicle)$"),
     vehicle_id: Optional[int] = None,
     department: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    months = []
+    # Tarih aralığı verilmezse yılın tamamı; bitiş günü dahil
+    start = datetime.combine(start_date, datetime.min.time()) if start_date else datetime(year, 1, 1)
+    end = _date_range(start_date, end_date)[1] if end_date else datetime(year + 1, 1, 1)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start_date must be before end_date")
     
-    for month in range(1, 13):
-        fuel_query = db.query(func.sum(FuelRecord.total_cost)).filter(
-            extract('month', FuelRecord.fuel_date) == month,
-            extract('year', FuelRecord.fuel_date) == year
+    # Sabit sayıda sorgu: tam aylar özet tablosundan, diğer aralıklar kaynak başına bir GROUP BY
+    if _is_month_aligned(start, end):
+        fuel_costs, maintenance_costs = _cube_costs(db, start, end, group_by, vehicle_id, department)
+    else:
+        fuel_costs = _grouped_costs(
+            db, FuelRecord, FuelRecord.fuel_date, FuelRecord.total_cost, start, end, group_by, vehicle_id, department
         )
-        
-        maintenance_query = db.query(func.sum(Maintenance.cost)).filter(
-            extract('month', Maintenance.service_date) == month,
-            extract('year', Maintenance.service_date) == year
+        maintenance_costs = _grouped_costs(
+            db, Maintenance, Maintenance.service_date, Maintenance.cost, start, end, group_by, vehicle_id, department
         )
-        
-        if vehicle_id:
-            fuel_query = fuel_query.filter(FuelRecord.vehicle_id == vehicle_id)
-            maintenance_query = maintenance_query.filter(Maintenance.vehicle_id == vehicle_id)
-        
-        if department:
-            vehicle_ids = db.query(Vehicle.id).filter(Vehicle.department == department).subquery()
-            fuel_query = fuel_query.filter(FuelRecord.vehicle_id.in_(vehicle_ids))
-            maintenance_query = maintenance_query.filter(Maintenance.vehicle_id.in_(vehicle_ids))
-        
-        fuel_cost = fuel_query.scalar() or 0
-        maintenance_cost = maintenance_query.scalar() or 0
-        
-        months.append({
-            "month": calendar.month_name[month],
+    
+    if group_by in ("month", "quarter"):
+        keys = _time_buckets(start, end, group_by)
+    else:
+        keys = sorted(set(fuel_costs) | set(maintenance_costs), key=lambda key: (key is None, key))
+    
+    groups = []
+    for key in keys:
+        fuel_cost = fuel_costs.get(key, 0)
+        maintenance_cost = maintenance_costs.get(key, 0)
+        if group_by == "month":
+            group = {"month": calendar.month_name[key[1]], "year": key[0], "period": f"{key[0]}-{key[1]:02d}"}
+        elif group_by == "quarter":
+            group = {"quarter": key[1], "year": key[0], "period": f"{key[0]}-Q{key[1]}"}
+        elif group_by == "department":
+            group = {"department": key}
+        else:
+            group = {"vehicle_id": key[0], "plate_number": key[1]}
+        group.update({
             "fuel_cost": fuel_cost,
             "maintenance_cost": maintenance_cost,
             "total_cost": fuel_cost + maintenance_cost
         })
+        groups.append(group)
     
-    total_fuel = sum(m["fuel_cost"] for m in months)
-    total_maintenance = sum(m["maintenance_cost"] for m in months)
+    total_fuel = sum(g["fuel_cost"] for g in groups)
+    total_maintenance = sum(g["maintenance_cost"] for g in groups)
     
     return {
         "year": year,
-        "months": months,
+        "start_date": start.date(),
+        "end_date": (end - timedelta(days=1)).date(),
+        "group_by": group_by,
+        "months" if group_by == "month" else "groups": groups,
         "annual_summary": {
             "total_fuel_cost": total_fuel,
             "total_maintenance_cost": total_maintenance,
@@ -169,21 +329,41 @@ def get_driver_performance_report(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    from datetime import timedelta
-    
-    results = db.query(
-        Driver.id,
-        Driver.first_name,
-        Driver.last_name,
-        Driver.department,
-        func.count(FuelRecord.id).label("fuel_entries"),
-        func.sum(FuelRecord.liters).label("total_fuel"),
-        func.sum(FuelRecord.total_cost).label("total_fuel_cost")
-    ).outerjoin(FuelRecord, Driver.id == FuelRecord.driver_id).filter(
-        Driver.is_active == True,
-        FuelRecord.fuel_date >= start_date,
-        FuelRecord.fuel_date <= end_date
-    ).group_by(Driver.id).all()
+    start, end = _date_range(start_date, end_date)
+    if _is_month_aligned(start, end):
+        # Tam aylar: sürücü başına özet tablosundan (0: sürücüsüz kayıtlar)
+        stats = db.query(
+            VehicleMonthStats.driver_id,
+            func.sum(VehicleMonthStats.refuel_count).label("fuel_entries"),
+            func.sum(VehicleMonthStats.fuel_liters).label("total_fuel"),
+            func.sum(VehicleMonthStats.fuel_cost).label("total_fuel_cost")
+        ).filter(
+            VehicleMonthStats.driver_id != 0,
+            *_cube_period(start, end)
+        ).group_by(VehicleMonthStats.driver_id).subquery()
+        results = db.query(
+            Driver.id,
+            Driver.first_name,
+            Driver.last_name,
+            Driver.department,
+            func.coalesce(stats.c.fuel_entries, 0).label("fuel_entries"),
+            stats.c.total_fuel,
+            stats.c.total_fuel_cost
+        ).outerjoin(stats, stats.c.driver_id == Driver.id).filter(Driver.is_active == True).all()
+    else:
+        results = db.query(
+            Driver.id,
+            Driver.first_name,
+            Driver.last_name,
+            Driver.department,
+            func.count(FuelRecord.id).label("fuel_entries"),
+            func.sum(FuelRecord.liters).label("total_fuel"),
+            func.sum(FuelRecord.total_cost).label("total_fuel_cost")
+        ).outerjoin(FuelRecord, and_(
+            FuelRecord.driver_id == Driver.id,
+            FuelRecord.fuel_date >= start,
+            FuelRecord.fuel_date < end
+        )).filter(Driver.is_active == True).group_by(Driver.id).all()
     
     report = []
     for result in results:
@@ -197,4 +377,17 @@ def get_driver_performance_report(
             "avg_fuel_per_entry": (result.total_fuel / result.fuel_entries) if result.fuel_entries > 0 else 0
         })
     
-    return sorted(report, key=lambda x: x["total_fuel_cost"], reverse=True)
\ No newline at end of file
+    return sorted(report, key=lambda x: x["total_fuel_cost"], reverse=True)
+
+@router.post("/vehicle-month-stats/rebuild")
+def rebuild_vehicle_month_stats(
+    year: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    rows = vehicle_stats.rebuild(db, year)
+    dashboard_cache.invalidate()
+    return {"message": "Vehicle month stats rebuilt", "rows": rows}
\ No newline at end of file
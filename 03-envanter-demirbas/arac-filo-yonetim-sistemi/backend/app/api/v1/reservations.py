@@ -0,0 +1,234 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional
+from datetime import datetime
+
+from app.database import get_db
+from app.models.reservation import Reservation, ReservationStatus
+from app.models.vehicle import Vehicle, VehicleStatus, VehicleType
+from app.models.driver import Driver
+from app.models.user import User
+from app.schemas.reservation import (
+    ReservationCreate, ReservationUpdate, Reservation as ReservationSchema, VehicleAvailability,
+    AllocationRequest, AllocationResult
+)
+from app.api.v1.auth import get_current_user
+from app.services.reservations import reservation_index, local_time
+from app.services.allocation import Trip, allocate_trips
+
+router = APIRouter()
+
+def _validate_reservation(db: Session, reservation: Reservation) -> None:
+    if reservation.end_time <= reservation.start_time:
+        raise HTTPException(status_code=400, detail="End time must be after start time")
+    if reservation.status == ReservationStatus.CANCELLED:
+        return
+    
+    vehicle = db.query(Vehicle).filter(Vehicle.id == reservation.vehicle_id).first()
+    if not vehicle:
+        raise HTTPException(status_code=404, detail="Vehicle not found")
+    if not vehicle.is_active or vehicle.status != VehicleStatus.ACTIVE:
+        raise HTTPException(status_code=400, detail="Vehicle is not available for reservations")
+    
+    if reservation.driver_id:
+        driver = db.query(Driver).filter(Driver.id == reservation.driver_id).first()
+        if not driver:
+            raise HTTPException(status_code=404, detail="Driver not found")
+        if not driver.is_active:
+            raise HTTPException(status_code=400, detail="Driver is not active")
+        if driver.license_expiry_date < reservation.end_time.date():
+            raise HTTPException(status_code=400, detail="Driver license expires before the trip ends")
+    
+    conflicts = reservation_index.conflicts(
+        db, reservation.vehicle_id, reservation.driver_id,
+        reservation.start_time, reservation.end_time, exclude_id=reservation.id
+    )
+    if conflicts:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Reservation overlaps existing reservations: {', '.join(map(str, conflicts))}"
+        )
+
+def _commit(db: Session) -> None:
+    """Veritabanı çakışma kısıtına takılırsa (başka süreçte eklenen rezervasyon) 409"""
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        reservation_index.invalidate()
+        raise HTTPException(status_code=409, detail="Reservation overlaps an existing reservation")
+
+@router.get("/", response_model=List[ReservationSchema])
+def get_reservations(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    vehicle_id: Optional[int] = None,
+    driver_id: Optional[int] = None,
+    status: Optional[ReservationStatus] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    query = db.query(Reservation)
+    
+    if vehicle_id:
+        query = query.filter(Reservation.vehicle_id == vehicle_id)
+    if driver_id:
+        query = query.filter(Reservation.driver_id == driver_id)
+    if status:
+        query = query.filter(Reservation.status == status)
+    # Aralıkla kesişen rezervasyonlar
+    if start:
+        query = query.filter(Reservation.end_time > local_time(start))
+    if end:
+        query = query.filter(Reservation.start_time < local_time(end))
+    
+    return query.order_by(Reservation.start_time).offset(skip).limit(limit).all()
+
+@router.get("/availability", response_model=List[VehicleAvailability])
+def get_available_vehicles(
+    vehicle_type: VehicleType,
+    start: datetime,
+    end: datetime,
+    department: Optional[str] = None,
+    passenger_count: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Verilen aralıkta rezervasyonu olmayan, istenen tipteki aktif araçlar (süreç içi indeksten)"""
+    if end <= start:
+        raise HTTPException(status_code=400, detail="End time must be after start time")
+    
+    vehicles = reservation_index.available_vehicles(
+        db, vehicle_type, start, end, department, limit, passenger_count
+    )
+    return [vehicle._asdict() for vehicle in vehicles]
+
+@router.post("/allocate", response_model=AllocationResult)
+def allocate_reservations(
+    request: AllocationRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Toplu talepleri araç ve sürücülere ata; dry_run değilse atananlar için rezervasyon oluştur"""
+    if not request.trips:
+        raise HTTPException(status_code=400, detail="No trips to allocate")
+    
+    trips = [
+        Trip(trip.start_time, trip.end_time, trip.vehicle_type, trip.passenger_count, trip.department, trip.with_driver)
+        for trip in request.trips
+    ]
+    result = allocate_trips(db, trips, improve=request.improve)
+    if request.dry_run or not result["assignments"]:
+        return result
+    
+    rows = []
+    for assignment in result["assignments"]:
+        trip = request.trips[assignment["index"]]
+        rows.append({
+            "vehicle_id": assignment["vehicle_id"],
+            "driver_id": assignment["driver_id"],
+            "start_time": local_time(trip.start_time),
+            "end_time": local_time(trip.end_time),
+            "purpose": trip.purpose,
+            "destination": trip.destination,
+            "department": trip.department,
+            "passenger_count": trip.passenger_count,
+            "status": ReservationStatus.CONFIRMED,
+            "requested_by": current_user.id,
+        })
+    try:
+        # Tetikleyici/kısıt hatası INSERT sırasında gelir (atamadan sonra başka süreçte eklenen rezervasyon)
+        reservation_ids = db.scalars(
+            insert(Reservation).returning(Reservation.id, sort_by_parameter_order=True), rows
+        ).all()
+    except IntegrityError:
+        db.rollback()
+        reservation_index.invalidate()
+        raise HTTPException(status_code=409, detail="Allocation overlaps a reservation made meanwhile, retry")
+    _commit(db)
+    reservation_index.invalidate()
+    
+    for assignment, reservation_id in zip(result["assignments"], reservation_ids):
+        assignment["reservation_id"] = reservation_id
+    return result
+
+@router.get("/{reservation_id}", response_model=ReservationSchema)
+def get_reservation(
+    reservation_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    reservation = db.query(Reservation).filter(Reservation.id == reservation_id).first()
+    if not reservation:
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    return reservation
+
+@router.post("/", response_model=ReservationSchema)
+def create_reservation(
+    reservation: ReservationCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    db_reservation = Reservation(
+        **reservation.dict(),
+        status=ReservationStatus.CONFIRMED,
+        requested_by=current_user.id
+    )
+    db_reservation.start_time = local_time(reservation.start_time)
+    db_reservation.end_time = local_time(reservation.end_time)
+    _validate_reservation(db, db_reservation)
+    
+    db.add(db_reservation)
+    _commit(db)
+    db.refresh(db_reservation)
+    reservation_index.add(db_reservation)
+    
+    return db_reservation
+
+@router.put("/{reservation_id}", response_model=ReservationSchema)
+def update_reservation(
+    reservation_id: int,
+    reservation_update: ReservationUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    reservation = db.query(Reservation).filter(Reservation.id == reservation_id).first()
+    if not reservation:
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    
+    old_vehicle_id, old_driver_id = reservation.vehicle_id, reservation.driver_id
+    update_data = reservation_update.dict(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(reservation, field, value)
+    reservation.start_time = local_time(reservation.start_time)
+    reservation.end_time = local_time(reservation.end_time)
+    _validate_reservation(db, reservation)
+    
+    _commit(db)
+    db.refresh(reservation)
+    reservation_index.remove(reservation.id, old_vehicle_id, old_driver_id)
+    reservation_index.add(reservation)
+    
+    return reservation
+
+@router.post("/{reservation_id}/cancel", response_model=ReservationSchema)
+def cancel_reservation(
+    reservation_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    reservation = db.query(Reservation).filter(Reservation.id == reservation_id).first()
+    if not reservation:
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    
+    reservation.status = ReservationStatus.CANCELLED
+    db.commit()
+    db.refresh(reservation)
+    reservation_index.remove(reservation.id, reservation.vehicle_id, reservation.driver_id)
+    
+    return reservation
\ No newline at end of file
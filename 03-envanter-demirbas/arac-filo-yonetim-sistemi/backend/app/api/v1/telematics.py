@@ -0,0 +1,93 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import datetime
+from enum import Enum
+
+from app.database import get_db
+from app.models.telematics import TelematicsPing, TelematicsRollup
+from app.models.user import User
+from app.schemas.telematics import (
+    TelematicsPingBatch, TelematicsPing as TelematicsPingSchema, TelematicsIngestResult,
+    TelematicsRollup as TelematicsRollupSchema, TelematicsDownsampleResult
+)
+from app.api.v1.auth import get_current_user
+from app.services import telematics
+
+router = APIRouter()
+
+class Resolution(str, Enum):
+    HOUR = "hour"
+    DAY = "day"
+
+@router.post("/pings", response_model=TelematicsIngestResult, status_code=202)
+def ingest_pings(
+    batch: TelematicsPingBatch,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Takip cihazı sinyallerini tampona al; veritabanına toplu olarak arka planda yazılır"""
+    vehicle_ids = telematics.known_vehicle_ids(db, {ping.vehicle_id for ping in batch.pings})
+    pings = [telematics.ping_row(ping.dict()) for ping in batch.pings if ping.vehicle_id in vehicle_ids]
+    buffered = telematics.ping_buffer.add(pings)
+    
+    return {"accepted": len(pings), "rejected": len(batch.pings) - len(pings), "buffered": buffered}
+
+@router.post("/flush")
+def flush_pings(current_user: User = Depends(get_current_user)):
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    return {"written": telematics.ping_buffer.flush()}
+
+@router.post("/downsample", response_model=TelematicsDownsampleResult)
+def downsample_pings(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    return telematics.downsample(db)
+
+@router.get("/vehicles/{vehicle_id}/pings", response_model=List[TelematicsPingSchema])
+def get_vehicle_pings(
+    vehicle_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Ham sinyaller (yalnızca saklama süresi içindeki veri)"""
+    query = db.query(TelematicsPing).filter(TelematicsPing.vehicle_id == vehicle_id)
+    
+    if start:
+        query = query.filter(TelematicsPing.recorded_at >= telematics.to_utc(start))
+    if end:
+        query = query.filter(TelematicsPing.recorded_at < telematics.to_utc(end))
+    
+    return query.order_by(TelematicsPing.recorded_at).limit(limit).all()
+
+@router.get("/vehicles/{vehicle_id}/rollups", response_model=List[TelematicsRollupSchema])
+def get_vehicle_rollups(
+    vehicle_id: int,
+    resolution: Resolution = Resolution.HOUR,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Saklama süresi dolmuş verinin saatlik/günlük özetleri"""
+    query = db.query(TelematicsRollup).filter(
+        TelematicsRollup.vehicle_id == vehicle_id,
+        TelematicsRollup.resolution == resolution.value
+    )
+    
+    if start:
+        query = query.filter(TelematicsRollup.bucket_start >= telematics.to_utc(start))
+    if end:
+        query = query.filter(TelematicsRollup.bucket_start < telematics.to_utc(end))
+    
+    return query.order_by(TelematicsRollup.bucket_start).limit(limit).all()
\ No newline at end of file
@@ -7,6 +7,8 @@ from app.models.vehicle import Vehicle
 from app.models.user import User
 from app.schemas.vehicle import VehicleCreate, VehicleUpdate, Vehicle as VehicleSchema
 from app.api.v1.auth import get_current_user
+from app.core.cache import dashboard_cache
+from app.services.reservations import reservation_index
 
 router = APIRouter()
 
@@ -59,6 +61,8 @@ def create_vehicle(
     db_vehicle = Vehicle(**vehicle.dict())
     db.add(db_vehicle)
     db.commit()
+    dashboard_cache.invalidate()
+    reservation_index.invalidate()
     db.refresh(db_vehicle)
     
     return db_vehicle
@@ -79,6 +83,8 @@ def update_vehicle(
         setattr(vehicle, field, value)
     
     db.commit()
+    dashboard_cache.invalidate()
+    reservation_index.invalidate()
     db.refresh(vehicle)
     
     return vehicle
@@ -95,5 +101,7 @@ def delete_vehicle(
     
     vehicle.is_active = False
     db.commit()
+    dashboard_cache.invalidate()
+    reservation_index.invalidate()
     
     return {"message": "Vehicle deactivated successfully"}
\ No newline at end of file
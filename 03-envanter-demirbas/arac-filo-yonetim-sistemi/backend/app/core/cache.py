@@ -0,0 +1,34 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple
+from app.core.config import settings
+
+class TTLCache:
+    """Süreç içi, kısa ömürlü sonuç önbelleği (anahtar başına son kullanma zamanı)"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._generation = 0  # Hesaplama sırasında temizlenirse eski sonuç yazılmasın
+        self._lock = threading.Lock()
+
+    def get_or_set(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+            generation = self._generation
+        value = compute()
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (now + self.ttl_seconds, value)
+        return value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+# Dashboard istatistikleri; araç, sürücü, yakıt ve bakım yazmalarında temizlenir
+dashboard_cache = TTLCache(settings.DASHBOARD_CACHE_TTL_SECONDS)
@@ -8,6 +8,25 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REDIS_URL: str = "redis://localhost:6379"
     CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:8080"]
+    DASHBOARD_CACHE_TTL_SECONDS: int = 30
+    # Yakıt anomali tespiti
+    FUEL_ANOMALY_EWMA_ALPHA: float = 0.2
+    FUEL_ANOMALY_Z_THRESHOLD: float = 3.0
+    FUEL_ANOMALY_MIN_SAMPLES: int = 5
+    FUEL_TANK_CAPACITY_TOLERANCE: float = 0.05
+    # Yakıt kartı ekstresi içe aktarımı (parça başına satır)
+    FUEL_IMPORT_CHUNK_SIZE: int = 5000
+    # Telematik sinyalleri: tampon yazımı ve saklama süreleri
+    TELEMATICS_FLUSH_SIZE: int = 5000
+    TELEMATICS_FLUSH_INTERVAL_SECONDS: float = 2.0
+    TELEMATICS_BUFFER_MAX_SIZE: int = 50000
+    TELEMATICS_RAW_RETENTION_DAYS: int = 7
+    TELEMATICS_HOURLY_RETENTION_DAYS: int = 90
+    # Bakım tahmini: günlük km hızı son N gündeki kilometre gözlemlerinden hesaplanır
+    MAINTENANCE_KM_RATE_WINDOW_DAYS: int = 90
+    MAINTENANCE_KM_RATE_MIN_SPAN_DAYS: int = 7
+    # Rezervasyon indeksi (diğer süreçlerin yazdıkları bu süre sonra görülür)
+    RESERVATION_INDEX_TTL_SECONDS: int = 60
     
     class Config:
         env_file = ".env"
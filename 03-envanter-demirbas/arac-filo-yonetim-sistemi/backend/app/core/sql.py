@@ -0,0 +1,44 @@
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import GenericFunction
+from sqlalchemy.orm import Session
+
+class greatest(GenericFunction):
+    """GREATEST(a, b, ...) - SQLite'ta çok argümanlı max()"""
+    inherit_cache = True
+
+class least(GenericFunction):
+    """LEAST(a, b, ...) - SQLite'ta çok argümanlı min()"""
+    inherit_cache = True
+
+@compiles(greatest, "sqlite")
+def _sqlite_greatest(element, compiler, **kw):
+    return "max(%s)" % compiler.process(element.clauses, **kw)
+
+@compiles(least, "sqlite")
+def _sqlite_least(element, compiler, **kw):
+    return "min(%s)" % compiler.process(element.clauses, **kw)
+
+class date_trunc(GenericFunction):
+    """date_trunc('hour' | 'day', ts) - SQLite'ta strftime ile (SQLAlchemy'nin SQLite tarih biçiminde)"""
+    inherit_cache = True
+
+SQLITE_TRUNC_FORMATS = {"hour": "%Y-%m-%d %H:00:00.000000", "day": "%Y-%m-%d 00:00:00.000000"}
+
+@compiles(date_trunc)
+def _date_trunc(element, compiler, **kw):
+    # Birim parametre yerine sabit yazılır; aksi halde SELECT ve GROUP BY ifadeleri eşleşmez
+    unit, value = element.clauses
+    return "date_trunc('%s', %s)" % (unit.value, compiler.process(value, **kw))
+
+@compiles(date_trunc, "sqlite")
+def _sqlite_date_trunc(element, compiler, **kw):
+    unit, value = element.clauses
+    return "strftime('%s', %s)" % (SQLITE_TRUNC_FORMATS[unit.value], compiler.process(value, **kw))
+
+def upsert(db: Session, model):
+    """Dialect'e uygun INSERT ... ON CONFLICT yapısı"""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    return dialect_insert(model)
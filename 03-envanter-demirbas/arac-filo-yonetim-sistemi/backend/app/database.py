@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
@@ -13,4 +14,30 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def ensure_columns(bind=None):
+    """Modele sonradan eklenen kolonları mevcut tablolara ekle (yeni kolonlar nullable olmalı)"""
+    bind = bind or engine
+    inspector = inspect(bind)
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing_columns = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_type = column.type.compile(dialect=bind.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+
+def ensure_indexes(bind=None):
+    """Modelde tanımlı olup veritabanında bulunmayan indeksleri oluştur (mevcut tablolar için)"""
+    bind = bind or engine
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=bind, checkfirst=True)
+            except IntegrityError as e:
+                # Mevcut veride tekrar eden kayıtlar varsa benzersiz indeks oluşturulamaz
+                print(f"{index.name} indeksi oluşturulamadı: {e.orig}")
\ No newline at end of file
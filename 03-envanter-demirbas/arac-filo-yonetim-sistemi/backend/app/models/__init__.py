@@ -1,5 +1,9 @@
 from .user import User
 from .vehicle import Vehicle
 from .driver import Driver
-from .maintenance import Maintenance
-from .fuel import FuelRecord
\ No newline at end of file
+from .maintenance import Maintenance, MaintenancePrediction
+from .fuel import FuelRecord
+from .vehicle_stats import VehicleMonthStats
+from .fuel_anomaly import FuelAnomaly, VehicleFuelStats
+from .telematics import TelematicsPing, TelematicsRollup
+from .reservation import Reservation
\ No newline at end of file
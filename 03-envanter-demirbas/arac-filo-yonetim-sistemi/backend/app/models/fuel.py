@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -16,8 +16,17 @@ class FuelRecord(Base):
     total_cost = Column(Float, nullable=False)
     km_at_fueling = Column(Integer, nullable=False)
     station_name = Column(String)
-    receipt_number = Column(String)
+    receipt_number = Column(String, index=True)
     created_by = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
-    vehicle = relationship("Vehicle", back_populates="fuel_records")
\ No newline at end of file
+    vehicle = relationship("Vehicle", back_populates="fuel_records")
+    
+    __table_args__ = (
+        # Araç başına tarih aralığı (liste, kullanım raporu, tüketim) ve aralıktan önceki son kayıt
+        Index("ix_fuel_records_vehicle_date", "vehicle_id", "fuel_date"),
+        # Sürücü filtresi ve sürücü performans raporu
+        Index("ix_fuel_records_driver_date", "driver_id", "fuel_date"),
+        # Filtresiz liste (tarihe göre sıralı), tarih aralığı ve maliyet analizi
+        Index("ix_fuel_records_fuel_date", "fuel_date"),
+    )
\ No newline at end of file
@@ -0,0 +1,51 @@
+from sqlalchemy import Column, Integer, DateTime, Float, ForeignKey, Text, Enum, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+import enum
+from app.database import Base
+
+class AnomalyType(str, enum.Enum):
+    OVER_CAPACITY = "over_capacity"  # Alınan yakıt depo kapasitesinden fazla
+    HIGH_CONSUMPTION = "high_consumption"  # 100 km tüketimi aracın normalinin çok üstünde
+    KM_REGRESSION = "km_regression"  # Kilometre bir önceki alımdan geride
+    DUPLICATE_RECEIPT = "duplicate_receipt"  # Aynı fiş numarası başka kayıtta var
+
+class AnomalyStatus(str, enum.Enum):
+    OPEN = "open"
+    CONFIRMED = "confirmed"
+    DISMISSED = "dismissed"
+
+class FuelAnomaly(Base):
+    __tablename__ = "fuel_anomalies"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    fuel_record_id = Column(Integer, ForeignKey("fuel_records.id"), nullable=False)
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=False)
+    anomaly_type = Column(Enum(AnomalyType), nullable=False)
+    score = Column(Float)  # Kurala göre: z-skoru, kapasite oranı, geri giden km
+    details = Column(Text)
+    status = Column(Enum(AnomalyStatus), nullable=False, default=AnomalyStatus.OPEN)
+    review_note = Column(Text)
+    reviewed_by = Column(Integer, ForeignKey("users.id"))
+    reviewed_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    fuel_record = relationship("FuelRecord")
+    
+    __table_args__ = (
+        UniqueConstraint("fuel_record_id", "anomaly_type", name="uq_fuel_anomalies_record_type"),
+        Index("ix_fuel_anomalies_status_id", "status", "id"),
+        Index("ix_fuel_anomalies_vehicle_id", "vehicle_id"),
+    )
+
+class VehicleFuelStats(Base):
+    """Araç başına artımlı güncellenen tüketim istatistikleri (L/100 km için EWMA ortalama ve varyans)"""
+    __tablename__ = "vehicle_fuel_stats"
+    
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), primary_key=True)
+    last_fuel_date = Column(DateTime(timezone=True))
+    last_km = Column(Integer)
+    ewma_mean = Column(Float)
+    ewma_var = Column(Float)
+    sample_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
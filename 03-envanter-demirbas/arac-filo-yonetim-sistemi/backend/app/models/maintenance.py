@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Text, Enum
+from sqlalchemy import Column, Integer, String, Date, DateTime, Float, ForeignKey, Text, Enum, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -31,4 +31,38 @@ class Maintenance(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
-    vehicle = relationship("Vehicle", back_populates="maintenance_records")
\ No newline at end of file
+    vehicle = relationship("Vehicle", back_populates="maintenance_records")
+    
+    __table_args__ = (
+        # Araç filtresi (tarihe göre sıralı) ve tarih aralığı
+        Index("ix_maintenance_vehicle_date", "vehicle_id", "service_date"),
+        # Filtresiz liste, tarih aralığı ve maliyet analizi
+        Index("ix_maintenance_service_date", "service_date"),
+    )
+
+class MaintenancePrediction(Base):
+    """
+    Araç ve bakım türü başına bekleyen bakımın tahmini tarihi (gecelik yeniden hesaplanır)
+    Tarih bazlı hedef (next_service_date) ile km bazlı hedefin (next_service_km) son günlerdeki
+    günlük km hızıyla tahmin edilen tarihinden erken olanı due_date olur
+    """
+    __tablename__ = "maintenance_predictions"
+    
+    id = Column(Integer, primary_key=True)
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=False)
+    maintenance_id = Column(Integer, ForeignKey("maintenance.id"), nullable=False)
+    maintenance_type = Column(Enum(MaintenanceType), nullable=False)
+    next_service_date = Column(DateTime(timezone=True))
+    next_service_km = Column(Integer)
+    current_km = Column(Integer)
+    km_per_day = Column(Float)
+    predicted_km_date = Column(Date)
+    due_date = Column(Date)
+    due_by = Column(String(4))  # 'date' | 'km'
+    computed_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint("vehicle_id", "maintenance_type", name="uq_maintenance_predictions_vehicle_type"),
+        # Yaklaşan bakım listesi: due_date aralığında sıralı tek indeks taraması
+        Index("ix_maintenance_predictions_due_date", "due_date", "id"),
+    )
\ No newline at end of file
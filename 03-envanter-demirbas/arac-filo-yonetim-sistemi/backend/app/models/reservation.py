@@ -0,0 +1,64 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum, Index, CheckConstraint, DDL, event
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+import enum
+from app.database import Base
+
+class ReservationStatus(str, enum.Enum):
+    CONFIRMED = "confirmed"
+    CANCELLED = "cancelled"
+    COMPLETED = "completed"
+
+class Reservation(Base):
+    """Havuz aracı yolculuk rezervasyonu; iptal edilmemiş rezervasyonlar araç ve sürücü bazında çakışamaz"""
+    __tablename__ = "reservations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=False)
+    driver_id = Column(Integer, ForeignKey("drivers.id"))
+    start_time = Column(DateTime(timezone=True), nullable=False)
+    end_time = Column(DateTime(timezone=True), nullable=False)
+    purpose = Column(Text, nullable=False)
+    destination = Column(String)
+    department = Column(String)
+    passenger_count = Column(Integer)
+    status = Column(Enum(ReservationStatus), nullable=False, default=ReservationStatus.CONFIRMED)
+    requested_by = Column(Integer, ForeignKey("users.id"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    vehicle = relationship("Vehicle")
+    driver = relationship("Driver")
+
+    __table_args__ = (
+        CheckConstraint("end_time > start_time", name="ck_reservations_time_range"),
+        Index("ix_reservations_vehicle_time", "vehicle_id", "start_time", "end_time"),
+        Index("ix_reservations_driver_time", "driver_id", "start_time", "end_time"),
+    )
+
+# Çakışma kısıtı: PostgreSQL'de exclusion constraint (btree_gist), SQLite'ta aynı kontrolü yapan tetikleyiciler.
+# Enum kolonları enum adlarıyla ('CANCELLED') saklanır.
+for ddl in (
+    "CREATE EXTENSION IF NOT EXISTS btree_gist",
+    "ALTER TABLE reservations ADD CONSTRAINT ex_reservations_vehicle_overlap EXCLUDE USING gist "
+    "(vehicle_id WITH =, tstzrange(start_time, end_time, '[)') WITH &&) WHERE (status <> 'CANCELLED')",
+    "ALTER TABLE reservations ADD CONSTRAINT ex_reservations_driver_overlap EXCLUDE USING gist "
+    "(driver_id WITH =, tstzrange(start_time, end_time, '[)') WITH &&) "
+    "WHERE (driver_id IS NOT NULL AND status <> 'CANCELLED')",
+):
+    event.listen(Reservation.__table__, "after_create", DDL(ddl).execute_if(dialect="postgresql"))
+
+_SQLITE_OVERLAP = (
+    "NEW.status <> 'CANCELLED' AND EXISTS (SELECT 1 FROM reservations r "
+    "WHERE r.status <> 'CANCELLED' AND r.id IS NOT NEW.id "
+    "AND (r.vehicle_id = NEW.vehicle_id OR (NEW.driver_id IS NOT NULL AND r.driver_id = NEW.driver_id)) "
+    "AND r.start_time < NEW.end_time AND r.end_time > NEW.start_time)"
+)
+for trigger, timing in (
+    ("trg_reservations_overlap_insert", "BEFORE INSERT"),
+    ("trg_reservations_overlap_update", "BEFORE UPDATE OF vehicle_id, driver_id, start_time, end_time, status"),
+):
+    event.listen(Reservation.__table__, "after_create", DDL(
+        f"CREATE TRIGGER {trigger} {timing} ON reservations WHEN {_SQLITE_OVERLAP} "
+        "BEGIN SELECT RAISE(ABORT, 'reservation overlaps an existing reservation'); END"
+    ).execute_if(dialect="sqlite"))
\ No newline at end of file
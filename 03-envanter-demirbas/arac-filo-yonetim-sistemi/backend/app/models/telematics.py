@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, PrimaryKeyConstraint, Index
+from app.database import Base
+
+class TelematicsPing(Base):
+    """
+    Araç takip cihazlarından gelen ham GPS/kilometre sinyalleri
+    PostgreSQL'de recorded_at üzerinden günlük bölümlenir (bölümler yazma sırasında oluşturulur);
+    saklama süresi dolan günler saatlik özete alınıp bölümüyle birlikte silinir
+    """
+    __tablename__ = "telematics_pings"
+
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=False)
+    recorded_at = Column(DateTime(timezone=True), nullable=False)
+    latitude = Column(Float)
+    longitude = Column(Float)
+    speed_kmh = Column(Float)
+    odometer_km = Column(Float)
+
+    __table_args__ = (
+        # Bölümlü tabloda birincil anahtar bölüm anahtarını içermeli; aynı anın tekrarı yok sayılır
+        PrimaryKeyConstraint("vehicle_id", "recorded_at", name="pk_telematics_pings"),
+        {"postgresql_partition_by": "RANGE (recorded_at)"},
+    )
+
+class TelematicsRollup(Base):
+    """Ham sinyallerin saatlik ('hour') ve günlük ('day') özetleri"""
+    __tablename__ = "telematics_rollups"
+
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=False)
+    resolution = Column(String(4), nullable=False)
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    ping_count = Column(Integer, nullable=False, default=0)
+    min_odometer_km = Column(Float)
+    max_odometer_km = Column(Float)
+    avg_speed_kmh = Column(Float)
+    max_speed_kmh = Column(Float)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("vehicle_id", "resolution", "bucket_start", name="pk_telematics_rollups"),
+        Index("ix_telematics_rollups_resolution_bucket", "resolution", "bucket_start"),
+    )
\ No newline at end of file
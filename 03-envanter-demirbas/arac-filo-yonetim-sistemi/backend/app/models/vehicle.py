@@ -34,6 +34,8 @@ class Vehicle(Base):
     purchase_date = Column(DateTime(timezone=True))
     purchase_price = Column(Float)
     current_km = Column(Integer, default=0)
+    fuel_tank_capacity = Column(Float)  # Litre; boşsa araç tipine göre varsayılan kullanılır
+    seat_capacity = Column(Integer)  # Sürücü hariç yolcu koltuğu; boşsa araç tipine göre varsayılan kullanılır
     department = Column(String)
     assigned_driver_id = Column(Integer, ForeignKey("drivers.id"))
     is_active = Column(Boolean, default=True)
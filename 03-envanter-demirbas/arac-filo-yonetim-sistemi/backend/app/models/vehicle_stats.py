@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+class VehicleMonthStats(Base):
+    """Araç, sürücü ve ay bazında önceden toplanmış yakıt/bakım özetleri (raporlar bu tablodan okur)"""
+    __tablename__ = "vehicle_month_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=False)
+    # 0: sürücüsüz yakıt kayıtları ve bakımlar (NULL benzersiz anahtarda çakışma üretmediği için)
+    driver_id = Column(Integer, nullable=False, default=0)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
+    fuel_liters = Column(Float, nullable=False, default=0)
+    fuel_cost = Column(Float, nullable=False, default=0)
+    refuel_count = Column(Integer, nullable=False, default=0)
+    maintenance_cost = Column(Float, nullable=False, default=0)
+    maintenance_count = Column(Integer, nullable=False, default=0)
+    # Yakıt kayıtlarının km okumaları (bakım km'si dahil edilmez; kullanım raporu ham yakıt yoluyla aynı)
+    min_km = Column(Integer)
+    max_km = Column(Integer)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("vehicle_id", "driver_id", "year", "month", name="uq_vehicle_month_stats_cell"),
+        Index("ix_vehicle_month_stats_period", "year", "month"),
+        Index("ix_vehicle_month_stats_driver_period", "driver_id", "year", "month"),
+    )
@@ -1,5 +1,8 @@
 from .user import UserCreate, UserUpdate, User, UserLogin, Token
 from .vehicle import VehicleCreate, VehicleUpdate, Vehicle
 from .driver import DriverCreate, DriverUpdate, Driver
-from .maintenance import MaintenanceCreate, MaintenanceUpdate, Maintenance
-from .fuel import FuelRecordCreate, FuelRecordUpdate, FuelRecord
\ No newline at end of file
+from .maintenance import MaintenanceCreate, MaintenanceUpdate, Maintenance, MaintenancePrediction
+from .fuel import FuelRecordCreate, FuelRecordUpdate, FuelRecord, FuelConsumptionPoint, FuelImportResult
+from .fuel_anomaly import FuelAnomaly, FuelAnomalyReview, FuelAnomalyRescanResult
+from .telematics import TelematicsPingCreate, TelematicsPingBatch, TelematicsPing, TelematicsIngestResult, TelematicsRollup, TelematicsDownsampleResult
+from .reservation import ReservationCreate, ReservationUpdate, Reservation, VehicleAvailability, TripRequest, AllocationRequest, TripAssignment, UnassignedTrip, AllocationResult
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class FuelRecordBase(BaseModel):
@@ -35,4 +35,26 @@ class FuelRecord(FuelRecordBase):
     created_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class FuelConsumptionPoint(BaseModel):
+    fuel_record_id: int
+    fuel_date: datetime
+    km_at_fueling: int
+    liters: float
+    km_since_last: Optional[int] = None
+    consumption_per_100km: Optional[float] = None
+
+class FuelImportError(BaseModel):
+    line: int
+    message: str
+
+class FuelImportResult(BaseModel):
+    rows: int
+    inserted: int
+    duplicates: int
+    error_count: int
+    errors: List[FuelImportError]
+    unknown_plates: List[str]
+    vehicles_updated: int
+    anomalies_inserted: int
\ No newline at end of file
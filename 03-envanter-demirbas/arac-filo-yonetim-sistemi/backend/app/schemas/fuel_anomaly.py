@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from typing import Dict, Optional
+from datetime import datetime
+from app.models.fuel_anomaly import AnomalyType, AnomalyStatus
+
+class FuelAnomaly(BaseModel):
+    id: int
+    fuel_record_id: int
+    vehicle_id: int
+    anomaly_type: AnomalyType
+    score: Optional[float] = None
+    details: Optional[str] = None
+    status: AnomalyStatus
+    review_note: Optional[str] = None
+    reviewed_by: Optional[int] = None
+    reviewed_at: Optional[datetime] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class FuelAnomalyReview(BaseModel):
+    status: AnomalyStatus
+    review_note: Optional[str] = None
+
+class FuelAnomalyRescanResult(BaseModel):
+    records: int
+    flagged: Dict[str, int]
+    inserted: int
\ No newline at end of file
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional
-from datetime import datetime
+from datetime import date, datetime
 from app.models.maintenance import MaintenanceType
 
 class MaintenanceBase(BaseModel):
@@ -38,5 +38,22 @@ class Maintenance(MaintenanceBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
     
+    class Config:
+        from_attributes = True
+
+class MaintenancePrediction(BaseModel):
+    id: int
+    vehicle_id: int
+    maintenance_id: int
+    maintenance_type: MaintenanceType
+    next_service_date: Optional[datetime] = None
+    next_service_km: Optional[int] = None
+    current_km: Optional[int] = None
+    km_per_day: Optional[float] = None
+    predicted_km_date: Optional[date] = None
+    due_date: Optional[date] = None
+    due_by: Optional[str] = None
+    computed_at: Optional[datetime] = None
+    
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -0,0 +1,79 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from app.models.reservation import ReservationStatus
+from app.models.vehicle import VehicleType
+
+class ReservationBase(BaseModel):
+    vehicle_id: int
+    driver_id: Optional[int] = None
+    start_time: datetime
+    end_time: datetime
+    purpose: str
+    destination: Optional[str] = None
+    department: Optional[str] = None
+    passenger_count: Optional[int] = None
+
+class ReservationCreate(ReservationBase):
+    pass
+
+class ReservationUpdate(BaseModel):
+    vehicle_id: Optional[int] = None
+    driver_id: Optional[int] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    purpose: Optional[str] = None
+    destination: Optional[str] = None
+    department: Optional[str] = None
+    passenger_count: Optional[int] = None
+    status: Optional[ReservationStatus] = None
+
+class Reservation(ReservationBase):
+    id: int
+    status: ReservationStatus
+    requested_by: Optional[int] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class VehicleAvailability(BaseModel):
+    id: int
+    plate_number: str
+    vehicle_type: VehicleType
+    department: Optional[str] = None
+    seat_capacity: int
+
+class TripRequest(BaseModel):
+    start_time: datetime
+    end_time: datetime
+    vehicle_type: VehicleType
+    passenger_count: int = 1
+    department: Optional[str] = None
+    with_driver: bool = True
+    purpose: str
+    destination: Optional[str] = None
+
+class AllocationRequest(BaseModel):
+    trips: List[TripRequest]
+    improve: bool = True
+    dry_run: bool = False
+
+class TripAssignment(BaseModel):
+    index: int
+    vehicle_id: int
+    driver_id: Optional[int] = None
+    cost: float
+    reservation_id: Optional[int] = None
+
+class UnassignedTrip(BaseModel):
+    index: int
+    reason: str
+
+class AllocationResult(BaseModel):
+    assignments: List[TripAssignment]
+    unassigned: List[UnassignedTrip]
+    vehicles_used: int
+    cost: float
+    improvement: float
\ No newline at end of file
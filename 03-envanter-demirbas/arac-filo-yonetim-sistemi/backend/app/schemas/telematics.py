@@ -0,0 +1,43 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+class TelematicsPingBase(BaseModel):
+    vehicle_id: int
+    recorded_at: datetime
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    speed_kmh: Optional[float] = None
+    odometer_km: Optional[float] = None
+
+class TelematicsPingCreate(TelematicsPingBase):
+    pass
+
+class TelematicsPingBatch(BaseModel):
+    pings: List[TelematicsPingCreate]
+
+class TelematicsPing(TelematicsPingBase):
+    class Config:
+        from_attributes = True
+
+class TelematicsIngestResult(BaseModel):
+    accepted: int
+    rejected: int
+    buffered: int
+
+class TelematicsRollup(BaseModel):
+    vehicle_id: int
+    resolution: str
+    bucket_start: datetime
+    ping_count: int
+    min_odometer_km: Optional[float] = None
+    max_odometer_km: Optional[float] = None
+    avg_speed_kmh: Optional[float] = None
+    max_speed_kmh: Optional[float] = None
+    
+    class Config:
+        from_attributes = True
+
+class TelematicsDownsampleResult(BaseModel):
+    hourly: int
+    daily: int
\ No newline at end of file
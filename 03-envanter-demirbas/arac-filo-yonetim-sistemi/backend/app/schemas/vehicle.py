@@ -17,6 +17,8 @@ class VehicleBase(BaseModel):
     purchase_date: Optional[datetime] = None
     purchase_price: Optional[float] = None
     current_km: int = 0
+    fuel_tank_capacity: Optional[float] = None
+    seat_capacity: Optional[int] = None
     department: Optional[str] = None
     assigned_driver_id: Optional[int] = None
 
@@ -37,6 +39,8 @@ class VehicleUpdate(BaseModel):
     purchase_date: Optional[datetime] = None
     purchase_price: Optional[float] = None
     current_km: Optional[int] = None
+    fuel_tank_capacity: Optional[float] = None
+    seat_capacity: Optional[int] = None
     department: Optional[str] = None
     assigned_driver_id: Optional[int] = None
     is_active: Optional[bool] = None
@@ -0,0 +1,375 @@
+"""
+Toplu yolculuk taleplerine havuz aracı ve sürücü atama
+
+Talepler başlangıç saatine göre sırayla atanır (aralık bölümleme açgözlü algoritması): her talep için istenen
+tipte, yeterli koltuklu ve o aralıkta boş araçlardan en geç boşalanı seçilir (önce talep eden birimin
+araçları), böylece az sayıda araç sıkı doldurulur. Sürücü aynı şekilde, aracın tipini kullanabilen ehliyet
+sınıfı olan ve ehliyeti yolculuk bitişine kadar geçerli sürücülerden seçilir. İsteğe bağlı iyileştirme
+turu, maliyeti (başka birimin aracı/sürücüsü, boş koltuk) düşürecek taşıma ve ikili değişimleri uygular.
+Mevcut rezervasyonlar reservation_index'ten okunur; veritabanına yazmak çağırana aittir.
+Performans ölçümü (veritabanı gerekmez):
+    python -m app.services.allocation --vehicles 2000 --trips 6000
+"""
+import argparse
+import bisect
+import random
+import re
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.driver import Driver
+from app.models.vehicle import VehicleType
+from app.services.reservations import IntervalIndex, PoolVehicle, reservation_index, local_time
+
+# Araç tipini kullanabilen ehliyet sınıfları (C ve D sınıfları B'yi de kapsar)
+LICENSE_CLASSES = {
+    VehicleType.CAR: {"B", "BE", "C1", "C1E", "C", "CE", "D1", "D1E", "D", "DE"},
+    VehicleType.VAN: {"B", "BE", "C1", "C1E", "C", "CE", "D1", "D1E", "D", "DE"},
+    VehicleType.TRUCK: {"C", "CE"},
+    VehicleType.BUS: {"D", "DE"},
+    VehicleType.MOTORCYCLE: {"A1", "A2", "A"},
+}
+
+# Başka birimin aracı ya da sürücüsü; boş koltuk başına maliyet 1
+DEPARTMENT_MISMATCH_COST = 10
+IMPROVE_ROUNDS = 3
+
+class Trip(NamedTuple):
+    start: datetime
+    end: datetime
+    vehicle_type: VehicleType
+    passenger_count: int = 1
+    department: Optional[str] = None
+    with_driver: bool = True
+
+class PoolDriver(NamedTuple):
+    id: int
+    vehicle_types: FrozenSet[VehicleType]
+    license_expiry_date: date
+    department: Optional[str]
+
+def drivable_types(license_type: str) -> FrozenSet[VehicleType]:
+    """'B, C' / 'B/C1' gibi ehliyet sınıflarından kullanılabilen araç tipleri"""
+    classes = set(re.split(r"[\s,;/]+", license_type.upper()))
+    return frozenset(vehicle_type for vehicle_type, accepted in LICENSE_CLASSES.items() if classes & accepted)
+
+class _Pool:
+    """Tek kaynak türü (araç ya da sürücü); her grup son atama bitişine göre sıralı [(bitiş, id)] listesidir"""
+
+    def __init__(self, busy: Dict[int, IntervalIndex]):
+        self.busy = busy  # mevcut rezervasyonlar
+        self.assigned: Dict[int, IntervalIndex] = {}  # bu atamadaki yolculuklar (id = talep sırası)
+        self.last_end: Dict[int, datetime] = {}
+        self.keys: Dict[int, list] = {}
+        self.groups: Dict[object, list] = defaultdict(list)
+
+    def register(self, resource_id: int, keys: list) -> None:
+        self.keys[resource_id] = keys
+        self.last_end[resource_id] = datetime.min
+        for key in keys:
+            bisect.insort(self.groups[key], (datetime.min, resource_id))
+
+    def is_free(self, resource_id: int, start: datetime, end: datetime) -> bool:
+        busy = self.busy.get(resource_id)
+        if busy is not None and not busy.is_free(start, end):
+            return False
+        assigned = self.assigned.get(resource_id)
+        return assigned is None or assigned.is_free(start, end)
+
+    def find(self, key, start: datetime, end: datetime, accept: Callable[[int], bool]) -> Optional[int]:
+        """Gruptaki, start'tan önce boşalanlar içinde en geç boşalan uygun kaynak"""
+        group = self.groups.get(key)
+        if not group:
+            return None
+        for position in range(bisect.bisect_right(group, (start, float("inf"))) - 1, -1, -1):
+            resource_id = group[position][1]
+            if accept(resource_id) and self.is_free(resource_id, start, end):
+                return resource_id
+        return None
+
+    def _move(self, resource_id: int, last_end: datetime) -> None:
+        old = self.last_end[resource_id]
+        if old == last_end:
+            return
+        for key in self.keys[resource_id]:
+            group = self.groups[key]
+            del group[bisect.bisect_left(group, (old, resource_id))]
+            bisect.insort(group, (last_end, resource_id))
+        self.last_end[resource_id] = last_end
+
+    def assign(self, resource_id: int, trip_index: int, start: datetime, end: datetime) -> None:
+        self.assigned.setdefault(resource_id, IntervalIndex()).add(start, end, trip_index)
+        self._move(resource_id, max(self.last_end[resource_id], end))
+
+    def release(self, resource_id: int, trip_index: int) -> None:
+        assigned = self.assigned[resource_id]
+        assigned.remove(trip_index)
+        self._move(resource_id, assigned.max_ends[-1] if len(assigned) else datetime.min)
+
+    def overlapping(self, resource_id: int, start: datetime, end: datetime) -> List[int]:
+        assigned = self.assigned.get(resource_id)
+        return assigned.overlaps(start, end) if assigned is not None else []
+
+def _improve(
+    pool: _Pool,
+    trips: List[Trip],
+    assignment: Dict[int, int],
+    cost: Callable[[Trip, int], float],
+    candidates: Callable[[Trip, float], Iterable[int]]
+) -> float:
+    """Maliyeti düşüren taşıma (boş kaynağa) ve ikili değişim hamleleri; toplam kazanç"""
+    total_gain = 0
+    for trip_index in sorted(assignment):
+        trip, current = trips[trip_index], assignment[trip_index]
+        current_cost = cost(trip, current)
+        if current_cost == 0:
+            continue
+        for candidate in candidates(trip, current_cost):
+            candidate_cost = cost(trip, candidate)
+            if candidate == current or candidate_cost >= current_cost:
+                continue
+            busy = pool.busy.get(candidate)
+            if busy is not None and not busy.is_free(trip.start, trip.end):
+                continue
+            others = pool.overlapping(candidate, trip.start, trip.end)
+            if not others:
+                pool.release(current, trip_index)
+                pool.assign(candidate, trip_index, trip.start, trip.end)
+                assignment[trip_index] = candidate
+                total_gain += current_cost - candidate_cost
+                break
+            if len(others) > 1:
+                continue
+            other_index = others[0]
+            other = trips[other_index]
+            gain = current_cost + cost(other, candidate) - candidate_cost - cost(other, current)
+            if gain <= 0:
+                continue
+            pool.release(current, trip_index)
+            pool.release(candidate, other_index)
+            if pool.is_free(current, other.start, other.end) and pool.is_free(candidate, trip.start, trip.end):
+                pool.assign(candidate, trip_index, trip.start, trip.end)
+                pool.assign(current, other_index, other.start, other.end)
+                assignment[trip_index], assignment[other_index] = candidate, current
+                total_gain += gain
+                break
+            pool.assign(current, trip_index, trip.start, trip.end)
+            pool.assign(candidate, other_index, other.start, other.end)
+    return total_gain
+
+def allocate(
+    trips: List[Trip],
+    vehicles: Iterable[PoolVehicle],
+    drivers: Iterable[PoolDriver],
+    vehicle_busy: Dict[int, IntervalIndex],
+    driver_busy: Dict[int, IntervalIndex],
+    improve: bool = True
+) -> dict:
+    """Talepleri araç ve sürücülere ata; atanamayanlar nedeniyle döner"""
+    vehicle_pool, driver_pool = _Pool(vehicle_busy), _Pool(driver_busy)
+    vehicles = {vehicle.id: vehicle for vehicle in vehicles}
+    drivers = {driver.id: driver for driver in drivers}
+    max_seats = defaultdict(int)
+    # İyileştirme turu için birim (ya da tüm tip) içinde koltuk sayısına göre sıralı araçlar
+    by_seats = defaultdict(list)
+    for vehicle in sorted(vehicles.values(), key=lambda v: (v.seat_capacity, v.id)):
+        keys = [(vehicle.vehicle_type, None)]
+        if vehicle.department:
+            keys.append((vehicle.vehicle_type, vehicle.department))
+        vehicle_pool.register(vehicle.id, keys)
+        for key in keys:
+            by_seats[key].append(vehicle)
+        max_seats[vehicle.vehicle_type] = max(max_seats[vehicle.vehicle_type], vehicle.seat_capacity)
+    seats_index = {key: [vehicle.seat_capacity for vehicle in group] for key, group in by_seats.items()}
+    for driver in drivers.values():
+        keys = [(vehicle_type, None) for vehicle_type in driver.vehicle_types]
+        if driver.department:
+            keys += [(vehicle_type, driver.department) for vehicle_type in driver.vehicle_types]
+        driver_pool.register(driver.id, keys)
+
+    def vehicle_cost(trip: Trip, vehicle_id: int) -> float:
+        vehicle = vehicles[vehicle_id]
+        if vehicle.seat_capacity < trip.passenger_count:
+            return float("inf")
+        mismatch = DEPARTMENT_MISMATCH_COST if trip.department and vehicle.department != trip.department else 0
+        return mismatch + vehicle.seat_capacity - trip.passenger_count
+
+    def driver_cost(trip: Trip, driver_id: int) -> float:
+        driver = drivers[driver_id]
+        if trip.vehicle_type not in driver.vehicle_types or driver.license_expiry_date < trip.end.date():
+            return float("inf")
+        return DEPARTMENT_MISMATCH_COST if trip.department and driver.department != trip.department else 0
+
+    vehicle_of: Dict[int, int] = {}
+    driver_of: Dict[int, int] = {}
+    unassigned = []
+    for trip_index in sorted(range(len(trips)), key=lambda i: (trips[i].start, trips[i].end)):
+        trip = trips[trip_index]
+        if trip.end <= trip.start:
+            unassigned.append({"index": trip_index, "reason": "End time must be after start time"})
+            continue
+        if max_seats[trip.vehicle_type] < trip.passenger_count:
+            unassigned.append({"index": trip_index, "reason": "No vehicle with enough seats"})
+            continue
+
+        fits = lambda vehicle_id: vehicles[vehicle_id].seat_capacity >= trip.passenger_count
+        vehicle_id = None
+        if trip.department:
+            vehicle_id = vehicle_pool.find((trip.vehicle_type, trip.department), trip.start, trip.end, fits)
+        if vehicle_id is None:
+            vehicle_id = vehicle_pool.find((trip.vehicle_type, None), trip.start, trip.end, fits)
+        if vehicle_id is None:
+            unassigned.append({"index": trip_index, "reason": "No free vehicle"})
+            continue
+
+        if trip.with_driver:
+            licensed = lambda driver_id: drivers[driver_id].license_expiry_date >= trip.end.date()
+            driver_id = None
+            if trip.department:
+                driver_id = driver_pool.find((trip.vehicle_type, trip.department), trip.start, trip.end, licensed)
+            if driver_id is None:
+                driver_id = driver_pool.find((trip.vehicle_type, None), trip.start, trip.end, licensed)
+            if driver_id is None:
+                unassigned.append({"index": trip_index, "reason": "No licensed driver available"})
+                continue
+            driver_pool.assign(driver_id, trip_index, trip.start, trip.end)
+            driver_of[trip_index] = driver_id
+        vehicle_pool.assign(vehicle_id, trip_index, trip.start, trip.end)
+        vehicle_of[trip_index] = vehicle_id
+
+    def vehicle_candidates(trip: Trip, current_cost: float) -> Iterable[int]:
+        # Birim içinde koltuk sayısı artan sırada; maliyet mevcut atamayı geçince dur
+        key = (trip.vehicle_type, trip.department or None)
+        group = by_seats.get(key, [])
+        for position in range(bisect.bisect_left(seats_index.get(key, []), trip.passenger_count), len(group)):
+            if group[position].seat_capacity - trip.passenger_count >= current_cost:
+                break
+            yield group[position].id
+
+    def driver_candidates(trip: Trip, current_cost: float) -> Iterable[int]:
+        if trip.department:
+            for _, driver_id in driver_pool.groups.get((trip.vehicle_type, trip.department), ()):
+                yield driver_id
+
+    greedy_cost = cost = (
+        sum(vehicle_cost(trips[i], v) for i, v in vehicle_of.items())
+        + sum(driver_cost(trips[i], d) for i, d in driver_of.items())
+    )
+    if improve:
+        for _ in range(IMPROVE_ROUNDS):
+            # Gruplar hamle sırasında değiştiğinden aday listeleri kopyalanır
+            gain = _improve(vehicle_pool, trips, vehicle_of, vehicle_cost,
+                            lambda trip, current_cost: list(vehicle_candidates(trip, current_cost)))
+            gain += _improve(driver_pool, trips, driver_of, driver_cost,
+                             lambda trip, current_cost: list(driver_candidates(trip, current_cost)))
+            cost -= gain
+            if not gain:
+                break
+
+    assignments = [
+        {
+            "index": trip_index,
+            "vehicle_id": vehicle_id,
+            "driver_id": driver_of.get(trip_index),
+            "cost": vehicle_cost(trips[trip_index], vehicle_id)
+            + (driver_cost(trips[trip_index], driver_of[trip_index]) if trip_index in driver_of else 0),
+        }
+        for trip_index, vehicle_id in sorted(vehicle_of.items())
+    ]
+    return {
+        "assignments": assignments,
+        "unassigned": sorted(unassigned, key=lambda item: item["index"]),
+        "vehicles_used": len(set(vehicle_of.values())),
+        "cost": cost,
+        "improvement": greedy_cost - cost,
+    }
+
+def load_drivers(db: Session, valid_on: date) -> List[PoolDriver]:
+    """Aktif ve ehliyeti verilen günde geçerli sürücüler"""
+    rows = db.execute(
+        select(Driver.id, Driver.license_type, Driver.license_expiry_date, Driver.department)
+        .where(Driver.is_active == True, Driver.license_expiry_date >= valid_on)
+    )
+    return [
+        PoolDriver(driver_id, drivable_types(license_type), expiry, department)
+        for driver_id, license_type, expiry, department in rows
+    ]
+
+def allocate_trips(db: Session, trips: List[Trip], improve: bool = True) -> dict:
+    """Mevcut rezervasyonlarla çakışmadan ata (indeks kilitliyken); rezervasyon kaydı çağırana ait"""
+    trips = [trip._replace(start=local_time(trip.start), end=local_time(trip.end)) for trip in trips]
+    drivers = load_drivers(db, min((trip.start.date() for trip in trips), default=date.today()))
+    with reservation_index.locked(db) as index:
+        return allocate(
+            trips, index.vehicles.values(), drivers,
+            index.vehicle_intervals, index.driver_intervals, improve
+        )
+
+def _synthetic_fleet(vehicle_count: int, driver_count: int, departments: List[str], day: datetime):
+    """Ölçüm için rastgele araç, sürücü ve mevcut rezervasyonlar"""
+    types = [VehicleType.CAR] * 12 + [VehicleType.VAN] * 4 + [VehicleType.TRUCK] * 2 + [VehicleType.BUS, VehicleType.MOTORCYCLE]
+    seats = {VehicleType.CAR: [4], VehicleType.VAN: [8, 12], VehicleType.TRUCK: [2], VehicleType.BUS: [15, 30, 45], VehicleType.MOTORCYCLE: [1]}
+    vehicles = []
+    for vehicle_id in range(1, vehicle_count + 1):
+        vehicle_type = random.choice(types)
+        vehicles.append(PoolVehicle(vehicle_id, f"06 BM {vehicle_id:04d}", vehicle_type,
+                                    random.choice(departments), random.choice(seats[vehicle_type])))
+    licenses = ["B"] * 12 + ["B, C"] * 3 + ["B, D"] * 2 + ["A2, B"] * 2 + ["CE"]
+    drivers = [
+        PoolDriver(driver_id, drivable_types(random.choice(licenses)),
+                   (day + timedelta(days=random.randint(-5, 3650))).date(), random.choice(departments))
+        for driver_id in range(1, driver_count + 1)
+    ]
+    # Araçların beşte birinde gün ortasında bir mevcut rezervasyon
+    vehicle_busy, driver_busy = {}, {}
+    for reservation_id, vehicle in enumerate(random.sample(vehicles, vehicle_count // 5), 1):
+        start = day + timedelta(hours=random.randint(9, 15))
+        vehicle_busy[vehicle.id] = IntervalIndex([(start, start + timedelta(hours=2), -reservation_id)])
+    return vehicles, drivers, vehicle_busy, driver_busy
+
+def _synthetic_trips(count: int, vehicles: List[PoolVehicle], departments: List[str], day: datetime) -> List[Trip]:
+    passengers = {VehicleType.VAN: 6, VehicleType.BUS: 20, VehicleType.TRUCK: 1, VehicleType.MOTORCYCLE: 1}
+    trips = []
+    for _ in range(count):
+        vehicle_type = random.choice(vehicles).vehicle_type
+        start = day + timedelta(hours=7, minutes=15 * random.randint(0, 40))
+        trips.append(Trip(start, start + timedelta(minutes=30 * random.randint(1, 8)), vehicle_type,
+                          random.randint(1, passengers.get(vehicle_type, 3)), random.choice(departments),
+                          random.random() < 0.8))
+    return trips
+
+def main():
+    parser = argparse.ArgumentParser(description="Toplu araç atama performans ölçümü (sentetik veri)")
+    parser.add_argument("--vehicles", type=int, default=2000)
+    parser.add_argument("--drivers", type=int, default=1500)
+    parser.add_argument("--trips", type=int, default=6000, help="Bir günlük talep sayısı")
+    parser.add_argument("--departments", type=int, default=25)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-improve", action="store_true", help="İyileştirme turunu atla")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    day = datetime.combine(date.today() + timedelta(days=1), datetime.min.time())
+    departments = [f"Birim {number}" for number in range(1, args.departments + 1)]
+    vehicles, drivers, vehicle_busy, driver_busy = _synthetic_fleet(args.vehicles, args.drivers, departments, day)
+    trips = _synthetic_trips(args.trips, vehicles, departments, day)
+
+    started = time.perf_counter()
+    result = allocate(trips, vehicles, drivers, vehicle_busy, driver_busy, improve=not args.no_improve)
+    elapsed = time.perf_counter() - started
+    reasons = defaultdict(int)
+    for item in result["unassigned"]:
+        reasons[item["reason"]] += 1
+    print(f"{len(trips)} talep, {args.vehicles} araç, {args.drivers} sürücü: {elapsed * 1000:.0f} ms")
+    print(f"atanan {len(result['assignments'])}, kullanılan araç {result['vehicles_used']}, "
+          f"maliyet {result['cost']:.0f} (iyileştirme {result['improvement']:.0f})")
+    for reason, count in sorted(reasons.items()):
+        print(f"atanamayan - {reason}: {count}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Şüpheli yakıt alımlarının tespiti (fuel_anomalies)
+
+Kurallar: depo kapasitesini aşan alım, aracın normalinin çok üstünde 100 km tüketimi,
+geri giden kilometre ve tekrar eden fiş numarası.
+
+- Çevrimiçi: her yeni yakıt kaydında araç başına artımlı tutulan EWMA ortalama/varyans
+  (vehicle_fuel_stats) ile karşılaştırılır; geçmiş kayıtlar yeniden taranmaz.
+- Toplu tarama: geçmiş kayıtlar NumPy ile vektörel taranır; tüketim için aracın tüm geçmişinin
+  medyan/MAD değeri referans alınır; tüm geçmiş tarandığında (end_date yoksa) araç istatistikleri
+  yeniden hesaplanır.
+"""
+import math
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+import numpy as np
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.fuel import FuelRecord
+from app.models.fuel_anomaly import FuelAnomaly, AnomalyType, VehicleFuelStats
+from app.models.vehicle import Vehicle, VehicleType
+
+# Araçta depo kapasitesi girilmemişse kullanılacak varsayılanlar (litre)
+DEFAULT_TANK_CAPACITY = {
+    VehicleType.CAR: 60,
+    VehicleType.VAN: 80,
+    VehicleType.TRUCK: 400,
+    VehicleType.BUS: 300,
+    VehicleType.MOTORCYCLE: 20,
+}
+
+def tank_capacity(vehicle_type: VehicleType, fuel_tank_capacity: Optional[float]) -> Optional[float]:
+    return fuel_tank_capacity or DEFAULT_TANK_CAPACITY.get(vehicle_type)
+
+def _naive(value: datetime) -> datetime:
+    """Saat dilimli ve dilimsiz tarihleri karşılaştırılabilir yap (yerel saate çevirir)"""
+    if value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+def ewma_update(mean: Optional[float], var: Optional[float], value: float, alpha: float):
+    """Üstel ağırlıklı ortalama ve varyansı tek gözlemle güncelle"""
+    if mean is None:
+        return value, 0.0
+    diff = value - mean
+    increment = alpha * diff
+    return mean + increment, (1 - alpha) * (var + diff * increment)
+
+def detect_fuel_record(db: Session, record: FuelRecord, vehicle: Vehicle) -> List[FuelAnomaly]:
+    """
+    Yeni yakıt kaydını kontrol et, şüpheli bulguları ve araç istatistiklerini oturuma ekle
+    Kayıt flush edilmiş olmalıdır (id gerekir); commit çağırana aittir
+    """
+    anomalies = []
+
+    capacity = tank_capacity(vehicle.vehicle_type, vehicle.fuel_tank_capacity)
+    if capacity and record.liters > capacity * (1 + settings.FUEL_TANK_CAPACITY_TOLERANCE):
+        anomalies.append(FuelAnomaly(
+            anomaly_type=AnomalyType.OVER_CAPACITY,
+            score=round(record.liters / capacity, 3),
+            details=f"{record.liters} L alındı, depo kapasitesi {capacity} L"
+        ))
+
+    if record.receipt_number:
+        duplicate = db.query(FuelRecord.id).filter(
+            FuelRecord.receipt_number == record.receipt_number,
+            FuelRecord.id != record.id
+        ).first()
+        if duplicate:
+            anomalies.append(FuelAnomaly(
+                anomaly_type=AnomalyType.DUPLICATE_RECEIPT,
+                details=f"Fiş numarası {record.receipt_number} yakıt kaydı {duplicate.id} ile aynı"
+            ))
+
+    stats = db.get(VehicleFuelStats, vehicle.id)
+    if stats is None:
+        stats = VehicleFuelStats(vehicle_id=vehicle.id, sample_count=0)
+        db.add(stats)
+
+    # Geriye tarihli kayıtlar artımlı istatistiklere girmez (toplu taramada değerlendirilir)
+    fuel_date = _naive(record.fuel_date)
+    if stats.last_fuel_date is None or fuel_date >= _naive(stats.last_fuel_date):
+        km = record.km_at_fueling - stats.last_km if stats.last_km is not None else None
+        if km is not None and km < 0:
+            anomalies.append(FuelAnomaly(
+                anomaly_type=AnomalyType.KM_REGRESSION,
+                score=-km,
+                details=f"Kilometre {stats.last_km} değerinden {record.km_at_fueling} değerine geriledi"
+            ))
+        else:
+            if km:
+                consumption = record.liters / km * 100
+                z_score = None
+                if stats.sample_count >= settings.FUEL_ANOMALY_MIN_SAMPLES and stats.ewma_var:
+                    z_score = (consumption - stats.ewma_mean) / math.sqrt(stats.ewma_var)
+                if z_score is not None and z_score > settings.FUEL_ANOMALY_Z_THRESHOLD:
+                    anomalies.append(FuelAnomaly(
+                        anomaly_type=AnomalyType.HIGH_CONSUMPTION,
+                        score=round(z_score, 2),
+                        details=f"{consumption:.1f} L/100 km, araç ortalaması {stats.ewma_mean:.1f} L/100 km"
+                    ))
+                else:
+                    # Şüpheli değerler ortalamayı bozmasın
+                    stats.ewma_mean, stats.ewma_var = ewma_update(
+                        stats.ewma_mean, stats.ewma_var, consumption, settings.FUEL_ANOMALY_EWMA_ALPHA
+                    )
+                    stats.sample_count += 1
+            stats.last_km = record.km_at_fueling
+            stats.last_fuel_date = record.fuel_date
+
+    for anomaly in anomalies:
+        anomaly.fuel_record_id = record.id
+        anomaly.vehicle_id = record.vehicle_id
+        db.add(anomaly)
+    return anomalies
+
+def _group_bounds(vehicle_ids: np.ndarray):
+    """Araç id'sine göre sıralı dizide her grubun [başlangıç, bitiş) sınırları"""
+    starts = np.flatnonzero(np.r_[True, vehicle_ids[1:] != vehicle_ids[:-1]])
+    ends = np.r_[starts[1:], len(vehicle_ids)]
+    return starts, ends
+
+def rescan(
+    db: Session,
+    vehicle_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    vehicle_ids: Optional[List[int]] = None
+) -> dict:
+    """
+    Geçmiş yakıt kayıtlarını vektörel tara; bulgular eklenir (mevcut ve incelenmiş bulgular korunur).
+    Taranan araçların artımlı istatistikleri, end_date verilmemişse (tüm geçmiş) yeniden hesaplanır.
+    """
+    query = db.query(
+        FuelRecord.id, FuelRecord.vehicle_id, FuelRecord.fuel_date, FuelRecord.km_at_fueling,
+        FuelRecord.liters, FuelRecord.receipt_number, Vehicle.vehicle_type, Vehicle.fuel_tank_capacity
+    ).join(Vehicle, Vehicle.id == FuelRecord.vehicle_id)
+    if vehicle_id:
+        query = query.filter(FuelRecord.vehicle_id == vehicle_id)
+    if vehicle_ids:
+        query = query.filter(FuelRecord.vehicle_id.in_(vehicle_ids))
+    if end_date:
+        query = query.filter(FuelRecord.fuel_date < datetime.combine(end_date, datetime.min.time()) + timedelta(days=1))
+    rows = query.order_by(FuelRecord.vehicle_id, FuelRecord.fuel_date, FuelRecord.id).all()
+    if not rows:
+        # Son yakıt kaydı silinmiş araçta eski last_km/EWMA kalmamalı
+        if end_date is None and (vehicle_id or vehicle_ids):
+            db.execute(delete(VehicleFuelStats).where(VehicleFuelStats.vehicle_id.in_(vehicle_ids or [vehicle_id])))
+            db.commit()
+        return {"records": 0, "flagged": {}, "inserted": 0}
+
+    ids = np.array([r.id for r in rows], dtype=np.int64)
+    vehicles = np.array([r.vehicle_id for r in rows], dtype=np.int64)
+    fuel_dates = [_naive(r.fuel_date) for r in rows]
+    km = np.array([r.km_at_fueling for r in rows], dtype=np.float64)
+    liters = np.array([r.liters for r in rows], dtype=np.float64)
+    capacity = np.array(
+        [tank_capacity(r.vehicle_type, r.fuel_tank_capacity) or np.nan for r in rows], dtype=np.float64
+    )
+    # Bulgular sadece tarih aralığındaki kayıtlar için yazılır; önceki kayıtlar referans olarak okunur
+    in_range = np.ones(len(rows), dtype=bool)
+    if start_date:
+        start = datetime.combine(start_date, datetime.min.time())
+        in_range = np.array([d >= start for d in fuel_dates], dtype=bool)
+
+    flags = {}
+    with np.errstate(invalid="ignore", divide="ignore"):
+        flags[AnomalyType.OVER_CAPACITY] = (
+            liters > capacity * (1 + settings.FUEL_TANK_CAPACITY_TOLERANCE),
+            liters / capacity
+        )
+
+        # Aynı aracın bir önceki alımına göre km farkı (grubun ilk kaydında NaN)
+        same_vehicle = np.r_[False, vehicles[1:] == vehicles[:-1]]
+        km_delta = np.where(same_vehicle, km - np.r_[np.nan, km[:-1]], np.nan)
+        flags[AnomalyType.KM_REGRESSION] = (km_delta < 0, -km_delta)
+
+        consumption = np.where(km_delta > 0, liters / km_delta * 100, np.nan)
+        robust_z = np.full(len(rows), np.nan)
+        starts, ends = _group_bounds(vehicles)
+        for group_start, group_end in zip(starts, ends):
+            values = consumption[group_start:group_end]
+            valid = values[~np.isnan(values)]
+            if len(valid) < settings.FUEL_ANOMALY_MIN_SAMPLES:
+                continue
+            median = np.median(valid)
+            mad = np.median(np.abs(valid - median))
+            if mad > 0:
+                robust_z[group_start:group_end] = 0.6745 * (values - median) / mad
+        flags[AnomalyType.HIGH_CONSUMPTION] = (robust_z > settings.FUEL_ANOMALY_Z_THRESHOLD, robust_z)
+
+    # Tekrar eden fiş numaraları: ilk kayıt (en küçük id) hariç hepsi işaretlenir
+    receipts = np.array([r.receipt_number or "" for r in rows], dtype=object)
+    duplicate = np.zeros(len(rows), dtype=bool)
+    has_receipt = receipts != ""
+    if has_receipt.any():
+        order = np.lexsort((ids, receipts.astype(str)))
+        sorted_receipts = receipts[order]
+        repeated = np.r_[False, sorted_receipts[1:] == sorted_receipts[:-1]]
+        duplicate[order] = repeated & has_receipt[order]
+    flags[AnomalyType.DUPLICATE_RECEIPT] = (duplicate, np.full(len(rows), np.nan))
+
+    anomaly_rows = []
+    flagged = {}
+    for anomaly_type, (mask, scores) in flags.items():
+        mask = mask & in_range
+        flagged[anomaly_type.value] = int(mask.sum())
+        for i in np.flatnonzero(mask):
+            score = float(scores[i])
+            anomaly_rows.append({
+                "fuel_record_id": int(ids[i]),
+                "vehicle_id": int(vehicles[i]),
+                "anomaly_type": anomaly_type,
+                "score": None if math.isnan(score) else round(score, 3),
+                "details": "Toplu tarama",
+            })
+
+    # Daha önce kaydedilmiş (incelenmiş olabilir) bulgular korunur, sadece yeniler eklenir
+    existing_query = db.query(FuelAnomaly.fuel_record_id, FuelAnomaly.anomaly_type)
+    if vehicle_id:
+        existing_query = existing_query.filter(FuelAnomaly.vehicle_id == vehicle_id)
+    if vehicle_ids:
+        existing_query = existing_query.filter(FuelAnomaly.vehicle_id.in_(vehicle_ids))
+    existing = {(r.fuel_record_id, r.anomaly_type) for r in existing_query.all()}
+    new_rows = [r for r in anomaly_rows if (r["fuel_record_id"], r["anomaly_type"]) not in existing]
+    if new_rows:
+        db.execute(insert(FuelAnomaly), new_rows)
+
+    # end_date ile kesilmiş geçmiş aracın son durumunu yansıtmaz (last_km/last_fuel_date geriye gider);
+    # artımlı istatistikler yalnızca araçların tüm geçmişi tarandığında yeniden kurulur
+    if end_date is None:
+        _rebuild_vehicle_stats(db, rows, vehicles, km, consumption, robust_z, starts, ends)
+    db.commit()
+
+    return {"records": len(rows), "flagged": flagged, "inserted": len(new_rows)}
+
+def _rebuild_vehicle_stats(db: Session, rows, vehicles, km, consumption, robust_z, starts, ends) -> None:
+    """Artımlı istatistikleri taranan geçmişten yeniden kur (ağırlıklı EWMA, en yeni gözlem en ağır)"""
+    alpha = settings.FUEL_ANOMALY_EWMA_ALPHA
+    stats_rows = []
+    for group_start, group_end in zip(starts, ends):
+        values = consumption[group_start:group_end]
+        suspicious = robust_z[group_start:group_end] > settings.FUEL_ANOMALY_Z_THRESHOLD
+        valid = values[~np.isnan(values) & ~suspicious]
+        mean = var = None
+        if len(valid):
+            weights = (1 - alpha) ** np.arange(len(valid) - 1, -1, -1)
+            mean = float(np.average(valid, weights=weights))
+            var = float(np.average((valid - mean) ** 2, weights=weights))
+        last = group_end - 1
+        stats_rows.append({
+            "vehicle_id": int(vehicles[group_start]),
+            "last_fuel_date": rows[last].fuel_date,
+            "last_km": int(np.max(km[group_start:group_end])),
+            "ewma_mean": mean,
+            "ewma_var": var,
+            "sample_count": int(len(valid)),
+        })
+    db.execute(delete(VehicleFuelStats).where(VehicleFuelStats.vehicle_id.in_([r["vehicle_id"] for r in stats_rows])))
+    db.execute(insert(VehicleFuelStats), stats_rows)
@@ -0,0 +1,293 @@
+"""
+Akaryakıt kartı sağlayıcı ekstrelerinin (CSV/XLSX) toplu içe aktarımı
+
+Satırlar dosyadan akış halinde okunur ve parçalar halinde işlenir:
+- plakalar tek sorguyla yüklenen plaka -> araç id haritasından çözülür,
+- (araç, fiş no, tarih) üçlüsü hem dosya içinde hem veritabanında tekrar ediyorsa satır atlanır,
+- yeni kayıtlar tek INSERT (executemany) ile eklenir, özet hücreleri parça başına tek UPSERT ile güncellenir,
+- araçların current_km değeri içe aktarım sonunda tek UPDATE ile ilerletilir.
+"""
+import csv
+import io
+import itertools
+from datetime import date, datetime
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Integer, bindparam, column, func, insert, select, update, values
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.sql import greatest
+from app.models.fuel import FuelRecord
+from app.models.vehicle import Vehicle
+from app.services import vehicle_stats, fuel_anomalies
+from app.services.fuel_anomalies import _naive
+
+MAX_REPORTED_ERRORS = 100
+
+# Kolon adı -> sağlayıcıların kullandığı başlıklar (normalize edilmiş halde)
+COLUMN_ALIASES = {
+    "plate_number": ("plate_number", "plate", "plaka"),
+    "fuel_date": ("fuel_date", "date", "tarih", "islem_tarihi"),
+    "fuel_type": ("fuel_type", "product", "urun", "yakit_turu", "yakit_tipi"),
+    "liters": ("liters", "litre", "miktar"),
+    "price_per_liter": ("price_per_liter", "unit_price", "birim_fiyat"),
+    "total_cost": ("total_cost", "amount", "tutar", "toplam_tutar"),
+    "km_at_fueling": ("km_at_fueling", "km", "kilometre"),
+    "station_name": ("station_name", "station", "istasyon"),
+    "receipt_number": ("receipt_number", "receipt", "fis_no", "fis_numarasi"),
+}
+REQUIRED_COLUMNS = ("plate_number", "fuel_date", "fuel_type", "liters", "km_at_fueling", "receipt_number")
+
+DATE_FORMATS = (
+    "%d.%m.%Y %H:%M:%S", "%d.%m.%Y %H:%M", "%d.%m.%Y",
+    "%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%Y",
+)
+
+_TURKISH = str.maketrans("ÇĞİIÖŞÜçğıöşü", "CGIIOSUcgiosu")
+
+def _normalize_header(value) -> str:
+    text = str(value or "").strip().translate(_TURKISH).lower()
+    return text.replace(" ", "_").replace("-", "_").replace(".", "")
+
+def normalize_plate(value) -> str:
+    return "".join(str(value or "").translate(_TURKISH).upper().split()).replace("-", "")
+
+def _parse_number(value) -> Optional[float]:
+    """1234.5, 1.234,56 ve 1234,5 biçimlerini kabul eder"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip().replace(" ", "")
+    if not text:
+        return None
+    if "," in text and "." in text:
+        if text.rfind(",") > text.rfind("."):
+            text = text.replace(".", "").replace(",", ".")
+        else:
+            text = text.replace(",", "")
+    elif "," in text:
+        text = text.replace(",", ".")
+    return float(text)
+
+def _parse_date(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, datetime.min.time())
+    text = str(value or "").strip()
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date: {text}")
+
+def _csv_rows(stream: BinaryIO) -> Iterator[tuple]:
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    header = text.readline()
+    # Türkçe ekstrelerde ayraç genellikle ';' (ondalık ayırıcı virgül olduğu için)
+    delimiter = max((",", ";", "\t"), key=header.count)
+    for row in csv.reader(itertools.chain([header], text), delimiter=delimiter):
+        yield tuple(row)
+
+def _xlsx_rows(stream: BinaryIO) -> Iterator[tuple]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("XLSX import requires openpyxl")
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+def read_rows(stream: BinaryIO, filename: str) -> Iterator[tuple]:
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return _csv_rows(stream)
+    if name.endswith(".xlsx"):
+        return _xlsx_rows(stream)
+    raise ValueError("Unsupported file type, expected .csv or .xlsx")
+
+def _column_positions(header: tuple) -> Dict[str, int]:
+    normalized = [_normalize_header(h) for h in header]
+    positions = {}
+    for name, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized:
+                positions[name] = normalized.index(alias)
+                break
+    missing = [name for name in REQUIRED_COLUMNS if name not in positions]
+    if "price_per_liter" not in positions and "total_cost" not in positions:
+        missing.append("price_per_liter|total_cost")
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    return positions
+
+def _parse_row(row: tuple, positions: Dict[str, int]) -> dict:
+    def cell(name):
+        index = positions.get(name)
+        if index is None or index >= len(row):
+            return None
+        value = row[index]
+        return value.strip() if isinstance(value, str) else value
+
+    liters = _parse_number(cell("liters"))
+    if not liters or liters <= 0:
+        raise ValueError("liters must be positive")
+    km = _parse_number(cell("km_at_fueling"))
+    if km is None:
+        raise ValueError("km_at_fueling is required")
+    receipt_number = cell("receipt_number")
+    if receipt_number in (None, ""):
+        raise ValueError("receipt_number is required")
+    fuel_type = cell("fuel_type")
+    if not fuel_type:
+        raise ValueError("fuel_type is required")
+
+    price = _parse_number(cell("price_per_liter"))
+    total = _parse_number(cell("total_cost"))
+    if price is None and total is None:
+        raise ValueError("price_per_liter or total_cost is required")
+    if price is None:
+        price = total / liters
+    if total is None:
+        total = round(price * liters, 2)
+
+    return {
+        "fuel_date": _parse_date(cell("fuel_date")),
+        "fuel_type": str(fuel_type),
+        "liters": liters,
+        "price_per_liter": price,
+        "total_cost": total,
+        "km_at_fueling": int(km),
+        "station_name": cell("station_name") or None,
+        "receipt_number": str(receipt_number),
+    }
+
+def _dedupe_key(vehicle_id: int, receipt_number: str, fuel_date: datetime) -> Tuple[int, str, datetime]:
+    return (vehicle_id, receipt_number, _naive(fuel_date))
+
+def _insert_chunk(db: Session, chunk: List[dict], seen: set, max_km: Dict[int, int]) -> Tuple[int, int]:
+    """Parçayı tekrar kontrolünden geçirip toplu ekle; (eklenen, tekrar) döner. seen ve max_km güncellenir"""
+    existing = db.execute(
+        select(FuelRecord.vehicle_id, FuelRecord.receipt_number, FuelRecord.fuel_date).where(
+            FuelRecord.receipt_number.in_({row["receipt_number"] for row in chunk}),
+            FuelRecord.vehicle_id.in_({row["vehicle_id"] for row in chunk})
+        )
+    ).all()
+    existing_keys = {_dedupe_key(*row) for row in existing}
+
+    new_rows = []
+    for row in chunk:
+        key = _dedupe_key(row["vehicle_id"], row["receipt_number"], row["fuel_date"])
+        if key in seen or key in existing_keys:
+            continue
+        seen.add(key)
+        new_rows.append(row)
+        if row["km_at_fueling"] > max_km.get(row["vehicle_id"], -1):
+            max_km[row["vehicle_id"]] = row["km_at_fueling"]
+
+    if new_rows:
+        db.execute(insert(FuelRecord), new_rows)
+        vehicle_stats.add_fuel_rows(db, new_rows)
+    return len(new_rows), len(chunk) - len(new_rows)
+
+def advance_current_km(db: Session, max_km: Dict[int, int]) -> int:
+    """Araçların current_km değerini tek UPDATE ile ilerlet (geri almaz)"""
+    if not max_km:
+        return 0
+    vehicles = Vehicle.__table__
+    if db.get_bind().dialect.name == "postgresql":
+        # UPDATE vehicles SET current_km = GREATEST(...) FROM (VALUES ...) AS v (id, km) WHERE vehicles.id = v.id
+        km_values = values(column("id", Integer), column("km", Integer), name="v").data(list(max_km.items()))
+        db.execute(
+            update(vehicles)
+            .where(vehicles.c.id == km_values.c.id)
+            .values(current_km=greatest(func.coalesce(vehicles.c.current_km, 0), km_values.c.km))
+        )
+    else:
+        # SQLite VALUES listesine kolon adı verilemediği için aynı UPDATE executemany ile çalıştırılır
+        db.execute(
+            update(vehicles)
+            .where(vehicles.c.id == bindparam("vehicle_id"))
+            .values(current_km=greatest(func.coalesce(vehicles.c.current_km, 0), bindparam("km"))),
+            [{"vehicle_id": vehicle_id, "km": km} for vehicle_id, km in max_km.items()]
+        )
+    return len(max_km)
+
+def import_statement(
+    db: Session,
+    stream: BinaryIO,
+    filename: str,
+    user_id: Optional[int] = None,
+    detect_anomalies: bool = True
+) -> dict:
+    """
+    Ekstreyi içe aktar ve commit et. detect_anomalies ile eklenen kayıtlar, yalnızca etkilenen araçlar için
+    toplu anomali taramasından geçirilir (araç istatistikleri de yeniden hesaplanır)
+    """
+    rows = read_rows(stream, filename)
+    header = next(rows, None)
+    if header is None:
+        raise ValueError("File is empty")
+    positions = _column_positions(header)
+
+    plates = {normalize_plate(plate): vehicle_id for vehicle_id, plate in db.execute(select(Vehicle.id, Vehicle.plate_number))}
+    chunk_size = settings.FUEL_IMPORT_CHUNK_SIZE
+    result = {"rows": 0, "inserted": 0, "duplicates": 0, "unknown_plates": [], "errors": [], "error_count": 0}
+    unknown_plates = set()
+    seen = set()
+    max_km: Dict[int, int] = {}
+    chunk = []
+
+    def add_error(line: int, message: str):
+        result["error_count"] += 1
+        if len(result["errors"]) < MAX_REPORTED_ERRORS:
+            result["errors"].append({"line": line, "message": message})
+
+    for line, row in enumerate(rows, start=2):
+        if not any(value not in (None, "") for value in row):
+            continue
+        result["rows"] += 1
+        plate = normalize_plate(row[positions["plate_number"]] if positions["plate_number"] < len(row) else None)
+        vehicle_id = plates.get(plate)
+        if vehicle_id is None:
+            unknown_plates.add(plate)
+            add_error(line, f"Unknown plate number: {plate}")
+            continue
+        try:
+            record = _parse_row(row, positions)
+        except (ValueError, TypeError, ZeroDivisionError) as e:
+            add_error(line, str(e))
+            continue
+        record.update(vehicle_id=vehicle_id, driver_id=None, created_by=user_id)
+        chunk.append(record)
+
+        if len(chunk) >= chunk_size:
+            inserted, duplicates = _insert_chunk(db, chunk, seen, max_km)
+            result["inserted"] += inserted
+            result["duplicates"] += duplicates
+            chunk = []
+    if chunk:
+        inserted, duplicates = _insert_chunk(db, chunk, seen, max_km)
+        result["inserted"] += inserted
+        result["duplicates"] += duplicates
+
+    result["vehicles_updated"] = advance_current_km(db, max_km)
+    db.commit()
+
+    result["unknown_plates"] = sorted(unknown_plates)[:MAX_REPORTED_ERRORS]
+    result["anomalies_inserted"] = 0
+    if detect_anomalies and result["inserted"]:
+        # seen: eklenen kayıtların anahtarları; tarama en eski eklenen kayıttan başlar
+        min_fuel_date = min(fuel_date for _, _, fuel_date in seen)
+        scan = fuel_anomalies.rescan(db, start_date=min_fuel_date.date(), vehicle_ids=sorted(max_km))
+        result["anomalies_inserted"] = scan["inserted"]
+    return result
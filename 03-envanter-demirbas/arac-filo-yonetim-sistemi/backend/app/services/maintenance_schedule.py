@@ -0,0 +1,157 @@
+"""
+Km ve tarih bazlı bakım tahmini (maintenance_predictions)
+
+Her araç ve bakım türü için en son bakım kaydındaki hedefler (next_service_date, next_service_km) bekleyen
+bakımdır. Km hedefine ulaşılacak gün, aracın son MAINTENANCE_KM_RATE_WINDOW_DAYS gündeki kilometre
+gözlemlerinden (yakıt alımı, bakım, telematik) hesaplanan günlük km hızıyla tahmin edilir.
+Tablo gecelik yeniden hesaplanır; bakım kaydı değiştiğinde yalnızca ilgili araç yenilenir:
+    python -m app.services.maintenance_schedule
+"""
+import math
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import func, select, delete, insert, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.fuel import FuelRecord
+from app.models.maintenance import Maintenance, MaintenancePrediction
+from app.models.telematics import TelematicsPing, TelematicsRollup
+from app.models.vehicle import Vehicle
+from app.services.fuel_anomalies import _naive
+
+def _km_observations(db: Session, since: datetime, vehicle_ids: Optional[list]) -> Dict[int, list]:
+    """Araç başına [ilk gözlem, son gözlem, en küçük km, en büyük km]; kaynak başına tek GROUP BY"""
+    sources = [
+        (FuelRecord.vehicle_id, FuelRecord.fuel_date, FuelRecord.km_at_fueling),
+        (Maintenance.vehicle_id, Maintenance.service_date, Maintenance.km_at_service),
+        (TelematicsPing.vehicle_id, TelematicsPing.recorded_at, TelematicsPing.odometer_km),
+        (TelematicsRollup.vehicle_id, TelematicsRollup.bucket_start, TelematicsRollup.max_odometer_km),
+    ]
+    observations = {}
+    for vehicle_id, observed_at, km in sources:
+        criteria = [observed_at >= since, km.isnot(None)]
+        if vehicle_ids is not None:
+            criteria.append(vehicle_id.in_(vehicle_ids))
+        rows = db.execute(
+            select(vehicle_id, func.min(observed_at), func.max(observed_at), func.min(km), func.max(km))
+            .where(*criteria).group_by(vehicle_id)
+        ).all()
+        for vid, first_at, last_at, min_km, max_km in rows:
+            first_at, last_at = _naive(first_at), _naive(last_at)
+            current = observations.get(vid)
+            if current is None:
+                observations[vid] = [first_at, last_at, min_km, max_km]
+            else:
+                current[0] = min(current[0], first_at)
+                current[1] = max(current[1], last_at)
+                current[2] = min(current[2], min_km)
+                current[3] = max(current[3], max_km)
+    return observations
+
+def km_per_day(db: Session, today: date, vehicle_ids: Optional[list] = None) -> Dict[int, float]:
+    """Araç başına günlük km hızı (gözlem aralığı MAINTENANCE_KM_RATE_MIN_SPAN_DAYS günden kısaysa yok)"""
+    since = datetime.combine(today, datetime.min.time()) - timedelta(days=settings.MAINTENANCE_KM_RATE_WINDOW_DAYS)
+    rates = {}
+    for vehicle_id, (first_at, last_at, min_km, max_km) in _km_observations(db, since, vehicle_ids).items():
+        days = (last_at - first_at).total_seconds() / 86400
+        if days >= settings.MAINTENANCE_KM_RATE_MIN_SPAN_DAYS:
+            rates[vehicle_id] = (max_km - min_km) / days
+    return rates
+
+def predict(
+    today: date,
+    next_service_date: Optional[datetime],
+    next_service_km: Optional[int],
+    current_km: Optional[int],
+    rate: Optional[float]
+) -> dict:
+    """Km hedefinin tahmini günü ve erken olan hedefe göre due_date/due_by"""
+    predicted_km_date = None
+    if next_service_km is not None and current_km is not None:
+        remaining_km = next_service_km - current_km
+        if remaining_km <= 0:
+            predicted_km_date = today
+        elif rate:
+            predicted_km_date = today + timedelta(days=math.ceil(remaining_km / rate))
+
+    date_due = next_service_date.date() if next_service_date else None
+    if predicted_km_date and (date_due is None or predicted_km_date < date_due):
+        due_date, due_by = predicted_km_date, "km"
+    else:
+        due_date, due_by = date_due, "date" if date_due else None
+    return {"predicted_km_date": predicted_km_date, "due_date": due_date, "due_by": due_by}
+
+def refresh_predictions(db: Session, vehicle_ids: Optional[Iterable[int]] = None, today: Optional[date] = None) -> int:
+    """Tahminleri (tüm filo ya da verilen araçlar için) yeniden hesapla; commit çağırana ait"""
+    today = today or date.today()
+    vehicle_ids = list(set(vehicle_ids)) if vehicle_ids is not None else None
+
+    # Araç ve tür başına en son bakım kaydı; hedefi varsa bekleyen bakımdır
+    latest = select(
+        Maintenance.id, Maintenance.vehicle_id, Maintenance.maintenance_type,
+        Maintenance.next_service_date, Maintenance.next_service_km,
+        func.row_number().over(
+            partition_by=(Maintenance.vehicle_id, Maintenance.maintenance_type),
+            order_by=(Maintenance.service_date.desc(), Maintenance.id.desc())
+        ).label("rank")
+    )
+    if vehicle_ids is not None:
+        latest = latest.where(Maintenance.vehicle_id.in_(vehicle_ids))
+    latest = latest.subquery()
+    pending = db.execute(
+        select(latest, Vehicle.current_km)
+        .join(Vehicle, Vehicle.id == latest.c.vehicle_id)
+        .where(
+            latest.c.rank == 1,
+            Vehicle.is_active == True,
+            or_(latest.c.next_service_date.isnot(None), latest.c.next_service_km.isnot(None))
+        )
+    ).all()
+
+    rates = km_per_day(db, today, vehicle_ids)
+    rows = []
+    for record in pending:
+        rate = rates.get(record.vehicle_id)
+        rows.append({
+            "vehicle_id": record.vehicle_id,
+            "maintenance_id": record.id,
+            "maintenance_type": record.maintenance_type,
+            "next_service_date": record.next_service_date,
+            "next_service_km": record.next_service_km,
+            "current_km": record.current_km,
+            "km_per_day": rate,
+            **predict(today, record.next_service_date, record.next_service_km, record.current_km, rate),
+        })
+
+    delete_stmt = delete(MaintenancePrediction)
+    if vehicle_ids is not None:
+        delete_stmt = delete_stmt.where(MaintenancePrediction.vehicle_id.in_(vehicle_ids))
+    db.execute(delete_stmt)
+    if rows:
+        db.execute(insert(MaintenancePrediction), rows)
+    return len(rows)
+
+def backfill_maintenance_predictions(engine) -> None:
+    """Tahmin tablosu boşken bakım kaydı varsa bir kez hesapla (başlangıçta)"""
+    with Session(engine) as db:
+        if db.execute(select(MaintenancePrediction.id).limit(1)).first() is not None:
+            return
+        if db.execute(select(Maintenance.id).limit(1)).first() is not None:
+            refresh_predictions(db)
+            db.commit()
+
+def main():
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        rows = refresh_predictions(db)
+        db.commit()
+        print(f"{rows} bakım tahmini yazıldı")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
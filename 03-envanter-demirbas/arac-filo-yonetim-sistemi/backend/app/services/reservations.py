@@ -0,0 +1,221 @@
+"""
+Rezervasyon çakışma kontrolü ve müsait araç araması
+
+Süreç içi indeks, veritabanındaki güncel ve ileri tarihli rezervasyonlardan kurulur: araç ve sürücü başına
+başlangıca göre sıralı aralıklar ve her konuma kadarki en büyük bitiş zamanı (artırılmış aralık ağacındaki
+max_end alanının dizi karşılığı). Çakışma testi O(log n); müsait araç araması istenen tipteki araçları
+dolaşıp ilk boş olanlarda durur, veritabanına gitmez.
+Asıl güvence veritabanı kısıtıdır (PostgreSQL exclusion constraint / SQLite tetikleyici); indeks başka
+süreçlerin yazdıklarını RESERVATION_INDEX_TTL_SECONDS sonra görür.
+"""
+import bisect
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.reservation import Reservation, ReservationStatus
+from app.models.vehicle import Vehicle, VehicleStatus, VehicleType
+from app.services.fuel_anomalies import _naive
+
+# Araçta koltuk sayısı girilmemişse kullanılacak varsayılanlar (sürücü hariç yolcu)
+DEFAULT_SEAT_CAPACITY = {
+    VehicleType.CAR: 4,
+    VehicleType.VAN: 8,
+    VehicleType.TRUCK: 2,
+    VehicleType.BUS: 30,
+    VehicleType.MOTORCYCLE: 1,
+}
+
+def seat_capacity(vehicle_type: VehicleType, value: Optional[int]) -> int:
+    return value or DEFAULT_SEAT_CAPACITY.get(vehicle_type, 0)
+
+def local_time(value: datetime) -> datetime:
+    """Rezervasyon zamanları uygulamanın geri kalanı gibi yerel saat (dilimsiz) olarak tutulur"""
+    return _naive(value)
+
+class IntervalIndex:
+    """Yarı açık [start, end) aralıkları; başlangıca göre sıralı, max_ends[i] = ilk i+1 aralığın en büyük bitişi"""
+    __slots__ = ("intervals", "starts", "max_ends")
+
+    def __init__(self, intervals=()):
+        self.intervals = sorted(intervals)  # (start, end, reservation_id)
+        self.starts: List[datetime] = []
+        self.max_ends: List[datetime] = []
+        self._reindex(0)
+
+    def __len__(self) -> int:
+        return len(self.intervals)
+
+    def _reindex(self, position: int) -> None:
+        del self.starts[position:]
+        del self.max_ends[position:]
+        running = self.max_ends[-1] if self.max_ends else None
+        for start, end, _ in self.intervals[position:]:
+            self.starts.append(start)
+            running = end if running is None or end > running else running
+            self.max_ends.append(running)
+
+    def add(self, start: datetime, end: datetime, reservation_id: int) -> None:
+        position = bisect.bisect_right(self.starts, start)
+        self.intervals.insert(position, (start, end, reservation_id))
+        self._reindex(position)
+
+    def remove(self, reservation_id: int) -> None:
+        for position, interval in enumerate(self.intervals):
+            if interval[2] == reservation_id:
+                del self.intervals[position]
+                self._reindex(position)
+                return
+
+    def is_free(self, start: datetime, end: datetime) -> bool:
+        # start < end olan aralıklar [0, position); içlerinden biri start'tan sonra bitiyorsa çakışma var
+        position = bisect.bisect_left(self.starts, end)
+        return position == 0 or self.max_ends[position - 1] <= start
+
+    def overlaps(self, start: datetime, end: datetime, exclude_id: Optional[int] = None) -> List[int]:
+        """[start, end) ile çakışan rezervasyon id'leri"""
+        result = []
+        for position in range(bisect.bisect_left(self.starts, end) - 1, -1, -1):
+            if self.max_ends[position] <= start:
+                break
+            _, interval_end, reservation_id = self.intervals[position]
+            if interval_end > start and reservation_id != exclude_id:
+                result.append(reservation_id)
+        return result
+
+class PoolVehicle(NamedTuple):
+    id: int
+    plate_number: str
+    vehicle_type: VehicleType
+    department: Optional[str]
+    seat_capacity: int
+
+class ReservationIndex:
+    """Araç/sürücü aralık indeksleri ve rezerve edilebilir (aktif) araçlar; süre dolunca veya geçersiz kılınınca yeniden kurulur"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.RLock()
+        self._loaded_at: Optional[float] = None
+        self.vehicles: Dict[int, PoolVehicle] = {}
+        self.vehicles_by_type: Dict[VehicleType, List[PoolVehicle]] = {}
+        self.vehicle_intervals: Dict[int, IntervalIndex] = defaultdict(IntervalIndex)
+        self.driver_intervals: Dict[int, IntervalIndex] = defaultdict(IntervalIndex)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded_at = None
+
+    def rebuild(self, db: Session) -> None:
+        vehicles = [
+            PoolVehicle(vehicle_id, plate_number, vehicle_type, department, seat_capacity(vehicle_type, seats))
+            for vehicle_id, plate_number, vehicle_type, department, seats in db.execute(
+                select(Vehicle.id, Vehicle.plate_number, Vehicle.vehicle_type, Vehicle.department, Vehicle.seat_capacity)
+                .where(Vehicle.is_active == True, Vehicle.status == VehicleStatus.ACTIVE)
+                .order_by(Vehicle.id)
+            )
+        ]
+        reservations = db.execute(
+            select(Reservation.id, Reservation.vehicle_id, Reservation.driver_id,
+                   Reservation.start_time, Reservation.end_time)
+            .where(Reservation.status != ReservationStatus.CANCELLED, Reservation.end_time > datetime.now())
+        ).all()
+
+        by_vehicle, by_driver = defaultdict(list), defaultdict(list)
+        for reservation_id, vehicle_id, driver_id, start, end in reservations:
+            interval = (local_time(start), local_time(end), reservation_id)
+            by_vehicle[vehicle_id].append(interval)
+            if driver_id is not None:
+                by_driver[driver_id].append(interval)
+
+        vehicles_by_type = defaultdict(list)
+        for vehicle in vehicles:
+            vehicles_by_type[vehicle.vehicle_type].append(vehicle)
+
+        with self._lock:
+            self.vehicles = {vehicle.id: vehicle for vehicle in vehicles}
+            self.vehicles_by_type = dict(vehicles_by_type)
+            self.vehicle_intervals = defaultdict(IntervalIndex, {k: IntervalIndex(v) for k, v in by_vehicle.items()})
+            self.driver_intervals = defaultdict(IntervalIndex, {k: IntervalIndex(v) for k, v in by_driver.items()})
+            self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self, db: Session) -> None:
+        with self._lock:
+            fresh = self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds
+        if not fresh:
+            self.rebuild(db)
+
+    @contextmanager
+    def locked(self, db: Session):
+        """Güncel indeksi kilit altında ver (toplu atama sırasında indeks değişmesin)"""
+        self.ensure_loaded(db)
+        with self._lock:
+            yield self
+
+    def conflicts(
+        self,
+        db: Session,
+        vehicle_id: int,
+        driver_id: Optional[int],
+        start: datetime,
+        end: datetime,
+        exclude_id: Optional[int] = None
+    ) -> List[int]:
+        """Araç veya sürücü için [start, end) ile çakışan rezervasyonlar"""
+        self.ensure_loaded(db)
+        start, end = local_time(start), local_time(end)
+        with self._lock:
+            result = self.vehicle_intervals[vehicle_id].overlaps(start, end, exclude_id)
+            if driver_id is not None:
+                result += self.driver_intervals[driver_id].overlaps(start, end, exclude_id)
+        return sorted(set(result))
+
+    def add(self, reservation: Reservation) -> None:
+        if reservation.status == ReservationStatus.CANCELLED:
+            return
+        start, end = local_time(reservation.start_time), local_time(reservation.end_time)
+        with self._lock:
+            self.vehicle_intervals[reservation.vehicle_id].add(start, end, reservation.id)
+            if reservation.driver_id is not None:
+                self.driver_intervals[reservation.driver_id].add(start, end, reservation.id)
+
+    def remove(self, reservation_id: int, vehicle_id: int, driver_id: Optional[int]) -> None:
+        with self._lock:
+            self.vehicle_intervals[vehicle_id].remove(reservation_id)
+            if driver_id is not None:
+                self.driver_intervals[driver_id].remove(reservation_id)
+
+    def available_vehicles(
+        self,
+        db: Session,
+        vehicle_type: VehicleType,
+        start: datetime,
+        end: datetime,
+        department: Optional[str] = None,
+        limit: int = 10,
+        passenger_count: int = 0
+    ) -> List[PoolVehicle]:
+        """[start, end) aralığında boş olan, istenen tipte ve yeterli koltuklu aktif araçlar (id sırasıyla ilk limit adet)"""
+        self.ensure_loaded(db)
+        start, end = local_time(start), local_time(end)
+        result = []
+        with self._lock:
+            intervals = self.vehicle_intervals
+            for vehicle in self.vehicles_by_type.get(vehicle_type, ()):
+                if (department and vehicle.department != department) or vehicle.seat_capacity < passenger_count:
+                    continue
+                index = intervals.get(vehicle.id)
+                if index is None or index.is_free(start, end):
+                    result.append(vehicle)
+                    if len(result) >= limit:
+                        break
+        return result
+
+reservation_index = ReservationIndex(settings.RESERVATION_INDEX_TTL_SECONDS)
@@ -0,0 +1,276 @@
+"""
+Araç takip cihazı sinyallerinin (GPS/kilometre) alınması ve zaman serisi olarak saklanması
+
+- Gelen sinyaller süreç içi tamponda biriktirilir; tampon dolduğunda veya belirli aralıklarla arka plan
+  iş parçacığı tarafından tek toplu INSERT ile telematics_pings tablosuna yazılır.
+- Her yazımda araçların current_km değeri, o yazımdaki en büyük kilometreyle tek UPDATE ile ilerletilir.
+- Eski veri özetlenir: saklama süresi dolan ham sinyaller saatlik, saatlik özetler günlük özete alınır
+  (PostgreSQL'de ham verinin günlük bölümleri doğrudan silinir):
+    python -m app.services.telematics downsample
+"""
+import argparse
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import func, select, delete, literal, case, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.sql import upsert, greatest, least, date_trunc
+from app.database import SessionLocal
+from app.models.telematics import TelematicsPing, TelematicsRollup
+from app.models.vehicle import Vehicle
+from app.services.fuel_import import advance_current_km
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PREFIX = "telematics_pings_p"
+PING_FIELDS = ("vehicle_id", "recorded_at", "latitude", "longitude", "speed_kmh", "odometer_km")
+
+def to_utc(value: datetime) -> datetime:
+    """Saat dilimsiz değerler UTC kabul edilir"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def ping_row(ping: dict) -> dict:
+    """Sinyali toplu INSERT için sabit kolonlu satıra çevir"""
+    row = {field: ping.get(field) for field in PING_FIELDS}
+    row["recorded_at"] = to_utc(row["recorded_at"])
+    return row
+
+_known_vehicle_ids: Set[int] = set()
+
+def known_vehicle_ids(db: Session, vehicle_ids: Set[int]) -> Set[int]:
+    """Verilenlerden kayıtlı olan araç id'leri (süreç içi önbellek; bilinmeyen id görülünce yeniden yüklenir)"""
+    global _known_vehicle_ids
+    if not vehicle_ids <= _known_vehicle_ids:
+        _known_vehicle_ids = set(db.execute(select(Vehicle.id)).scalars())
+    return vehicle_ids & _known_vehicle_ids
+
+def ensure_partitions(db: Session, days: Iterable) -> None:
+    """PostgreSQL'de verilen günlerin bölümlerini oluştur (varsa dokunmaz)"""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for day in sorted(set(days)):
+        start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+        db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {PARTITION_PREFIX}{day:%Y%m%d} PARTITION OF {TelematicsPing.__tablename__} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{(start + timedelta(days=1)).isoformat()}')"
+        ))
+
+def write_pings(db: Session, pings: List[dict]) -> int:
+    """Sinyalleri toplu yaz (aynı araç ve anın tekrarı yok sayılır), current_km'yi tek UPDATE ile ilerlet; commit eder"""
+    rows = list({(p["vehicle_id"], p["recorded_at"]): p for p in pings}.values())
+    if not rows:
+        return 0
+    ensure_partitions(db, {row["recorded_at"].date() for row in rows})
+    db.execute(upsert(db, TelematicsPing).on_conflict_do_nothing(), rows)
+
+    max_km: Dict[int, float] = {}
+    for row in rows:
+        km = row["odometer_km"]
+        if km is not None and km > max_km.get(row["vehicle_id"], -1):
+            max_km[row["vehicle_id"]] = km
+    advance_current_km(db, {vehicle_id: int(km) for vehicle_id, km in max_km.items()})
+    db.commit()
+    return len(rows)
+
+class PingBuffer:
+    """
+    Süreç içi sinyal tamponu. Arka plan iş parçacığı aralıklarla ya da tampon flush_size'a ulaşınca yazar;
+    tampon max_size'a ulaşırsa (yazım yetişemiyorsa) sinyali ekleyen istek yazımı kendisi yapar
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        flush_size: int,
+        flush_interval_seconds: float,
+        max_size: int
+    ):
+        self.session_factory = session_factory
+        self.flush_size = flush_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_size = max_size
+        self._pings: List[dict] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # Aynı anda tek yazım
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._pings)
+
+    def add(self, pings: List[dict]) -> int:
+        with self._lock:
+            self._pings.extend(pings)
+            size = len(self._pings)
+        if size >= self.max_size:
+            self.flush()
+        elif size >= self.flush_size:
+            self._wake.set()
+        return len(self._pings)
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                pings, self._pings = self._pings, []
+            if not pings:
+                return 0
+            db = self.session_factory()
+            try:
+                return write_pings(db, pings)
+            except Exception:
+                db.rollback()
+                # Yazılamayan sinyaller (üst sınırı aşmadan) tampona geri konur, sonraki yazımda denenir
+                with self._lock:
+                    kept = max(self.max_size - len(self._pings), 0)
+                    self._pings[:0] = pings[:kept]
+                dropped = len(pings) - min(kept, len(pings))
+                if dropped:
+                    logger.error("Tampon dolu: yazılamayan %d telematik sinyali atıldı", dropped)
+                raise
+            finally:
+                db.close()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Telematik sinyalleri yazılamadı; %d sinyal tamponda bekliyor", len(self._pings))
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="telematics-flush", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Arka plan yazımını durdur ve tamponda kalanları yaz"""
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Telematik sinyalleri yazılamadı; kapanışta %d sinyal atıldı", len(self._pings))
+
+ping_buffer = PingBuffer(
+    SessionLocal,
+    settings.TELEMATICS_FLUSH_SIZE,
+    settings.TELEMATICS_FLUSH_INTERVAL_SECONDS,
+    settings.TELEMATICS_BUFFER_MAX_SIZE
+)
+
+def _merge_rollups(db: Session, source) -> int:
+    """Özet satırlarını (vehicle_id, resolution, bucket_start) anahtarıyla mevcut özetlerle birleştirerek yaz"""
+    rollup = TelematicsRollup
+    stmt = upsert(db, TelematicsRollup)
+    excluded = stmt.excluded
+    stmt = stmt.from_select(
+        ["vehicle_id", "resolution", "bucket_start", "ping_count",
+         "min_odometer_km", "max_odometer_km", "avg_speed_kmh", "max_speed_kmh"],
+        source
+    ).on_conflict_do_update(
+        index_elements=["vehicle_id", "resolution", "bucket_start"],
+        set_={
+            "ping_count": rollup.ping_count + excluded.ping_count,
+            "min_odometer_km": least(
+                func.coalesce(rollup.min_odometer_km, excluded.min_odometer_km),
+                func.coalesce(excluded.min_odometer_km, rollup.min_odometer_km)
+            ),
+            "max_odometer_km": greatest(
+                func.coalesce(rollup.max_odometer_km, excluded.max_odometer_km),
+                func.coalesce(excluded.max_odometer_km, rollup.max_odometer_km)
+            ),
+            # Sinyal sayısıyla ağırlıklı ortalama; taraflardan biri boşsa diğeri
+            "avg_speed_kmh": func.coalesce(
+                (rollup.avg_speed_kmh * rollup.ping_count + excluded.avg_speed_kmh * excluded.ping_count)
+                / (rollup.ping_count + excluded.ping_count),
+                rollup.avg_speed_kmh,
+                excluded.avg_speed_kmh
+            ),
+            "max_speed_kmh": greatest(
+                func.coalesce(rollup.max_speed_kmh, excluded.max_speed_kmh),
+                func.coalesce(excluded.max_speed_kmh, rollup.max_speed_kmh)
+            ),
+        }
+    )
+    return db.execute(stmt).rowcount
+
+def _drop_raw_before(db: Session, before: datetime) -> None:
+    """Ham sinyalleri sil; PostgreSQL'de tamamen eski kalan günlük bölümler DROP edilir"""
+    if db.get_bind().dialect.name == "postgresql":
+        partitions = db.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table"
+        ), {"table": TelematicsPing.__tablename__}).scalars().all()
+        for name in partitions:
+            if not name.startswith(PARTITION_PREFIX):
+                continue
+            day = datetime.strptime(name[len(PARTITION_PREFIX):], "%Y%m%d").replace(tzinfo=timezone.utc)
+            if day + timedelta(days=1) <= before:
+                db.execute(text(f"DROP TABLE {name}"))
+    db.execute(delete(TelematicsPing).where(TelematicsPing.recorded_at < before))
+
+def downsample(db: Session, now: Optional[datetime] = None) -> dict:
+    """
+    Saklama süresi dolan saatlik özetleri günlüğe, ham sinyalleri saatliğe al ve kaynakları sil (commit eder).
+    Sınırlar UTC gün başına hizalanır; geç gelen sinyaller sonraki çalışmada mevcut özetle birleştirilir
+    """
+    today = to_utc(now or datetime.now(timezone.utc)).replace(hour=0, minute=0, second=0, microsecond=0)
+    raw_before = today - timedelta(days=settings.TELEMATICS_RAW_RETENTION_DAYS)
+    hourly_before = today - timedelta(days=settings.TELEMATICS_HOURLY_RETENTION_DAYS)
+
+    rollup = TelematicsRollup
+    expired_hourly = (rollup.resolution == "hour", rollup.bucket_start < hourly_before)
+    day = date_trunc("day", rollup.bucket_start)
+    weighted_speed = func.sum(rollup.avg_speed_kmh * rollup.ping_count) / func.nullif(
+        func.sum(case((rollup.avg_speed_kmh.isnot(None), rollup.ping_count))), 0
+    )
+    daily = select(
+        rollup.vehicle_id, literal("day"), day, func.sum(rollup.ping_count),
+        func.min(rollup.min_odometer_km), func.max(rollup.max_odometer_km),
+        weighted_speed, func.max(rollup.max_speed_kmh)
+    ).where(*expired_hourly).group_by(rollup.vehicle_id, day)
+    daily_count = _merge_rollups(db, daily)
+    db.execute(delete(TelematicsRollup).where(*expired_hourly))
+
+    ping = TelematicsPing
+    hour = date_trunc("hour", ping.recorded_at)
+    hourly = select(
+        ping.vehicle_id, literal("hour"), hour, func.count(),
+        func.min(ping.odometer_km), func.max(ping.odometer_km),
+        func.avg(ping.speed_kmh), func.max(ping.speed_kmh)
+    ).where(ping.recorded_at < raw_before).group_by(ping.vehicle_id, hour)
+    hourly_count = _merge_rollups(db, hourly)
+    _drop_raw_before(db, raw_before)
+
+    db.commit()
+    return {"hourly": hourly_count, "daily": daily_count}
+
+def main():
+    parser = argparse.ArgumentParser(description="Telematik sinyal bakım işleri")
+    parser.add_argument("command", choices=["downsample"])
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.command == "downsample":
+            result = downsample(db)
+            print(f"{result['hourly']} saatlik, {result['daily']} günlük özet yazıldı")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Yerel test için araç takip cihazı simülatörü
+
+Araç başına rastgele hız ve konumla sinyal üretip toplu gönderir, saniyedeki sinyal sayısını yazar.
+    # Çalışan API'ye (token: /api/v1/auth/login ile alınan erişim anahtarı)
+    python -m app.services.telematics_simulator --token <token> --vehicle-ids 1 2 3 --rate 2000 --duration 30
+    # API olmadan doğrudan tampon ve veritabanı üzerinden (yazım hızını ölçmek için)
+    python -m app.services.telematics_simulator --direct --rate 5000 --duration 10
+"""
+import argparse
+import json
+import random
+import time
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+# Ankara merkez çevresi
+BASE_LATITUDE = 39.93
+BASE_LONGITUDE = 32.85
+
+class SimulatedVehicle:
+    def __init__(self, vehicle_id: int, odometer_km: float):
+        self.vehicle_id = vehicle_id
+        self.latitude = BASE_LATITUDE + random.uniform(-0.2, 0.2)
+        self.longitude = BASE_LONGITUDE + random.uniform(-0.2, 0.2)
+        self.speed_kmh = random.uniform(0, 90)
+        self.odometer_km = odometer_km
+
+    def step(self, recorded_at: datetime, seconds: float) -> Dict:
+        self.speed_kmh = min(max(self.speed_kmh + random.uniform(-5, 5), 0), 130)
+        distance_km = self.speed_kmh * seconds / 3600
+        self.odometer_km += distance_km
+        # ~111 km / derece
+        self.latitude += random.uniform(-1, 1) * distance_km / 111
+        self.longitude += random.uniform(-1, 1) * distance_km / 111
+        return {
+            "vehicle_id": self.vehicle_id,
+            "recorded_at": recorded_at,
+            "latitude": round(self.latitude, 6),
+            "longitude": round(self.longitude, 6),
+            "speed_kmh": round(self.speed_kmh, 1),
+            "odometer_km": round(self.odometer_km, 3),
+        }
+
+def generate_batch(vehicles: List[SimulatedVehicle], size: int, clock: Dict) -> List[Dict]:
+    """Araçlar arasında sırayla dolaşarak size adet sinyal üret (her araç turunda saat 1 sn ilerler)"""
+    pings = []
+    for _ in range(size):
+        vehicle = vehicles[clock["index"] % len(vehicles)]
+        if clock["index"] % len(vehicles) == 0:
+            clock["now"] += timedelta(seconds=1)
+        clock["index"] += 1
+        pings.append(vehicle.step(clock["now"], 1))
+    return pings
+
+def _post(url: str, token: str, pings: List[Dict]) -> Dict:
+    body = json.dumps({"pings": pings}, default=lambda value: value.isoformat()).encode()
+    request = urllib.request.Request(
+        url, data=body, method="POST",
+        headers={"Content-Type": "application/json", "Authorization": f"Bearer {token}"}
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+def main():
+    parser = argparse.ArgumentParser(description="Telematik sinyal simülatörü")
+    parser.add_argument("--url", default="http://localhost:8000/api/v1/telematics/pings")
+    parser.add_argument("--token", help="API erişim anahtarı (--direct kullanılmıyorsa gerekli)")
+    parser.add_argument("--vehicle-ids", type=int, nargs="*", help="Boşsa --direct modda tüm araçlar")
+    parser.add_argument("--rate", type=int, default=1000, help="Saniyedeki hedef sinyal sayısı")
+    parser.add_argument("--duration", type=int, default=10, help="Saniye")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--direct", action="store_true", help="API yerine doğrudan tampon/veritabanı")
+    args = parser.parse_args()
+
+    if args.direct:
+        from sqlalchemy import select
+        from app.database import SessionLocal
+        from app.models.vehicle import Vehicle
+        from app.services import telematics
+
+        with SessionLocal() as db:
+            query = select(Vehicle.id, Vehicle.current_km)
+            if args.vehicle_ids:
+                query = query.where(Vehicle.id.in_(args.vehicle_ids))
+            vehicles = [SimulatedVehicle(vehicle_id, current_km or 0) for vehicle_id, current_km in db.execute(query)]
+        telematics.ping_buffer.start()
+        send = lambda pings: telematics.ping_buffer.add([telematics.ping_row(p) for p in pings])
+    else:
+        if not args.token or not args.vehicle_ids:
+            parser.error("--token ve --vehicle-ids gerekli (veya --direct)")
+        vehicles = [SimulatedVehicle(vehicle_id, 0) for vehicle_id in args.vehicle_ids]
+        send = lambda pings: _post(args.url, args.token, pings)
+    if not vehicles:
+        parser.error("Araç bulunamadı")
+
+    clock = {"now": datetime.now(timezone.utc), "index": 0}
+    sent = 0
+    started = time.monotonic()
+    while time.monotonic() - started < args.duration:
+        tick = time.monotonic()
+        for _ in range(max(args.rate // args.batch_size, 1)):
+            send(generate_batch(vehicles, args.batch_size, clock))
+            sent += args.batch_size
+        # Hedef hızdan hızlıysak saniyenin kalanını bekle
+        time.sleep(max(1 - (time.monotonic() - tick), 0))
+    if args.direct:
+        telematics.ping_buffer.stop()
+    elapsed = time.monotonic() - started
+    print(f"{sent} sinyal, {elapsed:.1f} sn, {sent / elapsed:.0f} sinyal/sn")
+
+if __name__ == "__main__":
+    main()
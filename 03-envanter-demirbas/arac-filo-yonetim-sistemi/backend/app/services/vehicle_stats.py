@@ -0,0 +1,228 @@
+"""
+Araç/sürücü/ay bazında yakıt ve bakım özetleri (vehicle_month_stats)
+
+Yeni kayıtlar özet hücresine artımlı eklenir (tek UPSERT). Güncelleme ve silmede min/max km
+geri alınamadığı için etkilenen hücreler ham tablolardan (indeksli aralık okuması) yeniden hesaplanır.
+min/max km yalnızca yakıt kayıtlarının km okumalarıdır; bakım km'si özete katılmaz.
+Geçmiş veri için:
+    python -m app.services.vehicle_stats [--year 2024]
+"""
+import argparse
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import func, extract, delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.sql import upsert, greatest, least
+from app.models.fuel import FuelRecord
+from app.models.maintenance import Maintenance
+from app.models.vehicle_stats import VehicleMonthStats
+
+# (vehicle_id, driver_id, year, month)
+Cell = Tuple[int, int, int, int]
+
+EMPTY_VALUES = {
+    "fuel_liters": 0.0,
+    "fuel_cost": 0.0,
+    "refuel_count": 0,
+    "maintenance_cost": 0.0,
+    "maintenance_count": 0,
+    "min_km": None,
+    "max_km": None,
+}
+
+def month_range(year: int, month: int) -> Tuple[datetime, datetime]:
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return start, end
+
+def fuel_cell(record: FuelRecord) -> Cell:
+    return (record.vehicle_id, record.driver_id or 0, record.fuel_date.year, record.fuel_date.month)
+
+def maintenance_cell(record: Maintenance) -> Cell:
+    return (record.vehicle_id, 0, record.service_date.year, record.service_date.month)
+
+def _apply_deltas(db: Session, deltas: dict) -> None:
+    """Hücrelere artımlı ekle (satır yoksa oluşturur); tek UPSERT, çok satırda executemany"""
+    if not deltas:
+        return
+    stmt = upsert(db, VehicleMonthStats)
+    table = VehicleMonthStats
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["vehicle_id", "driver_id", "year", "month"],
+        set_={
+            "fuel_liters": table.fuel_liters + excluded.fuel_liters,
+            "fuel_cost": table.fuel_cost + excluded.fuel_cost,
+            "refuel_count": table.refuel_count + excluded.refuel_count,
+            "maintenance_cost": table.maintenance_cost + excluded.maintenance_cost,
+            "maintenance_count": table.maintenance_count + excluded.maintenance_count,
+            "min_km": least(
+                func.coalesce(table.min_km, excluded.min_km), func.coalesce(excluded.min_km, table.min_km)
+            ),
+            "max_km": greatest(
+                func.coalesce(table.max_km, excluded.max_km), func.coalesce(excluded.max_km, table.max_km)
+            ),
+            "updated_at": func.now(),
+        }
+    )
+    db.execute(stmt, [
+        {"vehicle_id": v, "driver_id": d, "year": y, "month": m, **{**EMPTY_VALUES, **values}}
+        for (v, d, y, m), values in deltas.items()
+    ])
+
+def _apply_delta(db: Session, cell: Cell, values: dict) -> None:
+    _apply_deltas(db, {cell: values})
+
+def add_fuel_record(db: Session, record: FuelRecord) -> None:
+    _apply_delta(db, fuel_cell(record), {
+        "fuel_liters": record.liters,
+        "fuel_cost": record.total_cost,
+        "refuel_count": 1,
+        "min_km": record.km_at_fueling,
+        "max_km": record.km_at_fueling,
+    })
+
+def add_fuel_rows(db: Session, rows: Iterable[dict]) -> None:
+    """Toplu eklenen yakıt satırlarını (FuelRecord kolon sözlükleri) hücre bazında toplayıp tek seferde ekle"""
+    deltas = {}
+    for row in rows:
+        cell = (row["vehicle_id"], row.get("driver_id") or 0, row["fuel_date"].year, row["fuel_date"].month)
+        values = deltas.setdefault(cell, {
+            "fuel_liters": 0.0, "fuel_cost": 0.0, "refuel_count": 0, "min_km": None, "max_km": None
+        })
+        values["fuel_liters"] += row["liters"]
+        values["fuel_cost"] += row["total_cost"]
+        values["refuel_count"] += 1
+        km = row["km_at_fueling"]
+        values["min_km"] = km if values["min_km"] is None else min(values["min_km"], km)
+        values["max_km"] = km if values["max_km"] is None else max(values["max_km"], km)
+    _apply_deltas(db, deltas)
+
+def add_maintenance(db: Session, record: Maintenance) -> None:
+    # min_km/max_km yalnızca yakıt okumalarıdır (kullanım raporu ham yakıt yoluyla aynı sonucu vermeli)
+    _apply_delta(db, maintenance_cell(record), {
+        "maintenance_cost": record.cost or 0.0,
+        "maintenance_count": 1,
+    })
+
+def _aggregate(db: Session, fuel_criteria: list, maintenance_criteria: Optional[list]) -> dict:
+    """Ham tablolardan hücre -> özet değerleri (kaynak başına tek GROUP BY)"""
+    cells = {}
+
+    fuel_year = extract('year', FuelRecord.fuel_date)
+    fuel_month = extract('month', FuelRecord.fuel_date)
+    fuel_driver = func.coalesce(FuelRecord.driver_id, 0)
+    fuel_rows = db.query(
+        FuelRecord.vehicle_id, fuel_driver.label("driver_id"), fuel_year.label("year"), fuel_month.label("month"),
+        func.sum(FuelRecord.liters).label("liters"),
+        func.sum(FuelRecord.total_cost).label("cost"),
+        func.count(FuelRecord.id).label("count"),
+        func.min(FuelRecord.km_at_fueling).label("min_km"),
+        func.max(FuelRecord.km_at_fueling).label("max_km")
+    ).filter(*fuel_criteria).group_by(FuelRecord.vehicle_id, fuel_driver, fuel_year, fuel_month).all()
+    for row in fuel_rows:
+        cells[(row.vehicle_id, int(row.driver_id), int(row.year), int(row.month))] = {
+            **EMPTY_VALUES,
+            "fuel_liters": row.liters or 0.0,
+            "fuel_cost": row.cost or 0.0,
+            "refuel_count": row.count,
+            "min_km": row.min_km,
+            "max_km": row.max_km,
+        }
+
+    if maintenance_criteria is None:
+        return cells
+    service_year = extract('year', Maintenance.service_date)
+    service_month = extract('month', Maintenance.service_date)
+    maintenance_rows = db.query(
+        Maintenance.vehicle_id, service_year.label("year"), service_month.label("month"),
+        func.sum(func.coalesce(Maintenance.cost, 0)).label("cost"),
+        func.count(Maintenance.id).label("count")
+    ).filter(*maintenance_criteria).group_by(Maintenance.vehicle_id, service_year, service_month).all()
+    for row in maintenance_rows:
+        values = cells.setdefault((row.vehicle_id, 0, int(row.year), int(row.month)), dict(EMPTY_VALUES))
+        values["maintenance_cost"] = row.cost or 0.0
+        values["maintenance_count"] = row.count
+    return cells
+
+def _insert_cells(db: Session, cells: dict) -> int:
+    rows = [
+        {"vehicle_id": v, "driver_id": d, "year": y, "month": m, **values}
+        for (v, d, y, m), values in cells.items()
+    ]
+    if rows:
+        db.execute(insert(VehicleMonthStats), rows)
+    return len(rows)
+
+def refresh_cells(db: Session, cells: Iterable[Cell]) -> None:
+    """Güncellenen/silinen kayıtların hücrelerini ham tablolardan yeniden hesapla (commit çağırana ait)"""
+    db.flush()
+    for cell in set(cells):
+        vehicle_id, driver_id, year, month = cell
+        start, end = month_range(year, month)
+        db.execute(delete(VehicleMonthStats).where(
+            VehicleMonthStats.vehicle_id == vehicle_id,
+            VehicleMonthStats.driver_id == driver_id,
+            VehicleMonthStats.year == year,
+            VehicleMonthStats.month == month
+        ))
+        _insert_cells(db, _aggregate(
+            db,
+            [
+                FuelRecord.vehicle_id == vehicle_id,
+                func.coalesce(FuelRecord.driver_id, 0) == driver_id,
+                FuelRecord.fuel_date >= start,
+                FuelRecord.fuel_date < end,
+            ],
+            [
+                Maintenance.vehicle_id == vehicle_id,
+                Maintenance.service_date >= start,
+                Maintenance.service_date < end,
+            ] if driver_id == 0 else None
+        ))
+
+def rebuild(db: Session, year: Optional[int] = None) -> int:
+    """Özetleri ham tablolardan yeniden oluştur (geçmiş veri/backfill için)"""
+    delete_stmt = delete(VehicleMonthStats)
+    fuel_criteria, maintenance_criteria = [], []
+    if year is not None:
+        delete_stmt = delete_stmt.where(VehicleMonthStats.year == year)
+        fuel_criteria = [FuelRecord.fuel_date >= datetime(year, 1, 1), FuelRecord.fuel_date < datetime(year + 1, 1, 1)]
+        maintenance_criteria = [
+            Maintenance.service_date >= datetime(year, 1, 1),
+            Maintenance.service_date < datetime(year + 1, 1, 1)
+        ]
+    db.execute(delete_stmt)
+    rows = _insert_cells(db, _aggregate(db, fuel_criteria, maintenance_criteria))
+    db.commit()
+    return rows
+
+def backfill_vehicle_month_stats(engine) -> None:
+    """Özet tablosu boşken ham kayıt varsa bir kez doldur (başlangıçta)"""
+    with Session(engine) as db:
+        if db.execute(select(VehicleMonthStats.id).limit(1)).first() is not None:
+            return
+        has_records = (
+            db.execute(select(FuelRecord.id).limit(1)).first() is not None
+            or db.execute(select(Maintenance.id).limit(1)).first() is not None
+        )
+        if has_records:
+            rebuild(db)
+
+def main():
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="vehicle_month_stats özet tablosunu yeniden oluştur")
+    parser.add_argument("--year", type=int, help="Sadece belirtilen yıl (boşsa tümü)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print(f"{rebuild(db, args.year)} hücre yazıldı")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -3,14 +3,23 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import uvicorn
 
-from app.database import engine, Base
-from app.api.v1 import auth, vehicles, drivers, maintenance, fuel, reports
+from app.database import engine, Base, ensure_columns, ensure_indexes
+from app.api.v1 import auth, vehicles, drivers, maintenance, fuel, fuel_anomalies, reports, telematics, reservations
 from app.core.config import settings
+from app.services.vehicle_stats import backfill_vehicle_month_stats
+from app.services.telematics import ping_buffer
+from app.services.maintenance_schedule import backfill_maintenance_predictions
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     Base.metadata.create_all(bind=engine)
+    ensure_columns(engine)
+    ensure_indexes(engine)
+    backfill_vehicle_month_stats(engine)
+    backfill_maintenance_predictions(engine)
+    ping_buffer.start()
     yield
+    ping_buffer.stop()
 
 app = FastAPI(
     title="Araç Filo Yönetim Sistemi API",
@@ -32,7 +41,10 @@ app.include_router(vehicles.router, prefix="/api/v1/vehicles", tags=["vehicles"]
 app.include_router(drivers.router, prefix="/api/v1/drivers", tags=["drivers"])
 app.include_router(maintenance.router, prefix="/api/v1/maintenance", tags=["maintenance"])
 app.include_router(fuel.router, prefix="/api/v1/fuel", tags=["fuel"])
+app.include_router(fuel_anomalies.router, prefix="/api/v1/fuel-anomalies", tags=["fuel-anomalies"])
 app.include_router(reports.router, prefix="/api/v1/reports", tags=["reports"])
+app.include_router(telematics.router, prefix="/api/v1/telematics", tags=["telematics"])
+app.include_router(reservations.router, prefix="/api/v1/reservations", tags=["reservations"])
 
 @app.get("/")
 async def root():